@@ -21,6 +21,7 @@ export const errors = {
 
 export const warnings = {
   W001: "[W001] Please select a python interpreter ",
+  W002: "[W002] Open a config file to run this command ",
 };
 
 export const infos = {
@@ -12,7 +12,7 @@ import { exec } from "child_process";
 
 import {
   python_args,
-  warnings, // eslint-disable-line
+  warnings,
   infos,
   errors,
   status,
@@ -44,7 +44,13 @@ const clientOptions: LanguageClientOptions = {
   outputChannel: logging,
   synchronize: {
     // Notify the server about file changes to '.clientrc files contain in the workspace
-    fileEvents: workspace.createFileSystemWatcher("**/.clientrc"),
+    // and to configs, which are indexed for the workspace symbol search
+    fileEvents: [
+      workspace.createFileSystemWatcher("**/.clientrc"),
+      workspace.createFileSystemWatcher("**/*.cfg"),
+    ],
+    // Notify the server about changes of the settings, which it pulls on change
+    configurationSection: "spacy-extension",
   },
 };
 
@@ -76,9 +82,19 @@ async function startProduction() {
     currentPythonEnvironment
   );
   if (python_interpreter_compat.includes("I")) {
+    const configuration = vscode.workspace.getConfiguration("spacy-extension");
+    // Lite mode serves features from a metadata snapshot without importing spaCy
+    const liteMode = configuration.get("liteMode");
+    // Record the session to replay it for profiling
+    const recordSession = configuration.get<string>("recordSession");
     return startLangServer(
       currentPythonEnvironment + "",
-      ["-m", "server"],
+      [
+        "-m",
+        "server",
+        ...(liteMode ? ["--lite"] : []),
+        ...(recordSession ? ["--record", recordSession] : []),
+      ],
       cwd
     );
   } else {
@@ -276,6 +292,25 @@ function setClientActiveStatus(b: boolean) {
   }
 }
 
+function registerConfigCommand(command: string, serverCommand: string) {
+  /**
+   * Register a command running a server command on the config of the active editor
+   * @param command: string - Command shown in the command palette
+   * @param serverCommand: string - Command executed by the server with the uri of the config
+   */
+  return vscode.commands.registerCommand(command, () => {
+    const document = vscode.window.activeTextEditor?.document;
+    if (!document || !document.fileName.endsWith(".cfg")) {
+      vscode.window.showWarningMessage(warnings["W002"]);
+      return;
+    }
+    return vscode.commands.executeCommand(
+      serverCommand,
+      document.uri.toString()
+    );
+  });
+}
+
 export async function activate(context: ExtensionContext) {
   // Check if Python Extension is installed
   if (!vscode.extensions.getExtension("ms-python.python")) {
@@ -288,6 +323,10 @@ export async function activate(context: ExtensionContext) {
     showServerStatus
   );
   context.subscriptions.push(_showStatus);
+  context.subscriptions.push(
+    registerConfigCommand("spacy-extension.fillConfig", "spacy.fillConfig"),
+    registerConfigCommand("spacy-extension.debugConfig", "spacy.debugConfig")
+  );
 
   context.subscriptions.push(setupStatusBar());
 
@@ -1,8 +1,10 @@
 import argparse
 import logging
+import subprocess
+import sys
+from .metadata_snapshot import get_default_snapshot_path, load_snapshot, write_snapshot
 from .server import spacy_server
-
-logging.basicConfig(filename="pygls.log", level=logging.DEBUG, filemode="w")
+from .session_recorder import SessionRecorder
 
 
 def add_arguments(parser):
@@ -12,12 +14,59 @@ def add_arguments(parser):
     parser.add_argument("--ws", action="store_true", help="Use WebSocket server")
     parser.add_argument("--host", default="127.0.0.1", help="Bind to this address")
     parser.add_argument("--port", type=int, default=2087, help="Bind to this port")
+    parser.add_argument(
+        "--lite",
+        action="store_true",
+        help="Serve features from the metadata snapshot and only import spaCy when needed",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="Path of the metadata snapshot (default: in the user's cache directory)",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="Record all JSON-RPC messages with timestamps to this file",
+    )
+    parser.add_argument(
+        "--build-snapshot",
+        action="store_true",
+        help="Build the metadata snapshot and exit",
+    )
+
+
+def start_lite_mode(snapshot_path: str):
+    """Load the metadata snapshot, building it in a separate process if it's missing or outdated"""
+    spacy_server.lite_mode = True
+    if load_snapshot(snapshot_path):
+        return
+    logging.info(f"Building metadata snapshot {snapshot_path}")
+    # Build in a subprocess so spaCy isn't imported into the server
+    build = subprocess.run(
+        [sys.executable, "-m", "server", "--build-snapshot"]
+        + ["--snapshot", snapshot_path],
+        stdout=subprocess.DEVNULL,
+    )
+    if build.returncode != 0 or not load_snapshot(snapshot_path):
+        logging.warning("Can't build metadata snapshot, spaCy is imported on demand")
 
 
 def main():
     parser = argparse.ArgumentParser()
     add_arguments(parser)
     args = parser.parse_args()
+    snapshot_path = args.snapshot or get_default_snapshot_path()
+    if args.build_snapshot:
+        write_snapshot(snapshot_path)
+        return
+
+    # Configured here, the config worker process imports this module as well
+    logging.basicConfig(filename="pygls.log", level=logging.DEBUG, filemode="w")
+    if args.lite:
+        start_lite_mode(snapshot_path)
+    if args.record:
+        spacy_server.lsp.recorder = SessionRecorder(args.record)
 
     if args.tcp:
         spacy_server.start_tcp(args.host, args.port)
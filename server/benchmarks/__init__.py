@@ -0,0 +1,154 @@
+"""Helpers shared by the benchmark scripts
+
+The benchmarks aren't part of the test suite, run them as modules, e.g.
+python -m server.benchmarks.bench_registry_catalogue
+"""
+
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+
+def get_rss(pid: Optional[int] = None) -> Optional[int]:
+    """
+    Return the resident set size in bytes of a process (default: the current one).
+
+    Reads /proc on Linux; on other platforms only the peak RSS of the current process is available.
+    Returns None if the RSS can't be determined.
+    """
+    proc_path = f"/proc/{pid or 'self'}/statm"
+    if os.path.exists(proc_path):
+        with open(proc_path) as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    if pid is not None:
+        return None
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes everywhere else
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def format_bytes(n_bytes: Optional[int]) -> str:
+    """Format a byte count as kilobytes or megabytes"""
+    if n_bytes is None:
+        return "n/a"
+    if abs(n_bytes) < 1024 * 1024:
+        return f"{n_bytes / 1024:.1f} KB"
+    return f"{n_bytes / 1024 / 1024:.1f} MB"
+
+
+def percentile(values: List[float], q: int) -> float:
+    """Return the q-th percentile of the values, the value itself if there's only one"""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1]
+
+
+class Client:
+    """
+    Minimal JSON-RPC client for the language server running as a subprocess.
+
+    Talks to the server over stdio, or over TCP if a port is passed.
+    Requests of the server are passed to on_server_request, which doesn't answer them by default.
+    """
+
+    def __init__(self, args: Optional[List[str]] = None, port: Optional[int] = None):
+        args = args or []
+        if port is None:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "server"] + args,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+            assert self.process.stdin is not None and self.process.stdout is not None
+            self._output: IO[bytes] = self.process.stdin
+            self._input: IO[bytes] = self.process.stdout
+        else:
+            self.process = subprocess.Popen(
+                [sys.executable, "-m", "server", "--tcp", "--port", str(port)] + args
+            )
+            connection = connect(port)
+            self._output = connection.makefile("wb")
+            self._input = connection.makefile("rb")
+        self.sent: Dict[int, float] = {}
+        self.responses: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+        self._done = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, daemon=True)
+        self._reader.start()
+
+    def send(self, message: Dict[str, Any]) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf8")
+        with self._write_lock:
+            if "id" in message and "method" in message:
+                self.sent[message["id"]] = time.perf_counter()
+            self._output.write(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+            self._output.flush()
+
+    def request(self, msg_id: int, method: str, params: Dict[str, Any]) -> None:
+        self.send({"id": msg_id, "method": method, "params": params})
+
+    def wait(self, msg_ids: List[int], timeout: float = 60.0) -> None:
+        with self._done:
+            self._done.wait_for(
+                lambda: all(msg_id in self.responses for msg_id in msg_ids), timeout
+            )
+
+    def close(self, msg_id: int = 0) -> None:
+        """Shut down the server, msg_id is used for the shutdown request"""
+        self.request(msg_id, "shutdown", {})
+        self.wait([msg_id])
+        self.send({"method": "exit"})
+        self.process.wait(10)
+
+    def on_server_request(self, message: Dict[str, Any]) -> None:
+        """Called with every request the server sends to the client"""
+
+    def _read(self) -> None:
+        while True:
+            message = read_message(self._input)
+            if message is None:
+                return
+            # Skip notifications of the server
+            if "method" in message:
+                if "id" in message:
+                    self.on_server_request(message)
+                continue
+            with self._done:
+                self.responses[message["id"]] = (time.perf_counter(), message)
+                self._done.notify_all()
+
+
+def connect(port: int, timeout: float = 60.0) -> socket.socket:
+    """Connect to the server on localhost, waiting for it to start listening"""
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            return socket.create_connection(("127.0.0.1", port))
+        except ConnectionRefusedError:
+            if time.perf_counter() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def read_message(stream: IO[bytes]) -> Optional[Dict[str, Any]]:
+    content_length = 0
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        if line == b"\r\n":
+            break
+        name, value = line.decode("ascii").split(":", 1)
+        if name.strip().lower() == "content-length":
+            content_length = int(value)
+    return json.loads(stream.read(content_length))
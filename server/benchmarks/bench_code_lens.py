@@ -0,0 +1,80 @@
+"""Benchmark the component code lenses of a config with many components
+
+Reports the time to compute the unresolved lenses of a generated config, to resolve the lenses
+of one screen with a cold and a warm cache and, for comparison, to resolve every lens of the
+document up front, along with the number of registry lookups.
+
+USAGE:
+python -m server.benchmarks.bench_code_lens --components 200 --visible 10
+"""
+
+import argparse
+import time
+
+from mock import Mock, patch
+
+from .bench_hover_burst import create_config
+from .bench_streaming_parser import create_large_config
+from ..document_snapshot import DocumentSnapshot
+from ..feature_code_lens import (
+    code_lens,
+    get_distributions,
+    get_package,
+    resolve_code_lens,
+)
+from ..registry_catalogue import registry_catalogue
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--components", type=int, default=200, help="Number of generated components"
+    )
+    parser.add_argument(
+        "--visible", type=int, default=10, help="Number of lenses resolved per screen"
+    )
+    args = parser.parse_args()
+
+    source = create_large_config(create_config(), args.components)
+    snapshot = DocumentSnapshot("file:///config.cfg", 1, source)
+    params = Mock()
+    # Import spaCy and read the registries before measuring
+    registry_catalogue.get_registry("factories")
+    registry_catalogue.get_registry("architectures")
+
+    with patch.object(
+        registry_catalogue, "find", wraps=registry_catalogue.find
+    ) as find:
+        start = time.perf_counter()
+        lenses = code_lens(snapshot, params)
+        print(
+            f"{'code lenses':<24} {(time.perf_counter() - start) * 1000:8.2f} ms "
+            f"lenses={len(lenses)} lookups={find.call_count}"
+        )
+
+        server = Mock(code_lens_cache={})
+        for name in ("visible (cold)", "visible (warm)"):
+            find.reset_mock()
+            start = time.perf_counter()
+            for lens in code_lens(snapshot, params)[: args.visible]:
+                resolve_code_lens(server, lens)
+            print(
+                f"{name:<24} {(time.perf_counter() - start) * 1000:8.2f} ms "
+                f"lookups={find.call_count}"
+            )
+
+        find.reset_mock()
+        server = Mock(code_lens_cache={})
+        get_distributions.cache_clear()
+        get_package.cache_clear()
+        start = time.perf_counter()
+        for lens in code_lens(snapshot, params):
+            resolve_code_lens(server, lens)
+        print(
+            f"{'all (cold)':<24} {(time.perf_counter() - start) * 1000:8.2f} ms "
+            f"lookups={find.call_count}"
+        )
+
+
+if __name__ == "__main__":
+    main()
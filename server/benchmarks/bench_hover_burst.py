@@ -0,0 +1,138 @@
+"""Benchmark the hover latency under a burst of requests
+
+Starts the language server over stdio, opens a generated training config and replays a burst of
+hover requests moving over its registry functions and variables, like a mouse moving over the editor.
+With --cancel, every pending hover is cancelled when the next one is sent, like VS Code does.
+Reports the latency percentiles of the requests and how many were skipped by the server.
+
+USAGE:
+python -m server.benchmarks.bench_hover_burst [--requests 1000] [--interval 0] [--cancel]
+"""
+
+import argparse
+import re
+import time
+from typing import List, Tuple
+
+from . import Client, percentile
+from ..util import VariableIndex
+
+REGISTRY_VALUE_REGEX = re.compile(r"^@\w+\s*=\s*\"([^\"]+)\"")
+CONFIG_URI = "file:///bench_hover_burst.cfg"
+
+
+def create_config() -> str:
+    from spacy.cli.init_config import init_config
+
+    return init_config(
+        lang="en", pipeline=["tok2vec", "tagger", "parser", "ner"]
+    ).to_str()
+
+
+def get_hover_positions(source: str) -> List[Tuple[int, int]]:
+    """Return a position inside every registry function name and variable of a config"""
+    positions = []
+    for line_no, line in enumerate(source.splitlines()):
+        match = REGISTRY_VALUE_REGEX.match(line)
+        if match:
+            positions.append((line_no, match.start(1) + 1))
+    positions.extend(
+        (interpolation.line, interpolation.start + 2)
+        for interpolation in VariableIndex(source).interpolations
+    )
+    return sorted(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument(
+        "--interval", type=float, default=0.0, help="Milliseconds between requests"
+    )
+    parser.add_argument("--cancel", action="store_true")
+    args = parser.parse_args()
+
+    source = create_config()
+    positions = get_hover_positions(source)
+
+    client = Client()
+    client.request(1, "initialize", {"processId": None, "capabilities": {}})
+    client.wait([1])
+    client.send({"method": "initialized", "params": {}})
+    client.send(
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": CONFIG_URI,
+                    "languageId": "cfg",
+                    "version": 1,
+                    "text": source,
+                }
+            },
+        }
+    )
+    # Warm up the document snapshot and the registry catalogue
+    warmup_ids = list(range(2, 2 + len(positions)))
+    for msg_id, (line, character) in zip(warmup_ids, positions):
+        client.request(
+            msg_id,
+            "textDocument/hover",
+            {
+                "textDocument": {"uri": CONFIG_URI},
+                "position": {"line": line, "character": character},
+            },
+        )
+        client.wait([msg_id])
+
+    first_id = warmup_ids[-1] + 1
+    msg_ids = list(range(first_id, first_id + args.requests))
+    start = time.perf_counter()
+    for i, msg_id in enumerate(msg_ids):
+        if args.cancel and i > 0:
+            client.send({"method": "$/cancelRequest", "params": {"id": msg_id - 1}})
+        line, character = positions[i % len(positions)]
+        client.request(
+            msg_id,
+            "textDocument/hover",
+            {
+                "textDocument": {"uri": CONFIG_URI},
+                "position": {"line": line, "character": character},
+            },
+        )
+        if args.interval:
+            time.sleep(args.interval / 1000)
+    client.wait(msg_ids)
+    duration = time.perf_counter() - start
+    client.close()
+
+    latencies = []
+    n_answered = n_skipped = n_cancelled = 0
+    for msg_id in msg_ids:
+        if msg_id not in client.responses:
+            continue
+        received, response = client.responses[msg_id]
+        latencies.append((received - client.sent[msg_id]) * 1000)
+        if "error" in response:
+            n_cancelled += 1
+        elif response.get("result") is None:
+            n_skipped += 1
+        else:
+            n_answered += 1
+
+    print(
+        f"requests={args.requests} interval={args.interval} ms cancel={args.cancel} "
+        f"total={duration * 1000:.1f} ms"
+    )
+    print(
+        f"answered={n_answered} skipped={n_skipped} cancelled={n_cancelled} "
+        f"lost={args.requests - len(latencies)}"
+    )
+    print(
+        f"latency p50={percentile(latencies, 50):.2f} ms "
+        f"p99={percentile(latencies, 99):.2f} ms max={max(latencies):.2f} ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
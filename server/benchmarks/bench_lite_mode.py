@@ -0,0 +1,124 @@
+"""Benchmark the startup time and memory of the server in normal and lite mode
+
+Starts the language server in both modes, opens a generated training config and requests a hover
+of a registry function, a section title and an argument and a completion of arguments.
+Reports the time until the server answered initialize and the first requests, and the RSS of the
+server and its child processes (the config worker in normal mode) afterwards.
+
+USAGE:
+python -m server.benchmarks.bench_lite_mode
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List, Optional
+
+from . import Client, format_bytes, get_rss
+from .bench_hover_burst import CONFIG_URI, create_config
+
+
+def get_children_rss(pid: int) -> Optional[int]:
+    """Return the total RSS of the direct child processes of a process (Linux only)"""
+    children_path = f"/proc/{pid}/task/{pid}/children"
+    if not os.path.exists(children_path):
+        return None
+    with open(children_path) as children:
+        child_pids = [int(child_pid) for child_pid in children.read().split()]
+    return sum(get_rss(child_pid) or 0 for child_pid in child_pids)
+
+
+def find_line(lines: List[str], text: str) -> int:
+    return next(i for i, line in enumerate(lines) if line.startswith(text))
+
+
+def run_mode(mode: str, snapshot_path: str, source: str, settle: float) -> None:
+    lines = source.splitlines()
+    requests = [
+        # registry function, section title, argument
+        ("textDocument/hover", find_line(lines, "@architectures"), 20),
+        ("textDocument/hover", find_line(lines, "[training.batcher]"), 11),
+        ("textDocument/hover", find_line(lines, "hidden_width"), 2),
+        ("textDocument/completion", find_line(lines, "[components.ner]") + 1, 0),
+    ]
+    args = ["--snapshot", snapshot_path] + (["--lite"] if mode == "lite" else [])
+
+    start = time.perf_counter()
+    client = Client(args)
+    client.request(1, "initialize", {"processId": None, "capabilities": {}})
+    client.wait([1])
+    startup = client.responses[1][0] - start
+    client.send({"method": "initialized", "params": {}})
+    client.send(
+        {
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": CONFIG_URI,
+                    "languageId": "cfg",
+                    "version": 1,
+                    "text": source,
+                }
+            },
+        }
+    )
+    # Requests are sent one after another, hovers would supersede each other otherwise
+    msg_ids = []
+    for msg_id, (method, line, character) in enumerate(requests, start=2):
+        client.request(
+            msg_id,
+            method,
+            {
+                "textDocument": {"uri": CONFIG_URI},
+                "position": {"line": line, "character": character},
+            },
+        )
+        client.wait([msg_id])
+        msg_ids.append(msg_id)
+    first_requests = client.responses[msg_ids[-1]][0] - start
+    n_answered = sum(
+        1 for msg_id in msg_ids if client.responses[msg_id][1].get("result") is not None
+    )
+
+    # Give background work like the config worker import time to finish
+    time.sleep(settle)
+    rss = get_rss(client.process.pid)
+    children_rss = get_children_rss(client.process.pid)
+    client.close()
+
+    print(
+        f"{mode:<6} initialize={startup * 1000:7.1f} ms "
+        f"first requests={first_requests * 1000:7.1f} ms ({n_answered}/{len(msg_ids)} answered) "
+        f"rss={format_bytes(rss):>9} children={format_bytes(children_rss):>9}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--settle", type=float, default=5.0, help="Seconds to wait before reading RSS"
+    )
+    args = parser.parse_args()
+
+    source = create_config()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        snapshot_path = os.path.join(tmp_dir, "metadata.json")
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "server", "--build-snapshot"]
+            + ["--snapshot", snapshot_path],
+            check=True,
+        )
+        print(
+            f"snapshot built in {(time.perf_counter() - start) * 1000:.1f} ms "
+            f"({format_bytes(os.path.getsize(snapshot_path))})"
+        )
+        for mode in ["normal", "lite"]:
+            run_mode(mode, snapshot_path, source, args.settle)
+
+
+if __name__ == "__main__":
+    main()
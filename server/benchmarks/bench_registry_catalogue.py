@@ -0,0 +1,87 @@
+"""Benchmark the memory used by the registry catalogue
+
+Compares the catalogue in its cold state (names and locations only) and warm state
+(docstrings and signatures loaded) against eagerly calling registry.find for every function.
+Each mode runs in a fresh interpreter so the numbers don't influence each other.
+
+USAGE:
+python -m server.benchmarks.bench_registry_catalogue
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, Optional, Tuple
+
+from . import format_bytes, get_rss
+
+
+def run_mode(mode: str) -> None:
+    from spacy import registry
+
+    # Read all registries once so plugin imports aren't counted towards the catalogue
+    registry_names = registry.get_registry_names()
+    for registry_name in registry_names:
+        getattr(registry, registry_name).get_all()
+
+    from ..registry_catalogue import RegistryCatalogue
+
+    rss_before = get_rss()
+    tracemalloc.start()
+    start = time.perf_counter()
+    if mode == "eager":
+        eager: Dict[Tuple[str, str], Optional[dict]] = {}
+        for registry_name in registry_names:
+            for func_name in getattr(registry, registry_name).get_all():
+                try:
+                    eager[registry_name, func_name] = registry.find(
+                        registry_name, func_name
+                    )
+                except OSError:
+                    # registry.find fails for functions without available source
+                    eager[registry_name, func_name] = None
+        n_entries = len(eager)
+    else:
+        catalogue = RegistryCatalogue()
+        entries = list(catalogue)
+        n_entries = len(entries)
+        if mode == "warm":
+            catalogue.load_all()
+    duration = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = get_rss()
+
+    rss_delta = (
+        rss_after - rss_before
+        if rss_after is not None and rss_before is not None
+        else None
+    )
+    print(
+        f"{mode:<6} entries={n_entries:<5} time={duration * 1000:8.1f} ms "
+        f"allocated={format_bytes(allocated):>9} "
+        f"rss={format_bytes(rss_after):>9} (+{format_bytes(rss_delta)})"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--mode", choices=["cold", "warm", "eager"])
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode)
+        return
+
+    for mode in ["cold", "warm", "eager"]:
+        subprocess.run(
+            [sys.executable, "-m", "server.benchmarks.bench_registry_catalogue"]
+            + ["--mode", mode],
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
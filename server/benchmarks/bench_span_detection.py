@@ -0,0 +1,95 @@
+"""Benchmark the word span detection against the former character by character scan
+
+Looks up the word at many positions of a large generated config with the former implementation of
+`get_current_word` (a `re.match` per character), with `get_current_word` (one regex pass per call)
+and with one `LineSpans` per line.
+
+USAGE:
+python -m server.benchmarks.bench_span_detection --components 2000 --step 3
+"""
+
+import argparse
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from .bench_hover_burst import create_config
+from .bench_streaming_parser import create_large_config
+from ..span_detection import LineSpans, SpanInfo
+from ..util import get_current_word
+
+
+def scan_current_word(line: str, start_pos: int) -> SpanInfo:
+    """Former implementation of get_current_word, for comparison"""
+    if start_pos < 0 or start_pos >= len(line):
+        return SpanInfo("", 0, 0)
+    end_i = start_pos
+    start_i = start_pos
+    for i in range(start_pos, len(line), 1):
+        if re.match(r"\W", line[i]):
+            break
+        else:
+            end_i = i
+    for i in range(start_pos, -1, -1):
+        if re.match(r"\W", line[i]):
+            break
+        else:
+            start_i = i
+    return SpanInfo(line[start_i : end_i + 1], start_i, end_i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--components", type=int, default=2000, help="Number of generated components"
+    )
+    parser.add_argument(
+        "--step", type=int, default=3, help="Query every n-th character of every line"
+    )
+    args = parser.parse_args()
+
+    source = create_large_config(create_config(), args.components)
+    lines = source.splitlines()
+    positions = [
+        (line_n, character)
+        for line_n, line in enumerate(lines)
+        for character in range(0, len(line), args.step)
+    ]
+    by_line: Dict[int, List[int]] = defaultdict(list)
+    for line_n, character in positions:
+        by_line[line_n].append(character)
+    print(f"{len(lines)} lines, {len(positions)} positions")
+
+    def run_scan() -> List[SpanInfo]:
+        return [scan_current_word(lines[line_n], char) for line_n, char in positions]
+
+    def run_get_current_word() -> List[SpanInfo]:
+        return [get_current_word(lines[line_n], char) for line_n, char in positions]
+
+    def run_line_spans() -> List[SpanInfo]:
+        results = []
+        for line_n, characters in by_line.items():
+            results.extend(LineSpans(lines[line_n]).words_at(characters))
+        return results
+
+    expected = None
+    for name, run in (
+        ("character scan", run_scan),
+        ("get_current_word", run_get_current_word),
+        ("LineSpans per line", run_line_spans),
+    ):
+        start = time.perf_counter()
+        results = run()
+        duration = time.perf_counter() - start
+        if expected is None:
+            expected = results
+        assert results == expected, name
+        print(
+            f"{name:<20} {duration * 1000:9.1f} ms "
+            f"({duration / len(positions) * 1e6:.2f} µs per position)"
+        )
+
+
+if __name__ == "__main__":
+    main()
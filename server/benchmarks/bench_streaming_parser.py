@@ -0,0 +1,104 @@
+"""Benchmark the streaming config parser against Config().from_str on large generated configs
+
+Generates configs with thousands of copies of the ner component and reports the time and the
+peak memory allocated (tracemalloc) to parse them with confection and with the streaming parser,
+as well as the time until the streaming parser has found the first errors of a broken config.
+
+USAGE:
+python -m server.benchmarks.bench_streaming_parser --components 1000 5000 20000
+"""
+
+import argparse
+import time
+import tracemalloc
+from typing import Callable, Tuple
+
+from confection import Config
+
+from . import format_bytes
+from .bench_hover_burst import create_config
+from ..config_parser import MAX_ERRORS, StreamingConfigParser
+from ..util import SECTION_REGEX
+
+
+def create_large_config(base: str, n_components: int) -> str:
+    """Append copies of the ner component blocks, e.x. [components.ner_1.model]"""
+    blocks = []
+    in_component = False
+    for line in base.splitlines(True):
+        section_match = SECTION_REGEX.match(line)
+        if section_match:
+            name = section_match.group(1)
+            in_component = name == "components.ner" or name.startswith(
+                "components.ner."
+            )
+        if in_component:
+            blocks.append(line)
+    component = "".join(blocks)
+    copies = [
+        component.replace("[components.ner", f"[components.ner_{i}")
+        for i in range(n_components)
+    ]
+    return base + "\n" + "\n".join(copies)
+
+
+def measure(parse: Callable[[], object]) -> Tuple[float, int]:
+    """Return the time and peak allocated memory of a call, timed without tracing the allocations"""
+    start = time.perf_counter()
+    parse()
+    duration = time.perf_counter() - start
+    tracemalloc.start()
+    parse()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--components",
+        type=int,
+        nargs="+",
+        default=[1000, 5000, 20000],
+        help="Numbers of generated components",
+    )
+    parser.add_argument(
+        "--skip-confection",
+        action="store_true",
+        help="Only run the streaming parser, e.g. for configs too large for confection",
+    )
+    args = parser.parse_args()
+
+    base = create_config()
+    for n_components in args.components:
+        source = create_large_config(base, n_components)
+        size = format_bytes(len(source.encode("utf8")))
+        print(f"{n_components} components ({size}, {source.count(chr(10))} lines)")
+        errors = StreamingConfigParser(source).check()
+        assert not errors, errors
+
+        results = [("streaming", lambda: StreamingConfigParser(source).check())]
+        if not args.skip_confection:
+            results.insert(0, ("confection", lambda: Config().from_str(source)))
+        for name, parse in results:
+            duration, peak = measure(parse)
+            print(
+                f"  {name:<12} time={duration * 1000:9.1f} ms "
+                f"peak={format_bytes(peak):>10}"
+            )
+
+        # Duplicated keys in every component after the first quarter of the document
+        broken = source.replace(
+            "\nhidden_width =", "\nhidden_width = 1\nhidden_width ="
+        )
+        broken = source[: len(source) // 4] + broken[len(source) // 4 :]
+        duration, peak = measure(lambda: StreamingConfigParser(broken).check())
+        print(
+            f"  {'first ' + str(MAX_ERRORS) + ' errors':<12} time={duration * 1000:9.1f} ms "
+            f"peak={format_bytes(peak):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
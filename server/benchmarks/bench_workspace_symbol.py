@@ -0,0 +1,158 @@
+"""Benchmark the symbol index behind the workspace symbol search
+
+Indexes the functions of all registries, generated functions of a custom registry and
+a number of generated training configs, then reports the time to build the index, to re-index a single edited config,
+to re-index an edit of a large config with thousands of components and the latency of fuzzy queries against tens of
+thousands of symbols.
+
+USAGE:
+python -m server.benchmarks.bench_workspace_symbol --configs 500 --functions 20000 --components 10000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from . import format_bytes, percentile
+from .bench_hover_burst import create_config
+from .bench_streaming_parser import create_large_config
+from ..registry_catalogue import RegistryCatalogue
+from ..symbol_index import Symbol, SymbolIndex
+
+QUERIES = [
+    "MultiHashEmbed",
+    "multihashembd",
+    "tok2vec",
+    "components.ner.model",
+    "batch_by_words",
+    "Adam",
+    "ner",
+    "tr",
+    "spacy.Tagger",
+    "initialize.vocab",
+]
+# Words the names of the generated functions are made of
+WORDS = [
+    "Hash",
+    "Embed",
+    "Char",
+    "Tok2Vec",
+    "Parser",
+    "Tagger",
+    "Span",
+    "Doc",
+    "Vectors",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument(
+        "--configs", type=int, default=500, help="Number of configs to index"
+    )
+    parser.add_argument(
+        "--functions",
+        type=int,
+        default=20000,
+        help="Number of generated functions with distinct names to index",
+    )
+    parser.add_argument(
+        "--components",
+        type=int,
+        default=10000,
+        help="Number of generated components of the large edited config",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=20, help="Number of times every query is run"
+    )
+    args = parser.parse_args()
+
+    source = create_config()
+    catalogue = RegistryCatalogue()
+    registry_symbols = {
+        registry_name: [
+            Symbol(entry.func_name, "function", registry_name, "file:///registry", 0)
+            for entry in catalogue.get_registry(registry_name).values()
+        ]
+        for registry_name in catalogue.get_registry_names()
+    }
+    random.seed(0)
+    registry_symbols["custom"] = [
+        Symbol(
+            f"custom.{''.join(random.sample(WORDS, 3))}.v{i}",
+            "function",
+            "custom",
+            "file:///custom.py",
+            i,
+        )
+        for i in range(args.functions)
+    ]
+
+    index = SymbolIndex()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for registry_name, symbols in registry_symbols.items():
+        index.update(f"registry:{registry_name}", symbols)
+    for i in range(args.configs):
+        uri = f"file:///project_{i}/config.cfg"
+        index.update_config(uri, source)
+    build = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"indexed {len(index)} symbols in {build * 1000:.1f} ms "
+        f"(allocated={format_bytes(allocated)})"
+    )
+
+    # Re-indexing an edited config only touches the symbols of that config
+    update_times = []
+    for i in range(args.repeat):
+        uri = f"file:///project_{random.randrange(args.configs)}/config.cfg"
+        start = time.perf_counter()
+        index.update_config(uri, source)
+        update_times.append(time.perf_counter() - start)
+    print(
+        f"{'update':<22} p50={percentile(update_times, 50) * 1000:6.2f} ms "
+        f"p99={percentile(update_times, 99) * 1000:6.2f} ms"
+    )
+
+    # Edits of a large config only parse and index the sections that changed
+    large_source = create_large_config(source, args.components)
+    large_uri = "file:///large/config.cfg"
+    start = time.perf_counter()
+    index.update_config(large_uri, large_source)
+    print(
+        f"{'large config':<22} {(time.perf_counter() - start) * 1000:9.2f} ms "
+        f"({len(large_source) / 1e6:.1f} MB)"
+    )
+    edit_times = []
+    for i in range(args.repeat):
+        offset = large_source.index(
+            "hidden_width", len(large_source) * i // args.repeat
+        )
+        edited_source = f"{large_source[:offset]}width = {i}\n{large_source[offset:]}"
+        start = time.perf_counter()
+        index.update_config(large_uri, edited_source)
+        edit_times.append(time.perf_counter() - start)
+    print(
+        f"{'large config edit':<22} p50={percentile(edit_times, 50) * 1000:6.2f} ms "
+        f"p99={percentile(edit_times, 99) * 1000:6.2f} ms"
+    )
+
+    for query in QUERIES:
+        query_times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = index.search(query)
+            query_times.append(time.perf_counter() - start)
+        top = results[0].name if results else "-"
+        print(
+            f"{query:<22} p50={percentile(query_times, 50) * 1000:6.2f} ms "
+            f"p99={percentile(query_times, 99) * 1000:6.2f} ms "
+            f"results={len(results):<4} top={top}"
+        )
+
+
+if __name__ == "__main__":
+    main()
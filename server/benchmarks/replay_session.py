@@ -0,0 +1,229 @@
+"""Replay a recorded JSON-RPC session against the server and report the latency per method
+
+Sessions are recorded by starting the server with `--record <file>` (or the
+`spacy-extension.recordSession` setting). The replay starts a new server over stdio or TCP and
+sends the recorded client messages with their original gaps, scaled by --speed. A message is only
+sent once the responses that arrived before it in the recording have arrived, and requests of
+the server (e.g. workspace/configuration) are answered with the recorded responses, so two
+replays of the same session send the same messages in the same order. For the most stable
+comparison between builds, use --sequential to wait for every response before the next message.
+
+Reports the latency percentiles per method and how many results differ from the recording.
+Over stdio, the latency of initialize includes the startup of the server.
+Results can be written to JSON (--output) and compared against an earlier run (--compare).
+
+USAGE:
+python -m server.benchmarks.replay_session session.jsonl --speed 2 --output new.json --compare old.json
+"""
+
+import argparse
+import heapq
+import json
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import Client, percentile
+from ..session_recorder import RECEIVED, SENT, load_session
+
+# Sent by the replay itself once all requests are answered
+SKIPPED_METHODS = {"shutdown", "exit"}
+REQUEST_CANCELLED = -32800
+
+
+class ReplayClient(Client):
+    """Client answering the requests of the server with the responses of the recorded client"""
+
+    def __init__(
+        self, recorded_responses: Dict[str, List[Dict[str, Any]]], *args, **kwargs
+    ):
+        self.recorded_responses = recorded_responses
+        self._responses_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def on_server_request(self, message: Dict[str, Any]) -> None:
+        with self._responses_lock:
+            responses = self.recorded_responses.get(message["method"])
+            response = responses.pop(0) if responses else {"result": None}
+        self.send({"id": message["id"], **response})
+
+
+def get_recorded_responses(
+    session: List[Dict[str, Any]]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Return the responses of the recorded client to the server's requests, per method in order"""
+    methods = {
+        entry["message"]["id"]: entry["message"]["method"]
+        for entry in session
+        if entry["direction"] == SENT
+        and "method" in entry["message"]
+        and "id" in entry["message"]
+    }
+    responses: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for entry in session:
+        message = entry["message"]
+        if (
+            entry["direction"] == RECEIVED
+            and "method" not in message
+            and message.get("id") in methods
+        ):
+            responses[methods[message["id"]]].append(
+                {key: message[key] for key in ("result", "error") if key in message}
+            )
+    return responses
+
+
+def replay(args: argparse.Namespace) -> Dict[str, Any]:
+    session = load_session(args.session)
+    messages = [
+        (entry["time"], entry["message"])
+        for entry in session
+        if entry["direction"] == RECEIVED
+        and "method" in entry["message"]
+        and entry["message"]["method"] not in SKIPPED_METHODS
+    ]
+    recorded_responses = {
+        entry["message"]["id"]: (entry["time"], entry["message"])
+        for entry in session
+        if entry["direction"] == SENT and "method" not in entry["message"]
+    }
+    methods = {
+        message["id"]: message["method"] for _, message in messages if "id" in message
+    }
+
+    client = ReplayClient(
+        get_recorded_responses(session),
+        args.server_args,
+        port=args.port if args.tcp else None,
+    )
+    start = time.perf_counter()
+    # (recorded response time, id) of the sent requests that haven't been waited for yet
+    awaited: List[Tuple[float, Any]] = []
+    previous_time, previous_send = None, start
+    for recorded_time, message in messages:
+        ready = []
+        while awaited and awaited[0][0] <= recorded_time:
+            ready.append(heapq.heappop(awaited)[1])
+        client.wait(ready, args.timeout)
+        if previous_time is not None and args.speed > 0 and not args.sequential:
+            delay = (recorded_time - previous_time) / args.speed
+            time.sleep(max(previous_send + delay - time.perf_counter(), 0))
+        client.send(message)
+        previous_time, previous_send = recorded_time, time.perf_counter()
+        if "id" in message:
+            if args.sequential:
+                client.wait([message["id"]], args.timeout)
+            elif message["id"] in recorded_responses:
+                heapq.heappush(
+                    awaited, (recorded_responses[message["id"]][0], message["id"])
+                )
+    client.wait(list(methods), args.timeout)
+    duration = time.perf_counter() - start
+    numeric_ids = [msg_id for msg_id in methods if isinstance(msg_id, int)]
+    client.close(max(numeric_ids, default=0) + 1)
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    changed: Dict[str, int] = defaultdict(int)
+    for msg_id, method in methods.items():
+        if msg_id not in client.responses:
+            errors[method] += 1
+            continue
+        received, response = client.responses[msg_id]
+        latencies[method].append((received - client.sent[msg_id]) * 1000)
+        if "error" in response:
+            # Cancelled requests are part of the session, not failures of the server
+            if response["error"].get("code") != REQUEST_CANCELLED:
+                errors[method] += 1
+        elif msg_id in recorded_responses and response.get(
+            "result"
+        ) != recorded_responses[msg_id][1].get("result"):
+            changed[method] += 1
+
+    return {
+        "session": args.session,
+        "transport": "tcp" if args.tcp else "stdio",
+        "speed": args.speed,
+        "sequential": args.sequential,
+        "duration_ms": duration * 1000,
+        "methods": {
+            method: {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p90": percentile(values, 90),
+                "p99": percentile(values, 99),
+                "max": max(values),
+                "errors": errors[method],
+                "changed": changed[method],
+            }
+            for method, values in sorted(latencies.items())
+        },
+    }
+
+
+def print_results(
+    results: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None
+) -> None:
+    baseline = baseline or {}
+    print(
+        f"replayed {results['session']} over {results['transport']} "
+        f"in {results['duration_ms']:.1f} ms"
+    )
+    for method, stats in results["methods"].items():
+        line = (
+            f"{method:<36} n={stats['count']:<5} p50={stats['p50']:8.2f} ms "
+            f"p90={stats['p90']:8.2f} ms p99={stats['p99']:8.2f} ms "
+            f"max={stats['max']:8.2f} ms errors={stats['errors']} changed={stats['changed']}"
+        )
+        baseline_stats = baseline.get("methods", {}).get(method)
+        if baseline_stats:
+            line += (
+                f" | p50 {stats['p50'] - baseline_stats['p50']:+.2f} ms"
+                f" p99 {stats['p99'] - baseline_stats['p99']:+.2f} ms"
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("session", help="Session recorded with --record")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="Replay speed relative to the recording, 0 sends messages without delay",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Wait for the response of every request before sending the next message",
+    )
+    parser.add_argument("--tcp", action="store_true", help="Connect over TCP")
+    parser.add_argument("--port", type=int, default=2087, help="Port of --tcp")
+    parser.add_argument(
+        "--timeout", type=float, default=60.0, help="Seconds to wait for responses"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="Results of an earlier replay to compare to")
+    parser.add_argument(
+        "--server-args",
+        nargs=argparse.REMAINDER,
+        default=[],
+        help="Arguments passed to the server, e.g. --server-args --lite",
+    )
+    args = parser.parse_args()
+
+    results = replay(args)
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf8") as file:
+            baseline = json.load(file)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w", encoding="utf8") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""Script containing the resolution of variables across a chain of configs and overrides"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+from .document_snapshot import DocumentSnapshot
+from .util import ResolvedValue, VariableLookup, resolve_variable
+
+# Origin of values set by the overrides of the settings
+OVERRIDES_ORIGIN = "spacy-extension.configOverrides"
+
+
+@dataclass
+class ResolutionCache:
+    """Resolved variables of one document and the variables they were resolved from"""
+
+    values: Dict[str, str]  # Values of the document version the cache belongs to
+    resolved: Dict[str, Optional[ResolvedValue]] = field(default_factory=dict)
+    # Variable looked up -> resolved variables depending on it
+    dependents: Dict[str, Set[str]] = field(default_factory=dict)
+
+
+class ConfigChain:
+    """
+    Resolves the variables of documents against a chain of configs and overrides from the settings.
+
+    Variables are looked up in the overrides first, then in the document itself and then in the
+    configs of the chain, later configs first, like merging the configs and applying CLI overrides.
+    The values of the chain configs are only parsed when they change. The resolved values of every
+    document are cached together with the variables they were looked up from, so when a config of
+    the chain, the overrides or the document change, only the values depending on a changed variable
+    are resolved again. Without chain and overrides, variables are resolved within the document.
+    """
+
+    def __init__(self):
+        self.chain: List[str] = []  # Uris of the chain configs, lowest precedence first
+        self.overrides: Dict[str, str] = {}
+        self._layers: Dict[str, Dict[str, str]] = {}
+        self._caches: Dict[str, ResolutionCache] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> bool:
+        return bool(self.chain or self.overrides)
+
+    def configure(
+        self,
+        chain: List[str],
+        overrides: Dict[str, str],
+        layers: Dict[str, Dict[str, str]],
+    ) -> Set[str]:
+        """
+        Replace the chain, its values and the overrides.
+
+        RETURN:
+        affected (Set[str]): The documents with resolved values that were dropped
+        """
+        with self._lock:
+            if chain != self.chain:
+                # The lookup order changed, nothing can be kept
+                affected = set(self._caches)
+                self._caches = {}
+            else:
+                changed = get_changed_variables(self.overrides, overrides)
+                for uri in chain:
+                    changed |= get_changed_variables(
+                        self._layers.get(uri, {}), layers.get(uri, {})
+                    )
+                affected = self._invalidate(changed)
+            self.chain = list(chain)
+            self.overrides = dict(overrides)
+            self._layers = {uri: layers.get(uri, {}) for uri in chain}
+        return affected
+
+    def update_layer(self, uri: str, values: Dict[str, str]) -> Set[str]:
+        """
+        Replace the values of a config of the chain.
+
+        RETURN:
+        affected (Set[str]): The documents with resolved values that were dropped
+        """
+        with self._lock:
+            if uri not in self._layers or self._layers[uri] is values:
+                return set()
+            changed = get_changed_variables(self._layers[uri], values)
+            self._layers[uri] = values
+            affected = set()
+            for doc_uri, cache in self._caches.items():
+                visible = self._get_visible(changed, uri, doc_uri, cache.values)
+                if invalidate(cache, visible):
+                    affected.add(doc_uri)
+            return affected
+
+    def update_document(self, snapshot: DocumentSnapshot) -> Set[str]:
+        """
+        Move the cache of a document to a new version, keeping the values that don't depend on changed variables.
+
+        RETURN:
+        affected (Set[str]): The documents with resolved values that were dropped
+        """
+        if not self.active:
+            return set()
+        values = snapshot.variable_index.values
+        affected = self.update_layer(snapshot.uri, values)
+        with self._lock:
+            cache = self._caches.get(snapshot.uri)
+            if cache is not None and cache.values is not values:
+                if invalidate(cache, get_changed_variables(cache.values, values)):
+                    affected.add(snapshot.uri)
+                cache.values = values
+        return affected
+
+    def remove_document(self, uri: str) -> None:
+        with self._lock:
+            self._caches.pop(uri, None)
+
+    def resolve(
+        self, snapshot: DocumentSnapshot, variable: str
+    ) -> Optional[ResolvedValue]:
+        """Resolve a variable of a document version, None if it can't be resolved"""
+        if not self.active:
+            return snapshot.variable_index.resolve(variable)
+        values = snapshot.variable_index.values
+        with self._lock:
+            lookup = self._get_lookup(snapshot.uri, values)
+            cache = self._caches.get(snapshot.uri)
+            if cache is None:
+                cache = self._caches[snapshot.uri] = ResolutionCache(values)
+            elif cache.values is not values:
+                # Other versions than the cached one are resolved without caching
+                return resolve_variable(variable, lookup)
+            if variable not in cache.resolved:
+                dependencies: Set[str] = set()
+                cache.resolved[variable] = resolve_variable(
+                    variable, lookup, dependencies
+                )
+                for dependency in dependencies:
+                    cache.dependents.setdefault(dependency, set()).add(variable)
+            return cache.resolved[variable]
+
+    def _get_lookup(self, uri: str, values: Dict[str, str]) -> VariableLookup:
+        # Configs of the chain only see the configs before them
+        chain = self.chain[: self.chain.index(uri)] if uri in self.chain else self.chain
+        layers = [(self.overrides, OVERRIDES_ORIGIN), (values, None)] + [
+            (self._layers[chain_uri], chain_uri) for chain_uri in reversed(chain)
+        ]
+
+        def lookup(variable: str):
+            for layer_values, origin in layers:
+                value = layer_values.get(variable)
+                if value is not None:
+                    return value, origin
+            return None
+
+        return lookup
+
+    def _get_visible(
+        self, changed: Set[str], layer_uri: str, uri: str, values: Dict[str, str]
+    ) -> Set[str]:
+        """Return the changed variables of a chain config that aren't shadowed for a document"""
+        position = self.chain.index(layer_uri)
+        # Configs of the chain only see the configs before them
+        end = self.chain.index(uri) if uri in self.chain else len(self.chain)
+        if end <= position:
+            return set()
+        shadowing = [self.overrides, values] + [
+            self._layers[chain_uri] for chain_uri in self.chain[position + 1 : end]
+        ]
+        return {
+            variable
+            for variable in changed
+            if not any(variable in layer_values for layer_values in shadowing)
+        }
+
+    def _invalidate(self, changed: Set[str]) -> Set[str]:
+        return {
+            uri for uri, cache in self._caches.items() if invalidate(cache, changed)
+        }
+
+
+def invalidate(cache: ResolutionCache, changed: Set[str]) -> bool:
+    """Drop the resolved values depending on changed variables, returning whether any were dropped"""
+    dropped = False
+    for variable in changed:
+        for dependent in cache.dependents.pop(variable, ()):
+            # Undefined variables are cached as None and depend on the variables they weren't found in
+            if dependent in cache.resolved:
+                del cache.resolved[dependent]
+                dropped = True
+    return dropped
+
+
+def get_changed_variables(old: Dict[str, str], new: Dict[str, str]) -> Set[str]:
+    """Return the variables that were added, removed or changed"""
+    if old is new:
+        return set()
+    return {
+        variable
+        for variable in old.keys() | new.keys()
+        if old.get(variable) != new.get(variable)
+    }
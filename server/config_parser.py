@@ -0,0 +1,174 @@
+"""Script containing the streaming parser checking large configs line by line"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from .util import SECTION_REGEX, VARIABLE_REGEX
+
+# Like configparser, keys and values can be separated by "=" or ":"
+KEY_VALUE_REGEX = re.compile(r"^([^\s=:#;\[][^=:]*?)\s*[=:]\s*(.*)$")
+# Parsing stops after this many errors
+MAX_ERRORS = 20
+
+
+@dataclass
+class ConfigSection:
+    """Raw values of one section of a config"""
+
+    name: str
+    line: int  # Line of the section header
+    offset: int  # Character offset of the section header in the document
+    end_line: int = -1  # Line after the last line of the section
+    values: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class ParseError:
+    line: int
+    start: int
+    end: int
+    message: str
+
+
+class StreamingConfigParser:
+    """
+    Parses a config line by line, yielding every section as soon as it's complete.
+
+    Unlike `Config().from_str`, the document isn't split into a list of lines and no config tree is built:
+    only the values of the current section are kept, plus the names of all sections and keys to check
+    duplicates and variables across sections. Parsing stops after `max_errors` errors, so the first
+    errors of a large document are found without reading the rest of it.
+    Checks the errors `Config().from_str` raises while parsing, not the values against the registries.
+    """
+
+    def __init__(self, source: str, max_errors: int = MAX_ERRORS):
+        self.source = source
+        self.max_errors = max_errors
+        self.errors: List[ParseError] = []
+        self._sections: Set[str] = set()
+        self._keys: Set[str] = set()
+        # Checked at the end: (parent, section, line) of sections defined before their parent
+        self._missing_parents: List[Tuple[str, str, int]] = []
+        # Checked at the end: variables referenced before they're defined
+        self._forward_references: List[Tuple[str, int, int, int]] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.errors) >= self.max_errors
+
+    def sections(self) -> Iterator[ConfigSection]:
+        """Parse the config, yielding every section once it's complete"""
+        section: Optional[ConfigSection] = None
+        key: Optional[str] = None
+        for line_no, offset, line in iter_lines(self.source):
+            if self.done:
+                return
+            stripped = line.strip()
+            if not stripped or stripped[0] in "#;":
+                continue
+            if line[0].isspace() and section is not None and key is not None:
+                # Indented lines continue the value of the previous key
+                section.values[key] += f"\n{stripped}"
+                self._check_variables(line, line_no)
+                continue
+
+            section_match = SECTION_REGEX.match(stripped)
+            if section_match:
+                if section is not None:
+                    section.end_line = line_no
+                    yield section
+                section = ConfigSection(section_match.group(1).strip(), line_no, offset)
+                key = None
+                self._add_section(section.name, line_no, line)
+                continue
+
+            key_value_match = KEY_VALUE_REGEX.match(stripped)
+            if key_value_match is None:
+                self._add_error(line_no, line, "Expected a section or `key = value`")
+            elif section is None:
+                self._add_error(line_no, line, "Value outside of a section")
+            else:
+                key = key_value_match.group(1).strip()
+                self._add_key(section, key, key_value_match.group(2), line_no, line)
+
+        if section is not None:
+            section.end_line = line_no + 1
+            yield section
+        if not self.done:
+            self._check_forward_references()
+
+    def check(self) -> List[ParseError]:
+        """Parse the whole config and return the first errors by line"""
+        for _ in self.sections():
+            pass
+        return sorted(self.errors, key=lambda error: error.line)[: self.max_errors]
+
+    def _add_section(self, name: str, line_no: int, line: str) -> None:
+        if name in self._sections:
+            self._add_error(line_no, line, f"Section '{name}' is already defined")
+            return
+        if name in self._keys:
+            self._add_error(line_no, line, f"'{name}' is already defined as a value")
+        parent = name.rpartition(".")[0]
+        if parent and parent not in self._sections:
+            self._missing_parents.append((parent, name, line_no))
+        self._sections.add(name)
+
+    def _add_key(
+        self, section: ConfigSection, key: str, value: str, line_no: int, line: str
+    ) -> None:
+        if key in section.values:
+            self._add_error(
+                line_no,
+                line,
+                f"Key '{key}' is already defined in section '{section.name}'",
+            )
+            return
+        name = f"{section.name}.{key}"
+        if name in self._sections:
+            self._add_error(line_no, line, f"'{name}' is already defined as a section")
+        section.values[key] = value.strip()
+        self._keys.add(name)
+        self._check_variables(line, line_no)
+
+    def _check_variables(self, line: str, line_no: int) -> None:
+        if "${" not in line:
+            return
+        for match in VARIABLE_REGEX.finditer(line):
+            variable = match.group(1)
+            if variable not in self._keys and variable not in self._sections:
+                self._forward_references.append(
+                    (variable, line_no, match.start(), match.end())
+                )
+
+    def _check_forward_references(self) -> None:
+        for parent, name, line_no in self._missing_parents:
+            if parent not in self._sections:
+                self._add_error(
+                    line_no, f"[{name}]", f"Section '{parent}' is not defined"
+                )
+        for variable, line_no, start, end in self._forward_references:
+            if variable not in self._keys and variable not in self._sections:
+                self.errors.append(
+                    ParseError(
+                        line_no, start, end, f"Variable '{variable}' is not defined"
+                    )
+                )
+
+    def _add_error(self, line_no: int, line: str, message: str) -> None:
+        self.errors.append(ParseError(line_no, 0, len(line.rstrip()), message))
+
+
+def iter_lines(source: str) -> Iterator[Tuple[int, int, str]]:
+    """Yield the number, offset and text without line break of every line, without splitting the whole source"""
+    offset = 0
+    line_no = 0
+    length = len(source)
+    while offset < length:
+        end = source.find("\n", offset)
+        if end == -1:
+            end = length
+        yield line_no, offset, source[offset:end].rstrip("\r")
+        offset = end + 1
+        line_no += 1
@@ -0,0 +1,215 @@
+"""Script containing the worker process that runs spaCy's fill-config and debug-config on configs"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Seconds a task may run before the worker is restarted
+TIMEOUT = 60.0
+# Maximum address space of the worker in bytes (only enforced on POSIX)
+MEMORY_LIMIT = 4 * 1024**3
+
+
+@dataclass(frozen=True)
+class ConfigError:
+    # Path of the value the error refers to, e.g. ("training", "max_epochs")
+    loc: Tuple[str, ...]
+    msg: str
+
+
+class ConfigWorkerError(Exception):
+    """Raised when the worker couldn't finish a task, e.g. because it timed out or ran out of memory"""
+
+
+class ConfigWorker:
+    """
+    Persistent process with spaCy already imported that runs fill-config and debug-config.
+
+    Resolving a config can import plugins, build models and run arbitrary registered functions,
+    so it runs outside of the server. Tasks that take longer than the timeout or exceed the memory limit
+    kill the worker, which is restarted in the background for the next task.
+    """
+
+    def __init__(
+        self, timeout: float = TIMEOUT, memory_limit: Optional[int] = MEMORY_LIMIT
+    ):
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self._context = multiprocessing.get_context("spawn")
+        self._process: Optional[multiprocessing.process.BaseProcess] = None
+        self._connection: Optional[Connection] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the worker if it isn't running, importing spaCy in the background"""
+        if self._process is not None and self._process.is_alive():
+            return
+        connection, worker_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=run_worker,
+            args=(worker_connection, self.memory_limit),
+            name="spacy-config-worker",
+            daemon=True,
+        )
+        self._process.start()
+        worker_connection.close()
+        self._connection = connection
+
+    def stop(self) -> None:
+        """Kill the worker"""
+        if self._process is not None:
+            self._process.kill()
+            self._process.join()
+            self._process = None
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def fill_config(self, source: str) -> Tuple[Optional[str], List[ConfigError]]:
+        """
+        Auto-fill a config with all default values.
+
+        RETURN:
+        result (Tuple[Optional[str], List[ConfigError]]): The filled config, or None and the errors that prevented filling it
+        """
+        return self._run("fill_config", source)
+
+    def debug_config(self, source: str) -> List[ConfigError]:
+        """Validate a config including its [initialize] and [training] blocks and return its errors"""
+        return self._run("debug_config", source)
+
+    def _run(self, task: str, source: str) -> Any:
+        with self._lock:
+            self.start()
+            assert self._connection is not None
+            try:
+                self._connection.send((task, source))
+                if not self._connection.poll(self.timeout):
+                    self.stop()
+                    raise ConfigWorkerError(
+                        f"The config worker timed out after {self.timeout:g} seconds"
+                    )
+                status, result = self._connection.recv()
+            except (EOFError, OSError) as e:
+                self.stop()
+                raise ConfigWorkerError(f"The config worker stopped unexpectedly: {e}")
+            if status == "error":
+                # The worker exits after running out of memory
+                self.stop()
+                raise ConfigWorkerError(result)
+            return result
+
+
+def run_worker(connection: Connection, memory_limit: Optional[int]) -> None:
+    """Main loop of the worker process"""
+    redirect_stdout()
+    if memory_limit is not None:
+        try:
+            import resource
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ImportError, ValueError, OSError) as e:
+            logging.warning(f"Can't limit the memory of the config worker: {e}")
+    # Import spaCy before the first task arrives
+    import spacy  # noqa: F401
+
+    while True:
+        try:
+            task, source = connection.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            connection.send(("ok", TASKS[task](source)))
+        except MemoryError:
+            connection.send(("error", "The config worker ran out of memory"))
+            return
+
+
+def redirect_stdout() -> None:
+    """
+    Send everything written to stdout to stderr instead.
+
+    The worker inherits the server's stdout, which is the JSON-RPC channel when the server runs over stdio,
+    so output of spaCy, plugins or registered functions would corrupt the messages sent to the client.
+    """
+    try:
+        os.dup2(2, 1)
+    except OSError:
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, 1)
+        os.close(devnull)
+
+
+def fill_config(source: str) -> Tuple[Optional[str], List[ConfigError]]:
+    """Same as `spacy init fill-config`"""
+    from spacy import util
+
+    try:
+        config = util.load_config_from_str(source)
+        nlp = util.load_model_from_config(config, auto_fill=True, validate=False)
+        # Load a second time with validation to make sure the filled config is valid
+        nlp = util.load_model_from_config(nlp.config)
+        filled = nlp.config
+        # Sourced components are replaced with their config when loading, add them back
+        filled["components"].update(util.get_sourced_components(config))
+        return filled.to_str(), []
+    except MemoryError:
+        # Handled by the worker, which exits to be restarted
+        raise
+    except Exception as e:
+        return None, get_config_errors(e)
+
+
+def debug_config(source: str) -> List[ConfigError]:
+    """Same as `spacy debug config`"""
+    from spacy import registry, util
+    from spacy.schemas import ConfigSchemaInit, ConfigSchemaTraining
+
+    try:
+        config = util.load_config_from_str(source)
+        nlp = util.load_model_from_config(config)
+        config = nlp.config.interpolate()
+    except MemoryError:
+        raise
+    except Exception as e:
+        return get_config_errors(e)
+    for section, schema in (
+        ("initialize", ConfigSchemaInit),
+        ("training", ConfigSchemaTraining),
+    ):
+        try:
+            resolved = registry.resolve(config[section], schema=schema)
+            if section == "training":
+                dot_names = [resolved["train_corpus"], resolved["dev_corpus"]]
+                util.resolve_dot_names(config, dot_names)
+        except MemoryError:
+            raise
+        except Exception as e:
+            return get_config_errors(e, parent=section)
+    return []
+
+
+def get_config_errors(e: Exception, parent: Optional[str] = None) -> List[ConfigError]:
+    """Convert an exception raised while loading a config to ConfigErrors"""
+    from confection import ConfigValidationError
+
+    if not isinstance(e, ConfigValidationError) or not e.errors:
+        return [ConfigError((), str(e).strip() or type(e).__name__)]
+    prefix = (e.parent or parent or "").split(".")
+    return [
+        ConfigError(
+            tuple(str(key) for key in [*prefix, *error.get("loc", [])] if key != ""),
+            error.get("msg", ""),
+        )
+        for error in e.errors
+    ]
+
+
+TASKS: Dict[str, Callable[[str], Any]] = {
+    "fill_config": fill_config,
+    "debug_config": debug_config,
+}
@@ -0,0 +1,61 @@
+"""Script containing the debouncer running expensive work after a burst of edits"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class Debouncer:
+    """
+    Runs a function for a key once no newer function was scheduled for the key within a delay.
+
+    Scheduling a function replaces the pending function of its key and restarts the delay, so a burst
+    of edits only runs the last one. Functions are passed to `submit` (e.x. the server's thread pool)
+    when their delay expires, functions of the same key never run at the same time.
+    """
+
+    def __init__(self, delay: float, submit: Callable[[Callable[[], Any]], Any]):
+        self.delay = delay
+        self.submit = submit
+        self._timers: Dict[Hashable, threading.Timer] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def schedule(self, key: Hashable, function: Callable[[], Any]) -> None:
+        """Run a function for a key after the delay, replacing the pending function of the key"""
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.delay, self._expire, (key, function))
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+
+    def run(self, key: Hashable, function: Callable[[], Any]) -> None:
+        """Submit a function for a key right away, after the running function of the key"""
+        self.submit(lambda: self._run(key, function))
+
+    def cancel(self, key: Hashable) -> None:
+        """Drop the pending function of a key, a function that is already running finishes"""
+        with self._lock:
+            timer = self._timers.pop(key, None)
+            if timer is not None:
+                timer.cancel()
+
+    def _expire(self, key: Hashable, function: Callable[[], Any]) -> None:
+        # Runs in the timer's thread, which was replaced if the function was scheduled again meanwhile
+        with self._lock:
+            if self._timers.get(key) is not threading.current_thread():
+                return
+            del self._timers[key]
+        self.run(key, function)
+
+    def _run(self, key: Hashable, function: Callable[[], Any]) -> None:
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            try:
+                function()
+            except Exception as e:
+                logging.error(f"Failed to run the update of {key}: {e}")
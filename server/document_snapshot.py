@@ -0,0 +1,172 @@
+"""Script containing the document state shared between the feature handlers"""
+
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+from lsprotocol.types import Position, Range
+
+from confection import Config
+
+try:
+    from functools import cached_property
+except ImportError:  # Python 3.7
+    cached_property = property  # type:ignore
+
+from .util import SectionIndex, VariableIndex
+
+# Properties of a snapshot derived from its source only
+SOURCE_PROPERTIES = ("lines", "variable_index", "section_index")
+
+
+@dataclass(frozen=True)
+class DocumentSnapshot:
+    """
+    State of one version of a document.
+
+    Snapshots are never modified after they're created, changes create a new snapshot.
+    Handlers running in different threads can therefore read a snapshot without locking.
+    The config is shared between snapshots and must not be mutated either.
+    """
+
+    uri: str
+    version: Optional[int]
+    source: str
+    # Config of the latest validation, can be from an older version of the document
+    config: Optional[Config] = None
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """Lines of this version including their line breaks, split on first access"""
+        return self.source.splitlines(True)
+
+    @cached_property
+    def variable_index(self) -> VariableIndex:
+        """Index of the variables of this version, built on first access"""
+        return VariableIndex(self.source)
+
+    @cached_property
+    def section_index(self) -> SectionIndex:
+        """Index of the sections of this version, built on first access"""
+        return SectionIndex(self.lines)
+
+    def with_config(self, config: Optional[Config]) -> "DocumentSnapshot":
+        """Return a copy of the snapshot with another config, keeping the indices that were already built"""
+        snapshot = replace(self, config=config)
+        # cached_property stores its value in the instance dict
+        for name in SOURCE_PROPERTIES:
+            if name in self.__dict__:
+                snapshot.__dict__[name] = self.__dict__[name]
+        return snapshot
+
+
+class DocumentStore:
+    """
+    Latest snapshot of every open document.
+
+    Updates replace the snapshot of a document under a lock, reads take the current snapshot without locking.
+    """
+
+    def __init__(self):
+        self._snapshots: Dict[str, DocumentSnapshot] = {}
+        self._lock = threading.Lock()
+        # Most recently opened or edited document
+        self.latest_uri: Optional[str] = None
+
+    def get(self, uri: str) -> Optional[DocumentSnapshot]:
+        """Return the latest snapshot of a document or None if the document isn't known"""
+        return self._snapshots.get(uri)
+
+    def update_text(
+        self, uri: str, version: Optional[int], source: str
+    ) -> Tuple[Optional[DocumentSnapshot], DocumentSnapshot]:
+        """
+        Store a new version of a document, keeping the config of the previous snapshot.
+
+        RETURN:
+        snapshots (Tuple[Optional[DocumentSnapshot], DocumentSnapshot]): The previous and the current snapshot
+        """
+        with self._lock:
+            old_snapshot = self._snapshots.get(uri)
+            if old_snapshot is not None and _is_newer(old_snapshot.version, version):
+                # A newer version has already been stored
+                return old_snapshot, old_snapshot
+            snapshot = DocumentSnapshot(
+                uri, version, source, old_snapshot.config if old_snapshot else None
+            )
+            self._snapshots[uri] = snapshot
+            self.latest_uri = uri
+            return old_snapshot, snapshot
+
+    def update_config(
+        self, uri: str, version: Optional[int], source: str, config: Optional[Config]
+    ) -> DocumentSnapshot:
+        """
+        Store the validated config of a document version.
+
+        If the document changed since the validated version, the config is added to the newer snapshot.
+        """
+        with self._lock:
+            old_snapshot = self._snapshots.get(uri)
+            if old_snapshot is not None and (
+                _is_newer(old_snapshot.version, version)
+                or (old_snapshot.version == version and old_snapshot.source == source)
+            ):
+                # Keep the indices of the stored snapshot, the chain caches values per variable index
+                snapshot = old_snapshot.with_config(config)
+            else:
+                snapshot = DocumentSnapshot(uri, version, source, config)
+            self._snapshots[uri] = snapshot
+            return snapshot
+
+    def remove(self, uri: str) -> None:
+        """Forget a closed document"""
+        with self._lock:
+            self._snapshots.pop(uri, None)
+            if self.latest_uri == uri:
+                self.latest_uri = None
+
+
+def _is_newer(version: Optional[int], other_version: Optional[int]) -> bool:
+    return version is not None and other_version is not None and version > other_version
+
+
+class FetchedRanges:
+    """
+    Ranges the client has fetched inlay hints for since the last refresh, per document.
+
+    Overlapping ranges are merged, so scrolling back and forth doesn't grow the ranges compared after an edit.
+    """
+
+    def __init__(self):
+        self._ranges: Dict[str, List[Range]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, uri: str, range: Range) -> None:
+        start = (range.start.line, range.start.character)
+        end = (range.end.line, range.end.character)
+        with self._lock:
+            ranges = []
+            for other in self._ranges.get(uri, []):
+                other_start = (other.start.line, other.start.character)
+                other_end = (other.end.line, other.end.character)
+                if other_end < start or other_start > end:
+                    ranges.append(other)
+                else:
+                    start, end = min(start, other_start), max(end, other_end)
+            ranges.append(
+                Range(
+                    start=Position(line=start[0], character=start[1]),
+                    end=Position(line=end[0], character=end[1]),
+                )
+            )
+            ranges.sort(key=lambda range: (range.start.line, range.start.character))
+            self._ranges[uri] = ranges
+
+    def get(self, uri: str) -> List[Range]:
+        with self._lock:
+            return list(self._ranges.get(uri, []))
+
+    def remove(self, uri: str) -> None:
+        with self._lock:
+            self._ranges.pop(uri, None)
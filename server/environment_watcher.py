@@ -0,0 +1,180 @@
+"""Script containing the watcher that keeps the registry catalogue in sync with the python environment"""
+
+import importlib
+import logging
+import os
+import sys
+import threading
+from configparser import ConfigParser, Error as ConfigParserError
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .registry_catalogue import RegistryCatalogue, registry_catalogue
+
+# Files inside a distribution's metadata folder that change when it's (re)installed
+WATCHED_METADATA_FILES = ("entry_points.txt", "RECORD")
+# Entry point groups are prefixed with the package that owns the registry, e.g. "spacy_architectures"
+ENTRY_POINT_PREFIXES = ("spacy_", "thinc_")
+
+
+@dataclass(frozen=True)
+class DistributionState:
+    mtimes: Tuple[Optional[float], ...]  # mtimes of the WATCHED_METADATA_FILES
+    entry_point_groups: FrozenSet[
+        str
+    ]  # entry point groups provided by the distribution
+
+
+class EnvironmentWatcher:
+    """
+    Watches the metadata of installed distributions and refreshes the registries
+    of the catalogue affected by newly installed packages.
+
+    Only additions are picked up: functions of removed packages stay in catalogue's global registry,
+    and modules of upgraded packages that were already imported aren't reloaded, so their entries
+    don't change until the server is restarted.
+
+    The check runs periodically on a background thread. Refreshed registries are swapped into
+    the catalogue atomically, so requests keep being served from the old entries in the meantime.
+    """
+
+    def __init__(
+        self,
+        catalogue: RegistryCatalogue = registry_catalogue,
+        paths: Optional[List[str]] = None,
+        interval: float = 5.0,
+        on_refresh: Optional[Callable[[Set[str]], None]] = None,
+    ):
+        self.catalogue = catalogue
+        self.paths = paths
+        self.interval = interval
+        self.on_refresh = on_refresh
+        self._distributions: Dict[str, DistributionState] = {}
+        self._distributions = self._scan()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start checking the environment in a background thread"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="spacy-environment-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def check(self) -> Set[str]:
+        """
+        Compare the environment against the last check and refresh the affected registries.
+
+        RETURN:
+        refreshed (Set[str]): The names of the refreshed registries
+        """
+        distributions = self._scan()
+        changed_groups: Set[str] = set()
+        for path in distributions.keys() | self._distributions.keys():
+            old_state = self._distributions.get(path)
+            new_state = distributions.get(path)
+            if old_state == new_state:
+                continue
+            for state in (old_state, new_state):
+                if state is not None:
+                    changed_groups.update(state.entry_point_groups)
+        self._distributions = distributions
+
+        registry_names = self.get_registry_names(changed_groups)
+        if registry_names:
+            logging.debug(f"Refreshing registries {sorted(registry_names)}")
+            # Let the import system and catalogue pick up the new metadata and modules
+            importlib.invalidate_caches()
+            reload_entry_points()
+            self.catalogue.refresh(registry_names)
+            if self.on_refresh is not None:
+                self.on_refresh(registry_names)
+        return registry_names
+
+    def get_registry_names(self, entry_point_groups: Iterable[str]) -> Set[str]:
+        """Map entry point groups (e.g. "spacy_architectures") to registry names of the catalogue"""
+        groups = set(entry_point_groups)
+        return {
+            registry_name
+            for registry_name, group in self.catalogue.get_entry_point_groups().items()
+            if group in groups
+        }
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logging.error(f"Failed to refresh registries: {e}")
+
+    def _scan(self) -> Dict[str, DistributionState]:
+        """Collect the state of every distribution on the search path"""
+        distributions = {}
+        for path in self.paths if self.paths is not None else sys.path:
+            if not path or not os.path.isdir(path):
+                continue
+            try:
+                dir_entries = list(os.scandir(path))
+            except OSError:
+                continue
+            for dir_entry in dir_entries:
+                if not dir_entry.name.endswith((".dist-info", ".egg-info")):
+                    continue
+                mtimes = read_metadata_mtimes(dir_entry.path)
+                state = self._distributions.get(dir_entry.path)
+                # Only parse the entry points of distributions that changed
+                if state is None or state.mtimes != mtimes:
+                    state = DistributionState(
+                        mtimes, read_entry_point_groups(dir_entry.path)
+                    )
+                distributions[dir_entry.path] = state
+        return distributions
+
+
+def read_metadata_mtimes(path: str) -> Tuple[Optional[float], ...]:
+    """Return the mtimes of the watched metadata files of a distribution"""
+    mtimes: List[Optional[float]] = []
+    for file_name in WATCHED_METADATA_FILES:
+        try:
+            mtimes.append(os.stat(os.path.join(path, file_name)).st_mtime)
+        except OSError:
+            mtimes.append(None)
+    return tuple(mtimes)
+
+
+def read_entry_point_groups(path: str) -> FrozenSet[str]:
+    """Return the registry entry point groups provided by a distribution"""
+    entry_points_path = os.path.join(path, "entry_points.txt")
+    if not os.path.exists(entry_points_path):
+        return frozenset()
+    parser = ConfigParser(delimiters=("=",), interpolation=None)
+    try:
+        parser.read(entry_points_path, encoding="utf8")
+    except (ConfigParserError, UnicodeDecodeError):
+        return frozenset()
+    return frozenset(
+        section
+        for section in parser.sections()
+        if section.startswith(ENTRY_POINT_PREFIXES)
+    )
+
+
+def reload_entry_points() -> None:
+    """
+    Re-read the entry points used by the registries.
+
+    catalogue only reads the available entry points once on import,
+    so entry points of packages installed afterwards are never found without this.
+    """
+    import catalogue  # type:ignore[import]
+
+    catalogue.AVAILABLE_ENTRY_POINTS = catalogue.importlib_metadata.entry_points()
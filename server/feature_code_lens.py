@@ -0,0 +1,143 @@
+"""Script containing all logic for code lens functionality"""
+
+from lsprotocol.types import (
+    CodeLens,
+    CodeLensParams,
+    Command,
+    Position,
+    Range,
+)
+
+import functools
+import hashlib
+from typing import List, Mapping, Optional, Tuple
+from catalogue import importlib_metadata  # type:ignore[import]
+from .document_snapshot import DocumentSnapshot
+from .registry_catalogue import registry_catalogue
+from .spacy_server import SpacyLanguageServer
+from .util import KEY_VALUE_REGEX, SECTION_REGEX
+
+# The cache is cleared once it holds this many blocks
+MAX_CACHED_LENSES = 10000
+
+
+def code_lens(snapshot: DocumentSnapshot, params: CodeLensParams) -> List[CodeLens]:
+    """
+    Implements the Code Lens functionality, adding an unresolved lens to every [components.*] block
+    with a registered function. The registry is only looked up when the client resolves a lens.
+    """
+    lenses = []
+    for line_n, block_lines in iter_component_blocks(snapshot.lines):
+        function = get_block_function(block_lines)
+        if function is None:
+            continue
+        registry_name, func_name = function
+        header = snapshot.lines[line_n].rstrip("\r\n")
+        lenses.append(
+            CodeLens(
+                range=Range(
+                    start=Position(line=line_n, character=0),
+                    end=Position(line=line_n, character=len(header)),
+                ),
+                data={
+                    "hash": hash_block(block_lines),
+                    "registry_name": registry_name,
+                    "func_name": func_name,
+                },
+            )
+        )
+    return lenses
+
+
+def resolve_code_lens(server: SpacyLanguageServer, lens: CodeLens) -> CodeLens:
+    """
+    Resolve the registered function of a lens, cached by the block's content hash and the registry generation.
+    """
+    data = lens.data or {}
+    block_hash = str(data.get("hash", ""))
+    generation = registry_catalogue.generation
+    cached = server.code_lens_cache.get(block_hash)
+    if cached is None or cached[0] != generation:
+        command = Command(
+            title=get_lens_title(data.get("registry_name"), data.get("func_name")),
+            # Lenses without a command id are shown as plain text
+            command="",
+        )
+        if len(server.code_lens_cache) >= MAX_CACHED_LENSES:
+            server.code_lens_cache.clear()
+        server.code_lens_cache[block_hash] = (generation, command)
+        cached = server.code_lens_cache[block_hash]
+    lens.command = cached[1]
+    return lens
+
+
+def get_lens_title(registry_name: Optional[str], func_name: Optional[str]) -> str:
+    """Describe the registered function of a block, e.x. "factory ner · spacy 3.5.4" """
+    if not registry_name or not func_name:
+        return "⚠ No registered function"
+    label = "factory" if registry_name == "factories" else f"@{registry_name}"
+    registry_entry = registry_catalogue.find(registry_name, func_name)
+    if registry_entry is None:
+        return f"⚠ {label} {func_name} not found in the registry"
+    package = get_package(registry_entry.module, registry_catalogue.generation)
+    if package is None:
+        return f"{label} {registry_entry.func_name}"
+    return f"{label} {registry_entry.func_name} · {package[0]} {package[1]}"
+
+
+def iter_component_blocks(lines: List[str]):
+    """Yield the line of the header and the lines of every [components.*] block, sub-sections not included"""
+    start = None
+    for line_n, line in enumerate(lines):
+        section_match = SECTION_REGEX.match(line)
+        if section_match is None:
+            continue
+        if start is not None:
+            yield start, lines[start:line_n]
+        start = (
+            line_n if section_match.group(1).strip().startswith("components.") else None
+        )
+    if start is not None:
+        yield start, lines[start:]
+
+
+def get_block_function(block_lines: List[str]) -> Optional[Tuple[str, str]]:
+    """Return the registry and name of the block's registered function, e.x. ("factories", "ner")"""
+    for line in block_lines[1:]:
+        key_value_match = KEY_VALUE_REGEX.match(line)
+        if key_value_match is None:
+            continue
+        key = key_value_match.group(1).strip()
+        value = key_value_match.group(2).strip().strip('"')
+        if key.startswith("@"):
+            return key[1:], value
+        if key == "factory":
+            return "factories", value
+    return None
+
+
+def hash_block(block_lines: List[str]) -> str:
+    return hashlib.blake2b(
+        "".join(block_lines).encode("utf8"), digest_size=16
+    ).hexdigest()
+
+
+@functools.lru_cache(maxsize=1)
+def get_distributions(generation: int) -> Mapping[str, List[str]]:
+    """Return the distributions providing every top-level module, read again when the registries are refreshed"""
+    packages_distributions = getattr(importlib_metadata, "packages_distributions", None)
+    return packages_distributions() if packages_distributions else {}
+
+
+@functools.lru_cache(maxsize=1024)
+def get_package(module: Optional[str], generation: int) -> Optional[Tuple[str, str]]:
+    """Return the name and version of the distribution providing a module, e.x. ("spacy", "3.5.4")"""
+    if not module:
+        return None
+    top_level = module.split(".")[0]
+    for name in get_distributions(generation).get(top_level, [top_level]):
+        try:
+            return name, importlib_metadata.version(name)
+        except importlib_metadata.PackageNotFoundError:
+            continue
+    return None
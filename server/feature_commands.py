@@ -0,0 +1,159 @@
+"""Script containing all logic for the fill-config and debug-config commands"""
+
+from lsprotocol.types import (
+    Diagnostic,
+    DiagnosticSeverity,
+    MessageType,
+    OptionalVersionedTextDocumentIdentifier,
+    Position,
+    Range,
+    TextDocumentEdit,
+    TextEdit,
+    WorkspaceEdit,
+)
+
+from typing import Any, List, Optional, Sequence, Tuple
+from .config_worker import ConfigError, ConfigWorkerError
+from .document_snapshot import DocumentSnapshot
+from .spacy_server import SpacyLanguageServer
+from .util import KEY_VALUE_REGEX, SECTION_REGEX
+
+FILL_CONFIG_COMMAND = "spacy.fillConfig"
+DEBUG_CONFIG_COMMAND = "spacy.debugConfig"
+
+
+def fill_config(server: SpacyLanguageServer, snapshot: DocumentSnapshot) -> bool:
+    """
+    Auto-fill the config of a document with all default values and apply it as a workspace edit.
+
+    RETURN:
+    filled (bool): Whether the config could be filled
+    """
+    try:
+        filled, errors = server.config_worker.fill_config(snapshot.source)
+    except ConfigWorkerError as e:
+        server.show_message(f"Fill config failed: {e}", MessageType.Error)
+        return False
+    publish_config_errors(server, snapshot, errors)
+    if filled is None:
+        server.show_message("Fill config failed: config not valid", MessageType.Warning)
+        return False
+    if filled == snapshot.source:
+        server.show_message("Nothing to auto-fill: config is already complete")
+        return True
+
+    # The client rejects the edit if the document changed in the meantime
+    edit = TextDocumentEdit(
+        text_document=OptionalVersionedTextDocumentIdentifier(
+            uri=snapshot.uri, version=snapshot.version
+        ),
+        edits=[
+            TextEdit(
+                range=Range(
+                    start=Position(line=0, character=0),
+                    end=Position(line=len(snapshot.lines), character=0),
+                ),
+                new_text=filled,
+            )
+        ],
+    )
+    server.apply_edit(WorkspaceEdit(document_changes=[edit]), "Fill config")
+    return True
+
+
+def debug_config(server: SpacyLanguageServer, snapshot: DocumentSnapshot) -> bool:
+    """
+    Validate the config of a document like `spacy debug config` and publish the errors as diagnostics.
+
+    RETURN:
+    valid (bool): Whether the config is valid
+    """
+    try:
+        errors = server.config_worker.debug_config(snapshot.source)
+    except ConfigWorkerError as e:
+        server.show_message(f"Debug config failed: {e}", MessageType.Error)
+        return False
+    publish_config_errors(server, snapshot, errors)
+    if errors:
+        server.show_message(
+            f"Config not valid: {len(errors)} error(s)", MessageType.Warning
+        )
+    else:
+        server.show_message("Config is valid")
+    return not errors
+
+
+def get_command_uri(
+    server: SpacyLanguageServer, arguments: Sequence[Any]
+) -> Optional[str]:
+    """Return the document uri passed to a command, or the most recently edited document"""
+    if arguments and isinstance(arguments[0], str):
+        return arguments[0]
+    return server.documents.latest_uri
+
+
+def publish_config_errors(
+    server: SpacyLanguageServer,
+    snapshot: DocumentSnapshot,
+    errors: List[ConfigError],
+):
+    """Publish the errors of a config as diagnostics, clearing them if there are none"""
+    diagnostics = [
+        Diagnostic(
+            range=find_location(snapshot.lines, error.loc),
+            message=" -> ".join(error.loc + (error.msg,)),
+            severity=DiagnosticSeverity.Error,
+            source="spaCy",
+        )
+        for error in errors
+    ]
+    server.publish_diagnostics(snapshot.uri, diagnostics)
+
+
+def find_location(lines: List[str], loc: Tuple[str, ...]) -> Range:
+    """
+    Find the line of the value an error refers to.
+
+    Errors of components refer to the factory name instead of the component name, so sections
+    are matched by the end of their name. Falls back to the section, or the first line of the document.
+    """
+    sections: List[Tuple[str, int]] = []
+    for line_no, line in enumerate(lines):
+        section_match = SECTION_REGEX.match(line)
+        if section_match:
+            sections.append((section_match.group(1).strip(), line_no))
+
+    for split in range(len(loc) - 1, 0, -1):
+        section_name = ".".join(loc[:split])
+        for section, line_no in sections:
+            if section == section_name or section.endswith(f".{section_name}"):
+                key_line_no = find_key(lines, loc[split], start=line_no + 1)
+                return line_range(
+                    lines, line_no if key_line_no is None else key_line_no
+                )
+
+    # Errors of the [nlp] block only refer to the key
+    if len(loc) == 1:
+        key_line_no = find_key(lines, loc[0])
+        if key_line_no is not None:
+            return line_range(lines, key_line_no)
+    return line_range(lines, 0)
+
+
+def find_key(lines: List[str], key: str, start: Optional[int] = None) -> Optional[int]:
+    """Return the line of a key within the section starting at a line, or anywhere in the document"""
+    for line_no in range(start or 0, len(lines)):
+        if start is not None and SECTION_REGEX.match(lines[line_no]):
+            return None
+        key_value_match = KEY_VALUE_REGEX.match(lines[line_no])
+        if key_value_match and key_value_match.group(1).strip() == key:
+            return line_no
+    return None
+
+
+def line_range(lines: List[str], line_no: int) -> Range:
+    length = len(lines[line_no].rstrip("\r\n")) if line_no < len(lines) else 0
+    return Range(
+        start=Position(line=line_no, character=0),
+        end=Position(line=line_no, character=length),
+    )
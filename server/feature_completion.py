@@ -0,0 +1,68 @@
+"""Script containing all logic for completion functionality"""
+
+from lsprotocol.types import (
+    CompletionItem,
+    CompletionItemKind,
+    CompletionList,
+    CompletionParams,
+    MarkupContent,
+    MarkupKind,
+)
+
+import re
+from typing import Optional
+from .document_snapshot import DocumentSnapshot
+from .registry_catalogue import registry_catalogue
+from .util import get_config_block
+
+# Matches the start of a line while a key is typed
+KEY_PREFIX_REGEX = re.compile(r"^\w*$")
+
+
+def completion(
+    snapshot: DocumentSnapshot, params: CompletionParams
+) -> Optional[CompletionList]:
+    """
+    Implements the Completion functionality, offering the arguments of the block's registered function that aren't set yet
+    """
+    line_n = params.position.line
+    if line_n >= len(snapshot.lines):
+        return None
+    if not KEY_PREFIX_REGEX.match(snapshot.lines[line_n][: params.position.character]):
+        return None
+
+    config_block = get_config_block(snapshot.lines, line_n, snapshot.section_index)
+    if (
+        config_block is None
+        or config_block.func_name is None
+        or line_n == config_block.start
+    ):
+        return None
+    registry_entry = registry_catalogue.find(
+        config_block.registry_name, config_block.func_name  # type:ignore[arg-type]
+    )
+    if registry_entry is None:
+        return None
+
+    items = []
+    for i, parameter in enumerate(registry_entry.parameters.values()):
+        # The key on the current line is the one being typed
+        if config_block.keys.get(parameter.name, line_n) != line_n:
+            continue
+        default = parameter.default if parameter.default is not None else ""
+        items.append(
+            CompletionItem(
+                label=parameter.name,
+                kind=CompletionItemKind.Property,
+                detail=parameter.annotation,
+                documentation=MarkupContent(
+                    kind=MarkupKind.Markdown, value=parameter.description
+                )
+                if parameter.description
+                else None,
+                insert_text=f"{parameter.name} = {default}",
+                # Keep the order of the signature
+                sort_text=f"{i:04d}",
+            )
+        )
+    return CompletionList(is_incomplete=False, items=items)
@@ -11,12 +11,22 @@ from lsprotocol.types import (
 )
 
 import re
-from typing import Optional
-from spacy import registry, schemas, glossary
-from .spacy_server import SpacyLanguageServer
-from .util import get_current_word, SpanInfo, format_docstrings
+from typing import Any, List, Optional
+from .document_snapshot import DocumentSnapshot
+from .metadata_snapshot import get_section_titles
+from .registry_catalogue import registry_catalogue
+from .span_detection import LineSpans
+from .util import (
+    KEY_VALUE_REGEX,
+    SectionIndex,
+    get_config_block,
+    get_current_word,
+    SpanInfo,
+    VariableResolver,
+    format_docstrings,
+    format_origin,
+)
 from dataclasses import dataclass
-from catalogue import RegistryError  # type:ignore[import]
 
 # TODO: glossary for now, to be replaced with glossary.CONFIG_DESCRIPTIONS from spacy
 CONFIG_DESCRIPTIONS = {
@@ -32,32 +42,40 @@ CONFIG_DESCRIPTIONS = {
 
 
 def hover(
-    server: SpacyLanguageServer, params: TextDocumentPositionParams
+    snapshot: DocumentSnapshot,
+    params: TextDocumentPositionParams,
+    resolve: Optional[VariableResolver] = None,
 ) -> Optional[Hover]:
     """
-    Implements the Hover functionality
+    Implements the Hover functionality, resolving variables with the config chain if a resolver is passed
     """
-    document = server.workspace.get_document(params.text_document.uri)
-
-    if not document:
-        return None
-
     # get the config as a dictinary
-    config_dict = server.config
+    config_dict = snapshot.config
 
     line_n = params.position.line
-    line_str = document.lines[line_n]
+    if line_n >= len(snapshot.lines):
+        return None
+    line_str = snapshot.lines[line_n]
     current_span = get_current_word(line_str, params.position.character)
 
-    hover_object = registry_resolver(
-        line_str, current_span.span_string, current_span.start, current_span.end
+    hover_object = argument_resolver(
+        snapshot.lines,
+        line_n,
+        current_span.span_string,
+        current_span.start,
+        current_span.end,
+        snapshot.section_index,
     )
+    if hover_object is None:
+        hover_object = registry_resolver(
+            line_str, current_span.span_string, current_span.start, current_span.end
+        )
     if hover_object is None:
         hover_object = section_resolver(
             line_str, current_span.span_string, current_span.start, current_span.end
         )
-    if hover_object is None and config_dict != None:
-        hover_object = variable_resolver(line_str, config_dict)  # type:ignore[arg-type]
+    if hover_object is None:
+        hover_object = variable_resolver(line_str, config_dict, resolve)
 
     if hover_object is not None:
         return Hover(
@@ -101,24 +119,21 @@ def registry_resolver(
     if registry_name == "factory":
         registry_name = "factories"
 
-    try:
-        # Retrieve data from registry
-        registry_desc = registry.find(registry_name, registry_func)
-
-    except RegistryError as e:
+    # Retrieve data from the registry catalogue
+    registry_entry = registry_catalogue.find(registry_name, registry_func)
+    if registry_entry is None:
         return None
 
     # get the path to the file and line number of registered function
     registry_link = ""
-    if registry_desc["file"]:  # type:ignore[index]
-        registry_path = registry_desc["file"]  # type:ignore[index]
-        line_no = registry_desc["line_no"]  # type:ignore[index]
+    if registry_entry.file:
+        registry_path = registry_entry.file
+        line_no = registry_entry.line_no
         registry_link = f"[Go to code](file://{registry_path}#L{line_no})"
 
     # find registry description or return no description
     registry_docstring = (
-        registry_desc.get("docstring")  # type:ignore[attr-defined]
-        or "Currently no description available"
+        registry_entry.docstring or "Currently no description available"
     )
 
     # Fix the formatting of docstrings for display in hover
@@ -129,6 +144,59 @@ def registry_resolver(
     return SpanInfo(hover_display, r_start, r_end)
 
 
+def argument_resolver(
+    lines: List[str],
+    line_n: int,
+    current_word: str,
+    w_start: int,
+    w_end: int,
+    section_index: Optional[SectionIndex] = None,
+) -> Optional[SpanInfo]:
+    """
+    Check if currently hovered text is an argument of the block's registered function and return its description.
+
+    ARGUMENTS:
+    lines (List[str]): the lines of the document.
+    line_n (int): the index of the current line.
+    current_word (str): the current word being hovered.
+    w_start (int): The start index of the current_word.
+    w_end (int): The end index of the current_word.
+    section_index (Optional[SectionIndex]): the sections of the document, built from the lines if not passed.
+
+    EXAMPLES:
+    [components.ner.model]
+    @architectures = "spacy.TransitionBasedParser.v2"
+    hidden_width = 64
+    """
+    key_value_match = KEY_VALUE_REGEX.match(lines[line_n])
+    # only the key of the line can be an argument
+    if key_value_match is None or w_start >= key_value_match.end(1):
+        return None
+    argument = key_value_match.group(1).strip()
+    if argument != current_word:
+        return None
+
+    config_block = get_config_block(lines, line_n, section_index)
+    if config_block is None or config_block.func_name is None:
+        return None
+    registry_entry = registry_catalogue.find(
+        config_block.registry_name, config_block.func_name  # type:ignore[arg-type]
+    )
+    if registry_entry is None or argument not in registry_entry.parameters:
+        return None
+
+    parameter = registry_entry.parameters[argument]
+    signature = f"{argument}: {parameter.annotation or 'Any'}"
+    if parameter.default is not None:
+        signature += f" = {parameter.default}"
+    description = parameter.description or "Currently no description available"
+    hover_display = (
+        f"### (*argument*) {argument}\n\n`{signature}`\n\n{description}\n\n"
+        f"Argument of `{config_block.func_name}`"
+    )
+    return SpanInfo(hover_display, w_start, w_end)
+
+
 def detect_registry_func(
     line: str, current_word: str, w_start: int, w_end: int
 ) -> Optional[SpanInfo]:
@@ -186,16 +254,8 @@ def detect_registry_name(line: str, registry_start: int) -> str:
     factory
     """
 
-    if registry_start <= 0:
-        return ""
-
-    for i in range(registry_start - 1, 0, -1):
-        if re.match(r"\W", line[i]):
-            continue
-        else:
-            type_span = get_current_word(line, i)
-            return type_span.span_string
-    return ""
+    type_span = LineSpans(line).word_before(registry_start)
+    return type_span.span_string if type_span is not None else ""
 
 
 def section_resolver(
@@ -215,13 +275,6 @@ def section_resolver(
     [training.batcher.size]
     """
 
-    config_schemas = {
-        "nlp": schemas.ConfigSchemaNlp,
-        "training": schemas.ConfigSchemaTraining,
-        "pretraining": schemas.ConfigSchemaPretrain,
-        "initialize": schemas.ConfigSchemaInit,
-    }
-
     # match the section titles, always start with a bracket and more than 1 character
     if line_str[0] != "[" or len(current_word) <= 1:
         return None
@@ -237,13 +290,11 @@ def section_resolver(
             f"(*section*) **{current_word}**: {CONFIG_DESCRIPTIONS[current_word]}"
         )
         return SpanInfo(hover_display, w_start, w_end)
-    elif current_word == sub_section and main_section in config_schemas.keys():
+    elif current_word == sub_section:
         # get field title from the config schema
-        field_title = (
-            config_schemas[main_section]
-            .__fields__[sub_section]  # type:ignore[attr-defined]
-            .field_info.title
-        )
+        field_title = get_section_titles().get(main_section, {}).get(sub_section)
+        if field_title is None:
+            return None
         hover_display = (
             f"(*section*) {main_section} -> **{sub_section}**: {field_title}"
         )
@@ -254,14 +305,16 @@ def section_resolver(
 
 def variable_resolver(
     line_str: str,
-    config_dict: dict,
+    config_dict: Optional[dict],
+    resolve: Optional[VariableResolver] = None,
 ) -> Optional[SpanInfo]:
     """
     Check if current hovered text is a variable and then return it's value.
 
     ARGUMENTS:
     line_str (str): the current line as a string.
-    config_dict (dict): the config file as a dictionary
+    config_dict (Optional[dict]): the config file as a dictionary, None if it isn't valid
+    resolve (Optional[VariableResolver]): resolves variables with the config chain and overrides
 
     EXAMPLES:
     ${system.seed}
@@ -278,13 +331,29 @@ def variable_resolver(
     variable_list = variable_match.group(0).split(".")
     v_start = variable_match.span()[0]
     v_end = variable_match.span()[1] - 1
+    variable = ".".join(variable_list)
 
-    # get value for final item in the variable from nested config dict
-    for key in variable_list[:-1]:
-        config_dict = config_dict.setdefault(key, {})
-    variable_value = config_dict[variable_list[-1]]
-
-    hover_display = (
-        f"(*variable*) **{'.'.join(variable_list)}**: `{str(variable_value)}`"
-    )
+    # values from the config chain or the overrides aren't part of the config dict
+    resolved_value = resolve(variable) if resolve is not None else None
+    if resolved_value is not None and resolved_value.origin is not None:
+        hover_display = (
+            f"(*variable*) **{variable}**: `{resolved_value.value}`\n\n"
+            f"From {format_origin(resolved_value.origin)}"
+        )
+        return SpanInfo(hover_display, v_start, v_end)
+    if config_dict is None:
+        if resolved_value is None:
+            return None
+        hover_display = f"(*variable*) **{variable}**: `{resolved_value.value}`"
+        return SpanInfo(hover_display, v_start, v_end)
+
+    # get value for final item in the variable from nested config dict,
+    # the config is shared between threads and must not be modified
+    variable_value: Any = config_dict
+    for key in variable_list:
+        if not isinstance(variable_value, dict) or key not in variable_value:
+            return None
+        variable_value = variable_value[key]
+
+    hover_display = f"(*variable*) **{variable}**: `{str(variable_value)}`"
     return SpanInfo(hover_display, v_start, v_end)
@@ -0,0 +1,155 @@
+"""Script containing all logic for inlay hint functionality"""
+
+from lsprotocol.types import (
+    InlayHint,
+    InlayHintParams,
+    MarkupContent,
+    MarkupKind,
+    Position,
+    Range,
+    WORKSPACE_INLAY_HINT_REFRESH,
+)
+
+import functools
+from typing import Iterator, List, Optional, Set, Tuple
+from .spacy_server import SpacyLanguageServer
+from .document_snapshot import DocumentSnapshot
+from .util import (
+    Interpolation,
+    ResolvedValue,
+    VariableIndex,
+    VariableResolver,
+    format_origin,
+)
+
+# Maximum length of the value shown in the hint label
+MAX_LABEL_LENGTH = 40
+
+
+def inlay_hints(
+    server: SpacyLanguageServer, snapshot: DocumentSnapshot, params: InlayHintParams
+) -> List[InlayHint]:
+    """
+    Implements the Inlay Hint functionality, showing the resolved values of variables within the requested range
+    """
+    resolve = functools.partial(server.config_chain.resolve, snapshot)
+    server.inlay_hint_ranges.add(snapshot.uri, params.range)
+    return [
+        create_hint(interpolation, resolved_value)
+        for interpolation, resolved_value in resolve_range(
+            snapshot.variable_index, resolve, params.range
+        )
+    ]
+
+
+def resolve_range(
+    index: VariableIndex, resolve: VariableResolver, range: Range
+) -> Iterator[Tuple[Interpolation, ResolvedValue]]:
+    """Yield every interpolation within a range that can be resolved, with its resolved value"""
+    for interpolation in index.in_range(range):
+        resolved_value = resolve(interpolation.variable)
+        if resolved_value is not None:
+            yield interpolation, resolved_value
+
+
+def create_hint(
+    interpolation: Interpolation, resolved_value: ResolvedValue
+) -> InlayHint:
+    """Create the hint of a resolved interpolation"""
+    line, character, label = get_hint_label(interpolation, resolved_value)
+    chain = " → ".join(f"`{variable}`" for variable in resolved_value.chain)
+    tooltip = f"(*variable*) {chain} → `{resolved_value.value}`"
+    if resolved_value.origin is not None:
+        tooltip += f"\n\nFrom {format_origin(resolved_value.origin)}"
+    return InlayHint(
+        position=Position(line=line, character=character),
+        label=label,
+        tooltip=MarkupContent(
+            kind=MarkupKind.Markdown,
+            value=tooltip,
+        ),
+        padding_left=True,
+    )
+
+
+def get_hint_label(
+    interpolation: Interpolation, resolved_value: ResolvedValue
+) -> Tuple[int, int, str]:
+    """
+    Return the position and label of the hint of a resolved interpolation.
+
+    The hint is placed after the interpolation and shows the value on a single line,
+    e.x. (4, 20, '= "corpus/train.spacy"').
+    """
+    value = resolved_value.value.replace("\n", " ")
+    if len(value) > MAX_LABEL_LENGTH:
+        value = value[: MAX_LABEL_LENGTH - 1] + "…"
+    return interpolation.line, interpolation.end, f"= {value}"
+
+
+def hint_labels(
+    index: VariableIndex, resolve: VariableResolver, range: Range
+) -> List[Tuple[int, int, str]]:
+    """Return the position and label of every hint within a range"""
+    return [
+        get_hint_label(interpolation, resolved_value)
+        for interpolation, resolved_value in resolve_range(index, resolve, range)
+    ]
+
+
+def refresh_inlay_hints(
+    server: SpacyLanguageServer,
+    old_snapshot: Optional[DocumentSnapshot],
+    new_snapshot: DocumentSnapshot,
+) -> bool:
+    """
+    Ask the client to refresh its inlay hints if a document change affects hints it has already fetched.
+
+    RETURN:
+    refreshed (bool): Whether a refresh was requested
+    """
+    if not supports_refresh(server):
+        return False
+
+    fetched_ranges = server.inlay_hint_ranges.get(new_snapshot.uri)
+    if old_snapshot is None or old_snapshot is new_snapshot or not fetched_ranges:
+        return False
+
+    resolve_old = functools.partial(server.config_chain.resolve, old_snapshot)
+    resolve_new = functools.partial(server.config_chain.resolve, new_snapshot)
+    for range in fetched_ranges:
+        old_labels = hint_labels(old_snapshot.variable_index, resolve_old, range)
+        new_labels = hint_labels(new_snapshot.variable_index, resolve_new, range)
+        if old_labels != new_labels:
+            # The client fetches the hints of its visible ranges again after a refresh
+            server.inlay_hint_ranges.remove(new_snapshot.uri)
+            server.lsp.send_request(WORKSPACE_INLAY_HINT_REFRESH)
+            return True
+    return False
+
+
+def refresh_documents_hints(server: SpacyLanguageServer, uris: Set[str]) -> bool:
+    """
+    Ask the client to refresh its inlay hints if it has fetched hints of documents whose resolved values changed,
+    e.x. after a config of the chain or the overrides changed.
+
+    RETURN:
+    refreshed (bool): Whether a refresh was requested
+    """
+    if not supports_refresh(server):
+        return False
+    if not any(server.inlay_hint_ranges.get(uri) for uri in uris):
+        return False
+    for uri in uris:
+        server.inlay_hint_ranges.remove(uri)
+    server.lsp.send_request(WORKSPACE_INLAY_HINT_REFRESH)
+    return True
+
+
+def supports_refresh(server: SpacyLanguageServer) -> bool:
+    workspace_capabilities = server.client_capabilities.workspace
+    return bool(
+        workspace_capabilities
+        and workspace_capabilities.inlay_hint
+        and workspace_capabilities.inlay_hint.refresh_support
+    )
@@ -1,10 +1,61 @@
 """Script containing all logic for validation functionality"""
-from lsprotocol.types import DidOpenTextDocumentParams
+from lsprotocol.types import (
+    Diagnostic,
+    DiagnosticSeverity,
+    DidOpenTextDocumentParams,
+    Position,
+    Range,
+)
 
-from thinc.api import Config
+from confection import Config
 from typing import Optional
+from .config_parser import MAX_ERRORS, StreamingConfigParser
 from .spacy_server import SpacyLanguageServer
 
+# Documents of at least this many characters are checked by the streaming parser instead
+STREAMING_SIZE = 1_000_000
+
+
+def validate_document(
+    server: SpacyLanguageServer, uri: str, source: str
+) -> Optional[Config]:
+    """
+    Validate a document and return its Config object.
+
+    Large documents (e.x. generated configs with thousands of components) are checked line by line
+    instead of building their config, the first errors are published as diagnostics.
+    No Config object is returned for them, hover falls back to the variable index.
+    """
+    if len(source) < STREAMING_SIZE:
+        if uri in server.streamed_documents:
+            # Clear the errors of the streaming parser, smaller configs only report validation in the log
+            server.streamed_documents.discard(uri)
+            server.publish_diagnostics(uri, [])
+        return validate_config(server, source)
+    server.streamed_documents.add(uri)
+    errors = StreamingConfigParser(source, MAX_ERRORS).check()
+    server.publish_diagnostics(
+        uri,
+        [
+            Diagnostic(
+                range=Range(
+                    start=Position(line=error.line, character=error.start),
+                    end=Position(line=error.line, character=error.end),
+                ),
+                message=error.message,
+                severity=DiagnosticSeverity.Error,
+                source="spaCy",
+            )
+            for error in errors
+        ],
+    )
+    if errors:
+        server.show_message_log("Validation Unsuccessful")
+        server.show_message("Warning: Config not valid ")
+    else:
+        server.show_message_log("Validation Successful")
+    return None
+
 
 def validate_config(
     server: SpacyLanguageServer, cfg: Optional[str]
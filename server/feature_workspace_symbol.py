@@ -0,0 +1,175 @@
+"""Script containing all logic for workspace symbol functionality"""
+
+from lsprotocol.types import (
+    PROGRESS,
+    Location,
+    Position,
+    ProgressParams,
+    Range,
+    SymbolInformation,
+    SymbolKind,
+    WorkspaceSymbolParams,
+)
+from pygls.uris import from_fs_path, to_fs_path
+
+import logging
+import os
+from typing import Iterator, List, Optional
+from .registry_catalogue import registry_catalogue
+from .spacy_server import SpacyLanguageServer
+from .symbol_index import MAX_RESULTS, Symbol
+
+# Symbols found in configs and registries, searched separately to stream config results first
+CONFIG_SYMBOL_KINDS = {"section", "reference"}
+REGISTRY_SYMBOL_KINDS = {"function"}
+SYMBOL_KINDS = {
+    "section": SymbolKind.Module,
+    "reference": SymbolKind.Property,
+    "function": SymbolKind.Function,
+}
+# Directories that never contain configs of the workspace
+SKIPPED_DIRECTORIES = {"node_modules", "__pycache__", "site-packages"}
+
+
+def workspace_symbol(
+    server: SpacyLanguageServer, params: WorkspaceSymbolParams
+) -> List[SymbolInformation]:
+    """
+    Implements the Workspace Symbol functionality, searching the sections and functions of all configs and registries.
+
+    If the client passed a partial result token, the symbols of configs are sent first, followed by
+    the registered functions once the registries are indexed, and the final result is empty.
+    """
+    index = server.symbol_index
+    if params.partial_result_token is None:
+        index_registries(server)
+        return to_symbol_information(index.search(params.query))
+
+    config_symbols = index.search(params.query, kinds=CONFIG_SYMBOL_KINDS)
+    send_partial_result(server, params, config_symbols)
+    index_registries(server)
+    registry_symbols = index.search(
+        params.query,
+        limit=max(MAX_RESULTS - len(config_symbols), 0),
+        kinds=REGISTRY_SYMBOL_KINDS,
+    )
+    send_partial_result(server, params, registry_symbols)
+    return []
+
+
+def send_partial_result(
+    server: SpacyLanguageServer, params: WorkspaceSymbolParams, symbols: List[Symbol]
+) -> None:
+    if symbols:
+        server.send_notification(
+            PROGRESS,
+            ProgressParams(
+                token=params.partial_result_token,  # type:ignore[arg-type]
+                value=to_symbol_information(symbols),
+            ),
+        )
+
+
+def to_symbol_information(symbols: List[Symbol]) -> List[SymbolInformation]:
+    return [
+        SymbolInformation(
+            name=symbol.name,
+            kind=SYMBOL_KINDS[symbol.kind],
+            location=Location(
+                uri=symbol.uri,
+                range=Range(
+                    start=Position(line=symbol.line, character=0),
+                    end=Position(line=symbol.line, character=0),
+                ),
+            ),
+            container_name=symbol.container or None,
+        )
+        for symbol in symbols
+    ]
+
+
+def index_registries(server: SpacyLanguageServer) -> None:
+    """Index the functions of all registries if they changed since they were last indexed"""
+    generation = registry_catalogue.generation
+    if server.symbol_index_generation == generation:
+        return
+    for registry_name in registry_catalogue.get_registry_names():
+        server.symbol_index.update(
+            f"registry:{registry_name}",
+            (
+                Symbol(
+                    entry.func_name,
+                    "function",
+                    registry_name,
+                    from_fs_path(entry.file),
+                    entry.line_no - 1 if entry.line_no else 0,
+                )
+                for entry in registry_catalogue.get_registry(registry_name).values()
+                # Functions without a source file can't be navigated to
+                if entry.file is not None
+            ),
+        )
+    server.symbol_index_generation = generation
+
+
+def index_document(server: SpacyLanguageServer, uri: str, source: str) -> None:
+    """Replace the symbols of a config with the symbols of its current text"""
+    server.symbol_index.update_config(uri, source)
+
+
+def index_file(server: SpacyLanguageServer, uri: str) -> None:
+    """Index a config from disk unless it's open, open configs are indexed as they're edited"""
+    if server.documents.get(uri) is not None:
+        return
+    path = to_fs_path(uri)
+    source = read_config(path) if path is not None else None
+    if source is None:
+        server.symbol_index.remove(uri)
+    else:
+        index_document(server, uri, source)
+
+
+def index_workspace(
+    server: SpacyLanguageServer, folder_uris: Optional[List[str]] = None
+) -> None:
+    """Index the configs in the given or all workspace folders"""
+    if folder_uris is None:
+        folder_uris = [folder.uri for folder in server.workspace.folders.values()]
+        if not folder_uris and server.workspace.root_uri:
+            folder_uris = [server.workspace.root_uri]
+    for folder_uri in folder_uris:
+        folder_path = to_fs_path(folder_uri)
+        if folder_path is None:
+            continue
+        for path in find_configs(folder_path):
+            index_file(server, from_fs_path(path))
+
+
+def remove_folder(server: SpacyLanguageServer, folder_uri: str) -> None:
+    """Remove the configs of a folder that was removed from the workspace, unless they're open"""
+    prefix = folder_uri.rstrip("/") + "/"
+    for source in server.symbol_index.get_sources():
+        if source.startswith(prefix) and server.documents.get(source) is None:
+            server.symbol_index.remove(source)
+
+
+def find_configs(root_path: str) -> Iterator[str]:
+    for dir_path, dir_names, file_names in os.walk(root_path):
+        # Skip hidden directories like .git or .venv
+        dir_names[:] = [
+            dir_name
+            for dir_name in dir_names
+            if not dir_name.startswith(".") and dir_name not in SKIPPED_DIRECTORIES
+        ]
+        for file_name in file_names:
+            if file_name.endswith(".cfg"):
+                yield os.path.join(dir_path, file_name)
+
+
+def read_config(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="utf8") as file:
+            return file.read()
+    except (OSError, UnicodeDecodeError) as e:
+        logging.info(f"Can't index config {path}: {e}")
+        return None
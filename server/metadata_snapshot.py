@@ -0,0 +1,161 @@
+"""Script containing the metadata snapshot that lets the server answer requests without importing spaCy"""
+
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional
+
+from .environment_watcher import read_entry_point_groups, read_metadata_mtimes
+from .registry_catalogue import RegistryCatalogue, RegistryEntry, registry_catalogue
+
+# Incremented when the layout of the snapshot changes
+SNAPSHOT_FORMAT = 2
+# Sections of the config with a schema describing their sub-sections
+CONFIG_SCHEMAS = {
+    "nlp": "ConfigSchemaNlp",
+    "training": "ConfigSchemaTraining",
+    "pretraining": "ConfigSchemaPretrain",
+    "initialize": "ConfigSchemaInit",
+}
+
+_section_titles: Optional[Dict[str, Dict[str, Optional[str]]]] = None
+_section_titles_lock = threading.Lock()
+
+
+def get_spacy_version() -> Optional[str]:
+    """Return the installed spaCy version without importing spaCy"""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python 3.7
+        from importlib_metadata import PackageNotFoundError, version  # type:ignore
+
+    try:
+        return version("spacy")
+    except PackageNotFoundError:
+        return None
+
+
+def get_default_snapshot_path() -> str:
+    """Return the snapshot path for the installed spaCy version in the user's cache directory"""
+    cache_dir = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    python_version = f"{sys.version_info.major}.{sys.version_info.minor}"
+    return os.path.join(
+        cache_dir,
+        "spacy-vscode",
+        f"metadata-spacy-{get_spacy_version()}-py{python_version}.json",
+    )
+
+
+def get_environment_fingerprint(paths: Optional[List[str]] = None) -> List[List[Any]]:
+    """
+    Return the metadata folders and mtimes of the installed distributions providing registry entry points.
+
+    Installing, upgrading or removing a spaCy plugin changes the fingerprint, even if spaCy's version stays the same.
+
+    RETURN:
+    fingerprint (List[List[Any]]): The folder names and metadata mtimes, e.x. [["spacy_legacy-3.0.12.dist-info", [1686.0, 1686.0]]]
+    """
+    fingerprint = []
+    for path in paths if paths is not None else sys.path:
+        if not path or not os.path.isdir(path):
+            continue
+        try:
+            dir_entries = list(os.scandir(path))
+        except OSError:
+            continue
+        for dir_entry in dir_entries:
+            if dir_entry.name.endswith(
+                (".dist-info", ".egg-info")
+            ) and read_entry_point_groups(dir_entry.path):
+                fingerprint.append(
+                    [dir_entry.name, list(read_metadata_mtimes(dir_entry.path))]
+                )
+    return sorted(fingerprint)
+
+
+def get_section_titles() -> Dict[str, Dict[str, Optional[str]]]:
+    """Return the titles of the sub-sections described by the config schemas, importing spaCy if no snapshot is loaded"""
+    global _section_titles
+    if _section_titles is None:
+        with _section_titles_lock:
+            if _section_titles is None:
+                from spacy import schemas
+
+                _section_titles = {
+                    section: {
+                        field_name: field.field_info.title
+                        for field_name, field in getattr(
+                            schemas, schema_name
+                        ).__fields__.items()
+                    }
+                    for section, schema_name in CONFIG_SCHEMAS.items()
+                }
+    return _section_titles
+
+
+def build_snapshot(catalogue: Optional[RegistryCatalogue] = None) -> Dict[str, Any]:
+    """Collect the entries of all registries and the section titles, importing spaCy"""
+    catalogue = catalogue or RegistryCatalogue()
+    registries: Dict[str, Dict[str, Any]] = {}
+    for entry in catalogue:
+        registries.setdefault(entry.registry_name, {})[
+            entry.func_name
+        ] = entry.to_dict()
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "spacy_version": get_spacy_version(),
+        "environment": get_environment_fingerprint(),
+        "registries": registries,
+        "section_titles": get_section_titles(),
+    }
+
+
+def write_snapshot(path: str) -> None:
+    """Build the snapshot and write it to a file"""
+    snapshot = build_snapshot()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Write to a temporary file first so servers starting in parallel never read a partial snapshot
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf8") as file:
+        json.dump(snapshot, file)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, catalogue: RegistryCatalogue = registry_catalogue) -> bool:
+    """
+    Serve the registry catalogue and section titles from a snapshot file.
+
+    RETURN:
+    loaded (bool): Whether the snapshot could be loaded, False if it's missing or built for another spaCy version or set of plugins
+    """
+    global _section_titles
+    try:
+        with open(path, encoding="utf8") as file:
+            snapshot = json.load(file)
+    except (OSError, ValueError) as e:
+        logging.info(f"Can't read metadata snapshot {path}: {e}")
+        return False
+    if (
+        snapshot.get("format") != SNAPSHOT_FORMAT
+        or snapshot.get("spacy_version") != get_spacy_version()
+        or snapshot.get("environment") != get_environment_fingerprint()
+    ):
+        logging.info(f"Metadata snapshot {path} is outdated")
+        return False
+
+    catalogue.load_snapshot(
+        {
+            registry_name: {
+                func_name: RegistryEntry.from_dict(registry_name, data)
+                for func_name, data in entries.items()
+            }
+            for registry_name, entries in snapshot["registries"].items()
+        }
+    )
+    with _section_titles_lock:
+        _section_titles = snapshot["section_titles"]
+    return True
@@ -0,0 +1,190 @@
+"""Script containing the on-demand profiler of the server's feature handlers"""
+
+import asyncio
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import sys
+import tempfile
+import threading
+from collections import Counter
+from types import FrameType
+from typing import Any, Callable, Optional, Set
+
+START_PROFILING_COMMAND = "spacy.startProfiling"
+STOP_PROFILING_COMMAND = "spacy.stopProfiling"
+# cProfile stats of every handler call, readable with pstats or snakeviz
+PSTATS = "pstats"
+# Sampled stacks in the collapsed format ("frame;frame;frame count"), readable with flamegraph tools
+COLLAPSED = "collapsed"
+OUTPUT_FORMATS = (PSTATS, COLLAPSED)
+# Seconds between two samples of the handler stacks
+SAMPLING_INTERVAL = 0.005
+
+
+class HandlerProfiler:
+    """
+    Profiles the feature handlers of the running server on demand.
+
+    In "pstats" mode every handler call runs under its own cProfile profiler and the stats are merged.
+    In "collapsed" mode a background thread samples the stacks of the threads that are running
+    a handler, which adds almost no overhead to the handlers themselves.
+    Handlers that start while the profiler is stopped run unchanged.
+    Python 3.12+ only allows one active cProfile profiler, so in "pstats" mode handlers running in parallel
+    to a profiled one aren't profiled and are counted in `n_skipped` instead.
+    """
+
+    def __init__(self):
+        self.path: Optional[str] = None
+        self.output_format: Optional[str] = None
+        self.n_calls = 0
+        # Handler calls that couldn't be profiled
+        self.n_skipped = 0
+        self._lock = threading.Lock()
+        self._stats: Optional[pstats.Stats] = None
+        self._stacks: Counter = Counter()
+        # Threads running a handler, sampled in collapsed mode
+        self._running_threads: Set[int] = set()
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.output_format is not None
+
+    def start(self, path: Optional[str] = None, output_format: str = PSTATS) -> str:
+        """
+        Start profiling the handlers.
+
+        ARGUMENTS:
+        path (Optional[str]): The file the profile is written to when stopped, in the temp directory by default.
+        output_format (str): "pstats" to profile with cProfile or "collapsed" to sample the stacks of the handlers.
+
+        RETURN:
+        path (str): The file the profile is written to
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unknown profile format '{output_format}', expected one of {', '.join(OUTPUT_FORMATS)}"
+            )
+        with self._lock:
+            if self.running:
+                raise ValueError(f"Already profiling to {self.path}")
+            self.path = path or os.path.join(
+                tempfile.gettempdir(), f"spacy-server-{os.getpid()}.{output_format}"
+            )
+            self.n_calls = 0
+            self.n_skipped = 0
+            self._stats = None
+            self._stacks = Counter()
+            self.output_format = output_format
+        if output_format == COLLAPSED:
+            self._stop_sampling.clear()
+            self._sampler = threading.Thread(
+                target=self._sample, name="handler-profiler", daemon=True
+            )
+            self._sampler.start()
+        return self.path
+
+    def stop(self) -> Optional[str]:
+        """
+        Stop profiling and write the profile.
+
+        RETURN:
+        path (Optional[str]): The file the profile was written to, None if no handler was called
+        """
+        with self._lock:
+            if not self.running:
+                raise ValueError("Profiler isn't running")
+            output_format = self.output_format
+            self.output_format = None
+        if self._sampler is not None:
+            self._stop_sampling.set()
+            self._sampler.join()
+            self._sampler = None
+        if self.n_calls == 0:
+            return None
+        assert self.path is not None
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if output_format == PSTATS:
+            assert self._stats is not None
+            self._stats.dump_stats(self.path)
+        else:
+            with open(self.path, "w", encoding="utf8") as file:
+                for stack, count in sorted(self._stacks.items()):
+                    file.write(f"{stack} {count}\n")
+        return self.path
+
+    def wrap(self, handler: Callable) -> Callable:
+        """Return the handler profiled according to the current mode"""
+        if not self.running or asyncio.iscoroutinefunction(handler):
+            return handler
+
+        @functools.wraps(handler)
+        def profile_handler(*args, **kwargs):
+            if self.output_format == PSTATS:
+                return self._run_cprofile(handler, args, kwargs)
+            if self.output_format == COLLAPSED:
+                thread_id = threading.get_ident()
+                with self._lock:
+                    self._running_threads.add(thread_id)
+                    self.n_calls += 1
+                try:
+                    return handler(*args, **kwargs)
+                finally:
+                    self._running_threads.discard(thread_id)
+            return handler(*args, **kwargs)
+
+        return profile_handler
+
+    def _run_cprofile(self, handler: Callable, args, kwargs) -> Any:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ only allows one active cProfile profiler at a time
+            with self._lock:
+                if self.output_format == PSTATS:
+                    self.n_skipped += 1
+                    if self.n_skipped == 1:
+                        logging.warning(
+                            "Handlers running in parallel to a profiled handler aren't profiled"
+                        )
+            return handler(*args, **kwargs)
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                # Calls finishing after the profiler was stopped aren't added anymore
+                if self.output_format == PSTATS:
+                    self.n_calls += 1
+                    if self._stats is None:
+                        self._stats = pstats.Stats(profile)
+                    else:
+                        self._stats.add(profile)
+
+    def _sample(self) -> None:
+        while not self._stop_sampling.wait(SAMPLING_INTERVAL):
+            frames = sys._current_frames()
+            for thread_id in list(self._running_threads):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self._stacks[get_collapsed_stack(frame)] += 1
+
+
+def get_collapsed_stack(frame: Optional[FrameType]) -> str:
+    """Format the stack from the handler down to the frame as "handler (file:line);frame (file:line)" """
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        # The frames of the thread pool and event loop above the handler are left out
+        if code.co_name == "profile_handler" and code.co_filename == __file__:
+            break
+        stack.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(stack))
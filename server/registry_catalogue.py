@@ -0,0 +1,371 @@
+"""Script containing the catalogue of registered functions used by the server features"""
+
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import types
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from catalogue import RegistryError, Registry  # type:ignore[import]
+
+# Sentinel for lazily loaded attributes that haven't been looked up yet
+_NOT_LOADED: Any = object()
+# Arguments of factories that are passed by spaCy instead of the config
+FACTORY_ARGUMENTS = ("nlp", "name")
+# Module paths within type annotations, e.g. "thinc.model." in "thinc.model.Model"
+MODULE_PATH_REGEX = re.compile(r"\b(?:[A-Za-z_]\w*\.)+(?=[A-Za-z_])")
+
+
+@dataclass(frozen=True)
+class RegistryParameter:
+    """Argument of a registered function that can be set in the config"""
+
+    name: str
+    annotation: Optional[str]  # e.g. "Optional[int]"
+    default: Optional[
+        str
+    ]  # formatted as config value, None if the argument is required
+    description: Optional[str]  # description of the argument from the docstring
+
+
+class RegistryEntry:
+    """
+    Compact record of a single registered function.
+
+    The registry and function names, module and location of functions are stored when the entry is created,
+    the docstring, signature and location of other objects (e.g. classes) are only looked up the first time
+    they're accessed.
+    Strings shared between many entries (registry names, modules, file paths) are interned.
+    """
+
+    __slots__ = (
+        "registry_name",
+        "func_name",
+        "module",
+        "_location",
+        "_func",
+        "_docstring",
+        "_signature",
+        "_parameters",
+    )
+
+    def __init__(self, registry_name: str, func_name: str, func: Callable):
+        self.registry_name = sys.intern(registry_name)
+        self.func_name = func_name
+        self._func: Optional[Callable] = func
+        self._docstring: Optional[str] = _NOT_LOADED
+        self._signature: Optional[inspect.Signature] = _NOT_LOADED
+        self._parameters: Dict[str, RegistryParameter] = _NOT_LOADED
+
+        module = inspect.getmodule(func)
+        self.module = sys.intern(module.__name__) if module else None
+
+        # Read the location from the code object instead of parsing the source file.
+        # Compiled (Cython) functions report a relative path to their source, which can't be linked.
+        self._location: Tuple[Optional[str], Optional[int]] = _NOT_LOADED
+        code = getattr(inspect.unwrap(func), "__code__", None)
+        if isinstance(code, types.CodeType):
+            self._location = (
+                (sys.intern(code.co_filename), code.co_firstlineno)
+                if os.path.isabs(code.co_filename)
+                else (None, None)
+            )
+
+    @property
+    def file(self) -> Optional[str]:
+        """The source file of the registered object, None if it has no source file"""
+        return self.location[0]
+
+    @property
+    def line_no(self) -> Optional[int]:
+        """The first line of the registered object in its source file"""
+        return self.location[1]
+
+    @property
+    def location(self) -> Tuple[Optional[str], Optional[int]]:
+        """The source file and line of objects without a code object (e.g. classes), found on first access"""
+        if self._location is _NOT_LOADED:
+            self._location = get_source_location(self._func)
+        return self._location
+
+    @property
+    def docstring(self) -> Optional[str]:
+        """The cleaned up docstring of the registered function, loaded on first access"""
+        if self._docstring is _NOT_LOADED:
+            docstring = inspect.getdoc(self._func)
+            self._docstring = inspect.cleandoc(docstring) if docstring else None
+        return self._docstring
+
+    @property
+    def signature(self) -> Optional[inspect.Signature]:
+        """The signature of the registered function, loaded on first access"""
+        if self._signature is _NOT_LOADED:
+            try:
+                self._signature = inspect.signature(self._func)  # type:ignore[arg-type]
+            except (TypeError, ValueError):
+                self._signature = None
+        return self._signature
+
+    @property
+    def parameters(self) -> Dict[str, RegistryParameter]:
+        """The arguments that can be set in the config, in order of the signature, extracted on first access"""
+        if self._parameters is _NOT_LOADED:
+            parameters = {}
+            # Defaults of factory arguments are stored in the factory meta instead of the signature
+            factory_defaults = (
+                get_factory_defaults(self.func_name)
+                if self.registry_name == "factories"
+                else {}
+            )
+            if self.signature is not None:
+                for parameter in self.signature.parameters.values():
+                    if parameter.kind in (
+                        inspect.Parameter.VAR_POSITIONAL,
+                        inspect.Parameter.VAR_KEYWORD,
+                    ) or (
+                        self.registry_name == "factories"
+                        and parameter.name in FACTORY_ARGUMENTS
+                    ):
+                        continue
+                    parameters[parameter.name] = RegistryParameter(
+                        parameter.name,
+                        format_annotation(parameter.annotation),
+                        format_default(
+                            factory_defaults.get(parameter.name, parameter.default)
+                        ),
+                        get_parameter_description(self.docstring, parameter.name),
+                    )
+            self._parameters = parameters
+        return self._parameters
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the entry for the metadata snapshot, loading its docstring and parameters"""
+        return {
+            "func_name": self.func_name,
+            "module": self.module,
+            "file": self.file,
+            "line_no": self.line_no,
+            "docstring": self.docstring,
+            "parameters": [asdict(parameter) for parameter in self.parameters.values()],
+        }
+
+    @classmethod
+    def from_dict(cls, registry_name: str, data: Dict[str, Any]) -> "RegistryEntry":
+        """Create an entry from the metadata snapshot, without the registered function"""
+        entry = cls.__new__(cls)
+        entry.registry_name = sys.intern(registry_name)
+        entry.func_name = data["func_name"]
+        entry.module = sys.intern(data["module"]) if data["module"] else None
+        entry._location = (
+            sys.intern(data["file"]) if data["file"] else None,
+            data["line_no"],
+        )
+        entry._func = None
+        entry._docstring = data["docstring"]
+        entry._signature = None
+        entry._parameters = {
+            parameter["name"]: RegistryParameter(**parameter)
+            for parameter in data["parameters"]
+        }
+        return entry
+
+    def __repr__(self) -> str:
+        return f"RegistryEntry({self.registry_name!r}, {self.func_name!r})"
+
+
+def get_source_location(obj: Any) -> Tuple[Optional[str], Optional[int]]:
+    """Return the source file and first line of an object like registry.find, (None, None) if it has no source"""
+    try:
+        file = inspect.getsourcefile(obj)
+        if file is None or not os.path.isabs(file):
+            return None, None
+        _, line_no = inspect.getsourcelines(obj)
+    except (OSError, TypeError):
+        return None, None
+    return sys.intern(file), line_no
+
+
+def get_factory_defaults(factory_name: str) -> Dict[str, Any]:
+    """Return the default config of a factory"""
+    from spacy.language import Language
+
+    try:
+        return Language.get_factory_meta(factory_name).default_config or {}
+    except ValueError:
+        return {}
+
+
+def format_annotation(annotation: Any) -> Optional[str]:
+    """Format a type annotation without module paths, e.g. Model[List[Doc], List[Floats2d]]"""
+    if annotation is inspect.Parameter.empty:
+        return None
+    if not isinstance(annotation, str):
+        annotation = inspect.formatannotation(annotation)
+    return MODULE_PATH_REGEX.sub("", annotation)
+
+
+def format_default(default: Any) -> Optional[str]:
+    """Format a default value the way it's written in a config"""
+    # Blocks like [components.ner.model] are written as sub-sections
+    if default is inspect.Parameter.empty or isinstance(default, dict):
+        return None
+    try:
+        return json.dumps(default)
+    except (TypeError, ValueError):
+        return repr(default)
+
+
+def get_parameter_description(docstring: Optional[str], name: str) -> Optional[str]:
+    """
+    Find the description of an argument in a docstring.
+
+    EXAMPLE:
+    hidden_width (int): The width of the hidden layer.
+    """
+    if not docstring:
+        return None
+    lines = docstring.splitlines()
+    argument_regex = re.compile(rf"^(\s*){re.escape(name)}\s*(?:\(.*?\))?\s*:\s*(.*)$")
+    for i, line in enumerate(lines):
+        argument_match = argument_regex.match(line)
+        if argument_match is None:
+            continue
+        indent = len(argument_match.group(1))
+        description = [argument_match.group(2).strip()]
+        # The description continues on the lines indented below the argument
+        for next_line in lines[i + 1 :]:
+            if (
+                not next_line.strip()
+                or len(next_line) - len(next_line.lstrip()) <= indent
+            ):
+                break
+            description.append(next_line.strip())
+        return " ".join(part for part in description if part) or None
+    return None
+
+
+class RegistryCatalogue:
+    """
+    Catalogue of all functions in spaCy's registries.
+
+    Registries are read the first time a function of theirs is looked up,
+    after which lookups don't touch the registry anymore.
+    The read registries are never modified in place, updates swap in a new mapping,
+    so lookups running in other threads always see a complete snapshot.
+    """
+
+    def __init__(self):
+        self._registries: Dict[str, Dict[str, RegistryEntry]] = {}
+        self._lock = threading.Lock()
+        # Incremented every time registries are refreshed
+        self.generation = 0
+        # Whether the entries were loaded from a metadata snapshot instead of spaCy's registries
+        self.from_snapshot = False
+
+    def find(self, registry_name: str, func_name: str) -> Optional[RegistryEntry]:
+        """
+        Return the entry of a registered function or None if it can't be found.
+
+        ARGUMENTS:
+        registry_name (str): The name of the registry, e.x. "architectures" or "factories".
+        func_name (str): The name of the function within the registry.
+        """
+        entries = self.get_registry(registry_name)
+        entry = entries.get(func_name)
+        # Same fallback to spacy-legacy as spaCy's registry.find
+        if entry is None and func_name.startswith("spacy."):
+            entry = entries.get(func_name.replace("spacy.", "spacy-legacy.", 1))
+        return entry
+
+    def get_registry(self, registry_name: str) -> Dict[str, RegistryEntry]:
+        """Return all entries of a registry, reading the registry if it hasn't been read yet"""
+        entries = self._registries.get(registry_name)
+        if entries is None:
+            with self._lock:
+                entries = self._registries.get(registry_name)
+                if entries is None:
+                    # Registries missing from a snapshot aren't read to avoid importing spaCy
+                    entries = (
+                        {} if self.from_snapshot else self._read_registry(registry_name)
+                    )
+                    self._registries = {**self._registries, registry_name: entries}
+        return entries
+
+    def refresh(self, registry_names: Iterable[str]) -> None:
+        """
+        Re-read registries and swap them in at once.
+
+        ARGUMENTS:
+        registry_names (Iterable[str]): The registries to refresh. Registries that haven't been read yet are skipped.
+        """
+        refreshed = {
+            registry_name: self._read_registry(registry_name)
+            for registry_name in registry_names
+            if registry_name in self._registries
+        }
+        with self._lock:
+            self._registries = {**self._registries, **refreshed}
+            self.generation += 1
+
+    def load_snapshot(self, registries: Dict[str, Dict[str, RegistryEntry]]) -> None:
+        """Replace all registries with the entries of a metadata snapshot"""
+        with self._lock:
+            self._registries = dict(registries)
+            self.from_snapshot = True
+            self.generation += 1
+
+    def get_entry_point_groups(self) -> Dict[str, str]:
+        """Return the entry point group of every registry that accepts entry points"""
+        from spacy import registry
+
+        groups = {}
+        for registry_name in self.get_registry_names():
+            spacy_registry = getattr(registry, registry_name)
+            if spacy_registry.entry_points:
+                groups[registry_name] = spacy_registry.entry_point_namespace
+        # Factories from entry points are added to the internal factories registry when loaded
+        groups["factories"] = registry._entry_point_factories.entry_point_namespace
+        return groups
+
+    def get_registry_names(self) -> List[str]:
+        """Return the names of all available registries"""
+        if self.from_snapshot:
+            return list(self._registries)
+        from spacy import registry
+
+        return registry.get_registry_names()
+
+    def load_all(self) -> None:
+        """Read every registry and load all docstrings and signatures"""
+        for entry in self:
+            entry.docstring
+            entry.signature
+
+    def __iter__(self) -> Iterator[RegistryEntry]:
+        for registry_name in self.get_registry_names():
+            yield from self.get_registry(registry_name).values()
+
+    def _read_registry(self, registry_name: str) -> Dict[str, RegistryEntry]:
+        from spacy import registry
+
+        spacy_registry = getattr(registry, registry_name, None)
+        if not isinstance(spacy_registry, Registry):
+            return {}
+        try:
+            if registry_name == "factories":
+                # Importing factories from entry points registers them as internal factories
+                registry._entry_point_factories.get_all()
+            functions = spacy_registry.get_all()
+        except (RegistryError, ImportError):
+            return {}
+        return {
+            func_name: RegistryEntry(registry_name, func_name, func)
+            for func_name, func in functions.items()
+        }
+
+
+registry_catalogue = RegistryCatalogue()
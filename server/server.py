@@ -1,51 +1,355 @@
 from lsprotocol.types import (
+    INITIALIZE,
+    INITIALIZED,
+    CODE_LENS_RESOLVE,
+    TEXT_DOCUMENT_CODE_LENS,
+    TEXT_DOCUMENT_COMPLETION,
+    TEXT_DOCUMENT_DID_CHANGE,
+    TEXT_DOCUMENT_DID_CLOSE,
     TEXT_DOCUMENT_DID_OPEN,
     TEXT_DOCUMENT_DID_SAVE,
     TEXT_DOCUMENT_HOVER,
+    TEXT_DOCUMENT_INLAY_HINT,
+    WORKSPACE_DID_CHANGE_CONFIGURATION,
+    WORKSPACE_DID_CHANGE_WATCHED_FILES,
+    WORKSPACE_DID_CHANGE_WORKSPACE_FOLDERS,
+    WORKSPACE_SYMBOL,
+    CodeLens,
+    CodeLensOptions,
+    CodeLensParams,
+    CompletionList,
+    CompletionParams,
+    DidChangeConfigurationParams,
+    DidChangeTextDocumentParams,
+    DidChangeWatchedFilesParams,
+    DidChangeWorkspaceFoldersParams,
+    DidCloseTextDocumentParams,
     DidOpenTextDocumentParams,
     DidSaveTextDocumentParams,
     Hover,
+    InitializeParams,
+    InitializedParams,
+    InlayHint,
+    InlayHintOptions,
+    InlayHintParams,
+    MessageType,
+    SymbolInformation,
     TextDocumentPositionParams,
+    WorkspaceSymbolParams,
 )
 
-from typing import Optional
-import spacy
+import functools
+import threading
+from typing import Any, List, Optional
+from .feature_commands import (
+    DEBUG_CONFIG_COMMAND,
+    FILL_CONFIG_COMMAND,
+    debug_config,
+    fill_config,
+    get_command_uri,
+)
+from .feature_code_lens import code_lens, resolve_code_lens
+from .feature_completion import completion
 from .feature_hover import hover
-from .feature_validation import validate_config
+from .feature_inlay_hints import (
+    inlay_hints,
+    refresh_documents_hints,
+    refresh_inlay_hints,
+)
+from .feature_validation import validate_document
+from .profiler import PSTATS, START_PROFILING_COMMAND, STOP_PROFILING_COMMAND
+from .feature_workspace_symbol import (
+    index_document,
+    index_file,
+    index_workspace,
+    remove_folder,
+    workspace_symbol,
+)
+from .document_snapshot import DocumentSnapshot
 from .spacy_server import SpacyLanguageServer
+from .workspace_settings import load_settings, update_chain_config
+
+
+spacy_server = SpacyLanguageServer("pygls-spacy-server", "v0.1", max_workers=4)
+
+
+@spacy_server.feature(INITIALIZE)
+def initialize(server: SpacyLanguageServer, params: InitializeParams):
+    """Client requested the server capabilities."""
+    # pygls doesn't add inlay hints to the server capabilities,
+    # this runs before the capabilities are sent to the client
+    server.server_capabilities.inlay_hint_provider = InlayHintOptions(
+        resolve_provider=False
+    )
+
+
+@spacy_server.feature(INITIALIZED)
+def initialized(server: SpacyLanguageServer, params: InitializedParams):
+    """Client and server are connected."""
+    threading.Thread(
+        target=index_workspace, args=(server,), name="index-workspace", daemon=True
+    ).start()
+    load_settings(server)
+    if server.lite_mode:
+        # Registries are served from the snapshot and the worker is started by the first command
+        return
+    server.start_environment_watcher()
+    # Import spaCy in the config worker before the first command
+    server.config_worker.start()
+
+
+def get_snapshot(server: SpacyLanguageServer, uri: str) -> DocumentSnapshot:
+    """Return the latest snapshot of a document, validating it if it hasn't been seen yet"""
+    snapshot = server.documents.get(uri)
+    if snapshot is None:
+        document = server.workspace.get_document(uri)
+        config = validate_document(server, uri, document.source)
+        snapshot = server.documents.update_config(
+            uri, document.version, document.source, config
+        )
+    return snapshot
 
 
-spacy_server = SpacyLanguageServer("pygls-spacy-server", "v0.1")
+def open_document(server: SpacyLanguageServer, uri: str) -> None:
+    """Index and validate the latest snapshot of an opened document, runs in the thread pool"""
+    snapshot = server.documents.get(uri)
+    if snapshot is None:
+        # The document was closed in the meantime
+        return
+    index_document(server, uri, snapshot.source)
+    refresh_documents_hints(server, server.config_chain.update_document(snapshot))
+    config = validate_document(server, uri, snapshot.source)
+    server.documents.update_config(uri, snapshot.version, snapshot.source, config)
+    if config:
+        server.show_message("spaCy Extension Active")
+
+
+def save_document(server: SpacyLanguageServer, uri: str) -> None:
+    """Validate the latest snapshot of a saved document, runs in the thread pool"""
+    snapshot = server.documents.get(uri)
+    if snapshot is None:
+        # The document was closed in the meantime
+        return
+    config = validate_document(server, uri, snapshot.source)
+    server.documents.update_config(uri, snapshot.version, snapshot.source, config)
+
+
+def update_document(server: SpacyLanguageServer, uri: str) -> None:
+    """Update the state derived from the latest snapshot of an edited document, runs in the thread pool"""
+    old_snapshot = server.changed_documents.pop(uri, None)
+    snapshot = server.documents.get(uri)
+    if snapshot is None:
+        # The document was closed in the meantime
+        return
+    affected = server.config_chain.update_document(snapshot)
+    refresh_inlay_hints(server, old_snapshot, snapshot)
+    # Hints of the document itself were compared, other documents depend on it through the chain
+    refresh_documents_hints(server, affected - {uri})
+    index_document(server, uri, snapshot.source)
 
 
 @spacy_server.feature(TEXT_DOCUMENT_HOVER)
+@spacy_server.thread()
 def hover_feature(
     server: SpacyLanguageServer, params: TextDocumentPositionParams
 ) -> Optional[Hover]:
     """Implement Hover functionality"""
+    snapshot = get_snapshot(server, params.text_document.uri)
+    return hover(
+        snapshot, params, functools.partial(server.config_chain.resolve, snapshot)
+    )
+
+
+@spacy_server.feature(TEXT_DOCUMENT_COMPLETION)
+@spacy_server.thread()
+def completion_feature(
+    server: SpacyLanguageServer, params: CompletionParams
+) -> Optional[CompletionList]:
+    """Implement Completion functionality"""
+    snapshot = get_snapshot(server, params.text_document.uri)
+    return completion(snapshot, params)
+
+
+@spacy_server.feature(TEXT_DOCUMENT_INLAY_HINT)
+@spacy_server.thread()
+def inlay_hint_feature(
+    server: SpacyLanguageServer, params: InlayHintParams
+) -> Optional[List[InlayHint]]:
+    """Implement Inlay Hint functionality"""
+    snapshot = get_snapshot(server, params.text_document.uri)
+    return inlay_hints(server, snapshot, params)
+
+
+@spacy_server.feature(TEXT_DOCUMENT_CODE_LENS, CodeLensOptions(resolve_provider=True))
+@spacy_server.thread()
+def code_lens_feature(
+    server: SpacyLanguageServer, params: CodeLensParams
+) -> List[CodeLens]:
+    """Implement Code Lens functionality, lenses are resolved by code_lens_resolve_feature"""
+    snapshot = get_snapshot(server, params.text_document.uri)
+    return code_lens(snapshot, params)
 
-    if spacy_server.doc_uri != params.text_document.uri:
-        document = server.workspace.get_document(params.text_document.uri)
-        spacy_server.config = validate_config(server=server, cfg=document.source)
-        if spacy_server.config:
-            spacy_server.doc_uri = params.text_document.uri
 
-    return hover(server, params)
+@spacy_server.feature(CODE_LENS_RESOLVE)
+@spacy_server.thread()
+def code_lens_resolve_feature(
+    server: SpacyLanguageServer, params: CodeLens
+) -> CodeLens:
+    """Resolve the registered function of a Code Lens"""
+    return resolve_code_lens(server, params)
+
+
+@spacy_server.feature(WORKSPACE_SYMBOL)
+@spacy_server.thread()
+def workspace_symbol_feature(
+    server: SpacyLanguageServer, params: WorkspaceSymbolParams
+) -> List[SymbolInformation]:
+    """Implement Workspace Symbol functionality"""
+    return workspace_symbol(server, params)
+
+
+@spacy_server.command(FILL_CONFIG_COMMAND)
+@spacy_server.thread()
+def fill_config_command(server: SpacyLanguageServer, arguments: List[Any]) -> bool:
+    """Auto-fill the config of a document, optionally passed as uri argument"""
+    uri = get_command_uri(server, arguments)
+    if uri is None:
+        server.show_message("Fill config: no config file open")
+        return False
+    return fill_config(server, get_snapshot(server, uri))
+
+
+@spacy_server.command(DEBUG_CONFIG_COMMAND)
+@spacy_server.thread()
+def debug_config_command(server: SpacyLanguageServer, arguments: List[Any]) -> bool:
+    """Validate the config of a document, optionally passed as uri argument"""
+    uri = get_command_uri(server, arguments)
+    if uri is None:
+        server.show_message("Debug config: no config file open")
+        return False
+    return debug_config(server, get_snapshot(server, uri))
+
+
+@spacy_server.command(START_PROFILING_COMMAND)
+def start_profiling_command(
+    server: SpacyLanguageServer, arguments: List[Any]
+) -> Optional[str]:
+    """Start profiling the feature handlers, optionally passed the output path and format ("pstats" or "collapsed")"""
+    path = arguments[0] if len(arguments) > 0 and arguments[0] else None
+    output_format = arguments[1] if len(arguments) > 1 and arguments[1] else PSTATS
+    try:
+        path = server.profiler.start(path, output_format)
+    except ValueError as e:
+        server.show_message(f"Profiling: {e}", MessageType.Warning)
+        return None
+    server.show_message(f"Profiling handlers ({output_format}) to {path}")
+    return path
+
+
+@spacy_server.command(STOP_PROFILING_COMMAND)
+def stop_profiling_command(
+    server: SpacyLanguageServer, arguments: List[Any]
+) -> Optional[str]:
+    """Stop profiling the feature handlers and write the profile"""
+    try:
+        path = server.profiler.stop()
+    except ValueError as e:
+        server.show_message(f"Profiling: {e}", MessageType.Warning)
+        return None
+    skipped = (
+        f", {server.profiler.n_skipped} calls running in parallel weren't profiled"
+        if server.profiler.n_skipped
+        else ""
+    )
+    if path is None:
+        server.show_message(f"Profiling: no handler was profiled{skipped}")
+    else:
+        server.show_message(
+            f"Profile of {server.profiler.n_calls} handler calls written to {path}{skipped}"
+        )
+    return path
 
 
 @spacy_server.feature(TEXT_DOCUMENT_DID_OPEN)
-async def did_open(server: SpacyLanguageServer, params: DidOpenTextDocumentParams):
+def did_open(server: SpacyLanguageServer, params: DidOpenTextDocumentParams):
     """Text document did open notification."""
-    spacy_server.config = validate_config(server=server, cfg=params.text_document.text)
-    if spacy_server.config:
-        spacy_server.doc_uri = params.text_document.uri
-        server.show_message("spaCy Extension Active")
+    document = params.text_document
+    # Stored on the event loop, in order with did_change and did_close
+    server.documents.update_text(document.uri, document.version, document.text)
+    server.document_updates.run(
+        document.uri, functools.partial(open_document, server, document.uri)
+    )
 
 
 @spacy_server.feature(TEXT_DOCUMENT_DID_SAVE)
-async def did_save(server: SpacyLanguageServer, params: DidSaveTextDocumentParams):
+def did_save(server: SpacyLanguageServer, params: DidSaveTextDocumentParams):
     """Text document did save notification."""
+    server.document_updates.run(
+        params.text_document.uri,
+        functools.partial(save_document, server, params.text_document.uri),
+    )
+
+
+@spacy_server.feature(TEXT_DOCUMENT_DID_CHANGE)
+def did_change(server: SpacyLanguageServer, params: DidChangeTextDocumentParams):
+    """Text document did change notification."""
     document = server.workspace.get_document(params.text_document.uri)
-    spacy_server.config = validate_config(server=server, cfg=document.source)
-    if spacy_server.config:
-        spacy_server.doc_uri = params.text_document.uri
+    old_snapshot, snapshot = server.documents.update_text(
+        document.uri, document.version, document.source
+    )
+    server.changed_documents.setdefault(snapshot.uri, old_snapshot)
+    server.document_updates.schedule(
+        snapshot.uri, functools.partial(update_document, server, snapshot.uri)
+    )
+
+
+@spacy_server.feature(TEXT_DOCUMENT_DID_CLOSE)
+def did_close(server: SpacyLanguageServer, params: DidCloseTextDocumentParams):
+    """Text document did close notification."""
+    server.document_updates.cancel(params.text_document.uri)
+    server.documents.remove(params.text_document.uri)
+    server.changed_documents.pop(params.text_document.uri, None)
+    server.streamed_documents.discard(params.text_document.uri)
+    server.inlay_hint_ranges.remove(params.text_document.uri)
+    server.config_chain.remove_document(params.text_document.uri)
+    # Clear the diagnostics of the debug-config command
+    server.publish_diagnostics(params.text_document.uri, [])
+    # Edits that weren't saved are dropped, index the config on disk again after a running update
+    server.document_updates.run(
+        params.text_document.uri,
+        functools.partial(index_file, server, params.text_document.uri),
+    )
+    update_chain_config(server, params.text_document.uri)
+
+
+@spacy_server.feature(WORKSPACE_DID_CHANGE_WATCHED_FILES)
+@spacy_server.thread()
+def did_change_watched_files(
+    server: SpacyLanguageServer, params: DidChangeWatchedFilesParams
+):
+    """Watched files did change notification."""
+    for change in params.changes:
+        # Deleted configs can't be read anymore and are removed from the index
+        if change.uri.endswith(".cfg"):
+            index_file(server, change.uri)
+            update_chain_config(server, change.uri)
+
+
+@spacy_server.feature(WORKSPACE_DID_CHANGE_CONFIGURATION)
+def did_change_configuration(
+    server: SpacyLanguageServer, params: DidChangeConfigurationParams
+):
+    """Settings did change notification."""
+    # The settings are pulled, the notification only signals a change
+    load_settings(server)
+
+
+@spacy_server.feature(WORKSPACE_DID_CHANGE_WORKSPACE_FOLDERS)
+@spacy_server.thread()
+def did_change_workspace_folders(
+    server: SpacyLanguageServer, params: DidChangeWorkspaceFoldersParams
+):
+    """Workspace folders did change notification."""
+    for folder in params.event.removed:
+        remove_folder(server, folder.uri)
+    index_workspace(server, [folder.uri for folder in params.event.added])
@@ -0,0 +1,48 @@
+"""Script containing the recorder of JSON-RPC sessions, replayed by the replay_session benchmark"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, List
+
+RECEIVED = "received"
+SENT = "sent"
+
+
+class SessionRecorder:
+    """
+    Writes every JSON-RPC message received and sent by the server to a file.
+
+    Every message is written as one line of JSON as soon as it's received or sent:
+    {"time": <seconds since the recording started>, "direction": "received" | "sent", "message": {...}}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Line buffered, so the recording is complete even if the server is killed
+        self._file = open(path, "w", encoding="utf8", buffering=1)
+        self._start = time.perf_counter()
+        # Responses are sent from the thread pool
+        self._lock = threading.Lock()
+
+    def record(self, direction: str, message: Dict[str, Any]) -> None:
+        line = json.dumps(
+            {
+                "time": round(time.perf_counter() - self._start, 6),
+                "direction": direction,
+                "message": message,
+            }
+        )
+        with self._lock:
+            if not self._file.closed:
+                self._file.write(line + "\n")
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def load_session(path: str) -> List[Dict[str, Any]]:
+    """Read the messages of a recorded session in the order they were recorded"""
+    with open(path, encoding="utf8") as file:
+        return [json.loads(line) for line in file if line.strip()]
@@ -1,7 +1,149 @@
 from pygls.server import LanguageServer
+from pygls.protocol import LanguageServerProtocol
+from pygls.feature_manager import is_thread_function
+from pygls.exceptions import JsonRpcRequestCancelled
+from lsprotocol.types import (
+    TEXT_DOCUMENT_COMPLETION,
+    TEXT_DOCUMENT_HOVER,
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_RANGE,
+    Command,
+)
 
-from thinc.api import Config
-from typing import Optional
+import functools
+import json
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+from .config_chain import ConfigChain
+from .config_worker import ConfigWorker
+from .debouncer import Debouncer
+from .document_snapshot import DocumentSnapshot, DocumentStore, FetchedRanges
+from .environment_watcher import EnvironmentWatcher
+from .profiler import HandlerProfiler
+from .session_recorder import RECEIVED, SENT, SessionRecorder
+from .symbol_index import SymbolIndex
+
+# Requests of these methods are dropped when a newer request for the same document arrives
+COALESCED_METHODS = {
+    TEXT_DOCUMENT_COMPLETION,
+    TEXT_DOCUMENT_HOVER,
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_FULL,
+    TEXT_DOCUMENT_SEMANTIC_TOKENS_RANGE,
+}
+# Seconds without edits before the state derived from a document's text is updated
+DOCUMENT_UPDATE_DELAY = 0.3
+
+
+class SpacyLanguageServerProtocol(LanguageServerProtocol):
+    """
+    Protocol that drops requests running in the thread pool once their result isn't needed anymore.
+
+    pygls can only cancel requests of async handlers. Requests of thread handlers are checked right
+    before they start executing instead: cancelled requests ($/cancelRequest) are answered with a
+    RequestCancelled error, and hover, completion and semantic token requests that were superseded
+    by a newer request of the same method for the same document are answered with an empty result.
+
+    If a session recorder is set, every message received from and sent to the client is recorded.
+    Handlers are profiled while the server's profiler is running.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # (method, uri) of every pending thread request that can be superseded, None otherwise
+        self._pending_requests: Dict[Any, Optional[Tuple[str, str]]] = {}
+        # Latest pending request id for every (method, uri)
+        self._latest_requests: Dict[Tuple[str, str], Any] = {}
+        self._cancelled_requests: Set[Any] = set()
+        # Requests finish in the thread pool while new ones arrive on the event loop
+        self._requests_lock = threading.Lock()
+        self.recorder: Optional[SessionRecorder] = None
+
+    def _deserialize_message(self, data):
+        # Called for every object of a message, only the message itself has "jsonrpc"
+        if self.recorder is not None and "jsonrpc" in data:
+            self.recorder.record(RECEIVED, data)
+        return super()._deserialize_message(data)
+
+    def _send_data(self, data):
+        if self.recorder is not None and data:
+            self.recorder.record(
+                SENT, json.loads(json.dumps(data, default=self._serialize_message))
+            )
+        super()._send_data(data)
+
+    def _handle_request(self, msg_id, method_name, params):
+        if method_name in self.fm.features or method_name in self.fm.builtin_features:
+            text_document = getattr(params, "text_document", None)
+            request_key = None
+            with self._requests_lock:
+                if method_name in COALESCED_METHODS and text_document is not None:
+                    request_key = (method_name, text_document.uri)
+                    self._latest_requests[request_key] = msg_id
+                self._pending_requests[msg_id] = request_key
+        super()._handle_request(msg_id, method_name, params)
+
+    def _execute_request(self, msg_id, handler, params):
+        # Only handlers starting while the profiler runs are wrapped to keep the overhead off otherwise
+        if self._server.profiler.running:
+            handler = self._server.profiler.wrap(handler)
+        if is_thread_function(handler):
+            handler = self._skip_stale_requests(msg_id, handler)
+        else:
+            # Requests handled on the event loop are either done right away or cancelled by pygls
+            self._finish_request(msg_id)
+        super()._execute_request(msg_id, handler, params)
+
+    def _execute_notification(self, handler, *params):
+        if self._server.profiler.running:
+            handler = self._server.profiler.wrap(handler)
+        super()._execute_notification(handler, *params)
+
+    def _skip_stale_requests(self, msg_id, handler: Callable) -> Callable:
+        @functools.wraps(handler)
+        def skip_stale_requests(params):
+            try:
+                if msg_id in self._cancelled_requests:
+                    raise JsonRpcRequestCancelled(
+                        f'Request with id "{msg_id}" is canceled'
+                    )
+                request_key = self._pending_requests.get(msg_id)
+                if (
+                    request_key is not None
+                    and self._latest_requests.get(request_key) != msg_id
+                ):
+                    logging.debug(f'Skipped superseded request with id "{msg_id}"')
+                    return None
+                return handler(params)
+            finally:
+                self._finish_request(msg_id)
+
+        return skip_stale_requests
+
+    def _finish_request(self, msg_id) -> None:
+        """Forget a request, including its (method, uri) if no newer request for it arrived"""
+        with self._requests_lock:
+            request_key = self._pending_requests.pop(msg_id, None)
+            if (
+                request_key is not None
+                and self._latest_requests.get(request_key) == msg_id
+            ):
+                del self._latest_requests[request_key]
+            self._cancelled_requests.discard(msg_id)
+
+    def _handle_cancel_notification(self, msg_id):
+        with self._requests_lock:
+            # Cancellations of finished requests are dropped
+            if msg_id in self._pending_requests:
+                self._cancelled_requests.add(msg_id)
+                return
+        super()._handle_cancel_notification(msg_id)
+
+    def _execute_request_err_callback(self, msg_id, exc):
+        if isinstance(exc, JsonRpcRequestCancelled):
+            self._send_response(msg_id, error=exc.to_dict())
+            return
+        super()._execute_request_err_callback(msg_id, exc)
 
 
 class SpacyLanguageServer(LanguageServer):
@@ -11,7 +153,47 @@ class SpacyLanguageServer(LanguageServer):
     DOCS: https://pygls.readthedocs.io/en/latest/pages/advanced_usage.html#language-server
     """
 
-    def __init__(self, *args):
-        super().__init__(*args)
-        self.config: Optional[Config] = None
-        self.doc_uri: str = None
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("protocol_cls", SpacyLanguageServerProtocol)
+        super().__init__(*args, **kwargs)
+        # Read-only handlers run in the thread pool and only access immutable document snapshots
+        self.documents = DocumentStore()
+        self.environment_watcher: Optional[EnvironmentWatcher] = None
+        # Ranges the client has fetched inlay hints for since the last refresh
+        self.inlay_hint_ranges = FetchedRanges()
+        # Runs fill-config and debug-config outside of the server process
+        self.config_worker = ConfigWorker()
+        # Serve features from the metadata snapshot and only import spaCy when needed
+        self.lite_mode = False
+        # Sections and functions of all workspace configs and registries for workspace symbols
+        self.symbol_index = SymbolIndex()
+        # Generation of the registry catalogue when its functions were last indexed
+        self.symbol_index_generation: Optional[int] = None
+        # Profiles the feature handlers while started by the profiling commands
+        self.profiler = HandlerProfiler()
+        # Resolves variables against the configs and overrides of the workspace settings
+        self.config_chain = ConfigChain()
+        # Resolved code lens command of every component block hash with the registry generation it was resolved for
+        self.code_lens_cache: Dict[str, Tuple[int, Command]] = {}
+        # Documents with diagnostics of the streaming parser, cleared once they're small enough to build their config
+        self.streamed_documents: Set[str] = set()
+        # Snapshot of every edited document before its pending update, to compare the inlay hints of both
+        self.changed_documents: Dict[str, Optional[DocumentSnapshot]] = {}
+        # Updates the state derived from a document (e.x. its symbols) in the thread pool once the edits pause
+        self.document_updates = Debouncer(
+            DOCUMENT_UPDATE_DELAY,
+            lambda function: self.thread_pool.apply_async(function),
+        )
+
+    def start_environment_watcher(self):
+        """Start refreshing the registries when packages are installed into the python environment"""
+        if self.environment_watcher is None:
+            self.environment_watcher = EnvironmentWatcher(
+                on_refresh=self._on_registries_refreshed
+            )
+            self.environment_watcher.start()
+
+    def _on_registries_refreshed(self, registry_names: Set[str]):
+        self.show_message_log(
+            f"Registries updated: {', '.join(sorted(registry_names))}"
+        )
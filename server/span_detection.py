@@ -0,0 +1,61 @@
+"""Script containing the detection of word spans for many positions at once"""
+
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+WORD_REGEX = re.compile(r"\w+")
+
+
+@dataclass
+class SpanInfo:
+    span_string: str  # The span text, can have markdown elements
+    start: int  # Start index of the string
+    end: int  # End index of the string
+
+
+class LineSpans:
+    """
+    Word spans of a single line, found in one pass of a compiled regex.
+
+    Positions are looked up by binary search over the start offsets of the words,
+    so a batch of positions costs one pass over the line plus a lookup per position.
+    """
+
+    def __init__(self, line: str):
+        self.line = line
+        self.starts: List[int] = []
+        self.ends: List[int] = []  # Exclusive
+        for match in WORD_REGEX.finditer(line):
+            self.starts.append(match.start())
+            self.ends.append(match.end())
+
+    def word_at(self, position: int) -> SpanInfo:
+        """
+        Return the word at a position, or the character at the position if it isn't a word character.
+
+        Positions outside of the line return an empty span at 0.
+        """
+        if position < 0 or position >= len(self.line):
+            return SpanInfo("", 0, 0)
+        i = bisect_right(self.starts, position) - 1
+        if i >= 0 and position < self.ends[i]:
+            return SpanInfo(
+                self.line[self.starts[i] : self.ends[i]],
+                self.starts[i],
+                self.ends[i] - 1,
+            )
+        return SpanInfo(self.line[position], position, position)
+
+    def words_at(self, positions: Iterable[int]) -> List[SpanInfo]:
+        return [self.word_at(position) for position in positions]
+
+    def word_before(self, position: int) -> Optional[SpanInfo]:
+        """Return the last word starting before a position, e.x. the registry name before its function"""
+        i = bisect_right(self.starts, position - 1) - 1
+        if i < 0 or position <= 0:
+            return None
+        return SpanInfo(
+            self.line[self.starts[i] : self.ends[i]], self.starts[i], self.ends[i] - 1
+        )
@@ -0,0 +1,249 @@
+"""Script containing the trigram index behind the workspace symbol search"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .util import KEY_VALUE_REGEX, SECTION_REGEX
+
+# Maximum number of symbols returned for a query
+MAX_RESULTS = 200
+# Share of the query's trigrams a symbol needs to contain to be a candidate
+MIN_SIMILARITY = 0.5
+# Separators within symbol names, e.g. "." in "spacy.MultiHashEmbed.v2"
+SEPARATOR_REGEX = re.compile(r"[^a-z0-9]+")
+# Line break before a section title, configs are split into blocks after these
+SECTION_START_REGEX = re.compile(r"\n\[[^\]\r\n]+\]")
+
+
+@dataclass(frozen=True)
+class Symbol:
+    name: str  # e.x. "components.ner.model" or "spacy.MultiHashEmbed.v2"
+    kind: str  # "section", "function" (a registered function) or "reference" (a function used in a config)
+    container: str  # Registry of functions, section of references
+    uri: str  # Document containing the symbol
+    line: int  # Line of the symbol within the document
+
+
+@dataclass
+class SymbolBlock:
+    """Symbols of one section of a config, or of a whole source that isn't split into sections"""
+
+    text: Optional[str]  # Text of the section, None for sources that aren't configs
+    n_lines: int
+    symbol_ids: List[int]
+    line: int = 0  # First line of the block in the source, the lines of its symbols are relative to it
+
+
+def normalize(text: str) -> str:
+    """Lowercase a name and replace separators with spaces, so every word starts with a space"""
+    return " " + SEPARATOR_REGEX.sub(" ", text.lower()).strip()
+
+
+def get_trigrams(text: str) -> Set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def iter_blocks(source: str) -> Iterator[str]:
+    """Split a config into the text before the first section and the text of every section"""
+    start = 0
+    for section_match in SECTION_START_REGEX.finditer(source):
+        yield source[start : section_match.start() + 1]
+        start = section_match.start() + 1
+    if start < len(source):
+        yield source[start:]
+
+
+def get_block_symbols(uri: str, block: str) -> List[Symbol]:
+    """Collect the symbols of a block of a config, with lines relative to the block"""
+    symbols = []
+    section = ""
+    for line_n, line in enumerate(block.splitlines()):
+        section_match = SECTION_REGEX.match(line)
+        if section_match:
+            section = section_match.group(1).strip()
+            symbols.append(Symbol(section, "section", "", uri, line_n))
+            continue
+        key_value_match = KEY_VALUE_REGEX.match(line)
+        if key_value_match and key_value_match.group(1).startswith("@"):
+            func_name = key_value_match.group(2).strip().strip('"')
+            symbols.append(Symbol(func_name, "reference", section, uri, line_n))
+    return symbols
+
+
+class SymbolIndex:
+    """
+    Trigram index of the symbols of all documents and registries.
+
+    Symbols are grouped by source (a document uri or "registry:<name>"), updating a source
+    only re-indexes its own symbols. Configs are further split into sections: re-indexing an edited
+    config only parses and indexes the sections whose text changed, the others are moved to their
+    new line. The trigrams point to distinct names, so sections repeated
+    across many configs are only scored once per query. Queries return the symbols whose names share
+    most trigrams with the query, ranked by how well the name matches.
+    """
+
+    def __init__(self):
+        self._symbols: Dict[int, Symbol] = {}
+        self._normalized: Dict[int, str] = {}
+        self._names: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+        self._blocks: Dict[int, SymbolBlock] = {}
+        self._sources: Dict[str, List[SymbolBlock]] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    def get_sources(self) -> List[str]:
+        with self._lock:
+            return list(self._sources)
+
+    def update(self, source: str, symbols: Iterable[Symbol]) -> None:
+        """Replace the symbols of a source"""
+        with self._lock:
+            self._remove(source)
+            block = SymbolBlock(None, 0, [])
+            for symbol in symbols:
+                block.symbol_ids.append(self._add(symbol, block))
+            self._sources[source] = [block]
+
+    def update_config(self, uri: str, source: str) -> None:
+        """Replace the symbols of a config, only (re-)indexing the sections whose text changed"""
+        texts = list(iter_blocks(source))
+        with self._lock:
+            old_blocks: Dict[Optional[str], List[SymbolBlock]] = {}
+            for block in reversed(self._sources.pop(uri, [])):
+                old_blocks.setdefault(block.text, []).append(block)
+            blocks = []
+            line_n = 0
+            for text in texts:
+                same_blocks = old_blocks.get(text)
+                if same_blocks:
+                    block = same_blocks.pop()
+                else:
+                    block = SymbolBlock(text, len(text.splitlines()), [])
+                    for symbol in get_block_symbols(uri, text):
+                        block.symbol_ids.append(self._add(symbol, block))
+                block.line = line_n
+                line_n += block.n_lines
+                blocks.append(block)
+            for same_blocks in old_blocks.values():
+                for block in same_blocks:
+                    self._remove_block(block)
+            self._sources[uri] = blocks
+
+    def remove(self, source: str) -> None:
+        """Remove the symbols of a source"""
+        with self._lock:
+            self._remove(source)
+
+    def search(
+        self,
+        query: str,
+        limit: int = MAX_RESULTS,
+        kinds: Optional[Set[str]] = None,
+    ) -> List[Symbol]:
+        """
+        Return the symbols matching a query, best matches first.
+
+        ARGUMENTS:
+        query (str): The text to search for, matched fuzzily.
+        limit (int): The maximum number of symbols to return.
+        kinds (Optional[Set[str]]): Only search symbols of these kinds.
+        """
+        normalized_query = normalize(query)
+        words = normalized_query.strip()
+        if not words:
+            return []
+        query_trigrams = get_trigrams(normalized_query)
+        with self._lock:
+            candidates: Counter = Counter()
+            if len(words) < 3:
+                # Too short for trigrams, scan for names with a word starting with the query
+                min_hits = 0
+                for normalized in self._names:
+                    if f" {words}" in normalized:
+                        candidates[normalized] = 0
+            else:
+                min_hits = math.ceil(len(query_trigrams) * MIN_SIMILARITY)
+                for trigram in query_trigrams:
+                    candidates.update(self._trigrams.get(trigram, ()))
+            # Names without symbols of the requested kinds are skipped before ranking
+            ranked = heapq.nsmallest(
+                limit,
+                (
+                    self._rank(words, normalized, hits, len(query_trigrams))
+                    for normalized, hits in candidates.items()
+                    if hits >= min_hits
+                    and (
+                        kinds is None
+                        or any(
+                            self._symbols[symbol_id].kind in kinds
+                            for symbol_id in self._names[normalized]
+                        )
+                    )
+                ),
+            )
+            results: List[Symbol] = []
+            for *_, normalized in ranked:
+                for symbol_id in sorted(self._names[normalized]):
+                    symbol = self._symbols[symbol_id]
+                    if kinds is None or symbol.kind in kinds:
+                        line = self._blocks[symbol_id].line + symbol.line
+                        results.append(replace(symbol, line=line))
+                        if len(results) == limit:
+                            return results
+            return results
+
+    def _rank(
+        self, words: str, normalized: str, hits: int, n_query_trigrams: int
+    ) -> Tuple[float, int, str]:
+        """Return the sort key of a name, smaller keys rank first"""
+        position = normalized.find(words)
+        if position >= 0:
+            # Substring matches rank first, matches at the start of a word before others
+            match_score = 3.0 if normalized[position - 1] == " " else 2.0
+        else:
+            match_score = hits / max(n_query_trigrams, 1)
+        # Shorter names cover more of the query
+        return -match_score, len(normalized), normalized
+
+    def _add(self, symbol: Symbol, block: SymbolBlock) -> int:
+        symbol_id = self._next_id
+        self._next_id += 1
+        normalized = normalize(symbol.name)
+        self._symbols[symbol_id] = symbol
+        self._blocks[symbol_id] = block
+        self._normalized[symbol_id] = normalized
+        name_ids = self._names.get(normalized)
+        if name_ids is None:
+            name_ids = self._names[normalized] = set()
+            for trigram in get_trigrams(normalized):
+                self._trigrams.setdefault(trigram, set()).add(normalized)
+        name_ids.add(symbol_id)
+        return symbol_id
+
+    def _remove(self, source: str) -> None:
+        for block in self._sources.pop(source, []):
+            self._remove_block(block)
+
+    def _remove_block(self, block: SymbolBlock) -> None:
+        for symbol_id in block.symbol_ids:
+            del self._symbols[symbol_id]
+            del self._blocks[symbol_id]
+            normalized = self._normalized.pop(symbol_id)
+            name_ids = self._names[normalized]
+            name_ids.discard(symbol_id)
+            if not name_ids:
+                del self._names[normalized]
+                for trigram in get_trigrams(normalized):
+                    names = self._trigrams[trigram]
+                    names.discard(normalized)
+                    if not names:
+                        del self._trigrams[trigram]
@@ -0,0 +1,195 @@
+from mock import Mock, patch
+from lsprotocol.types import (
+    ClientCapabilities,
+    InlayHintParams,
+    InlayHintWorkspaceClientCapabilities,
+    Position,
+    Range,
+    TextDocumentIdentifier,
+    TextDocumentPositionParams,
+    WorkspaceClientCapabilities,
+)
+from pygls.uris import from_fs_path
+from pygls.workspace import Workspace
+
+from ..config_chain import OVERRIDES_ORIGIN, ConfigChain
+from ..document_snapshot import DocumentStore
+from ..feature_hover import hover
+from ..feature_inlay_hints import inlay_hints
+from ..spacy_server import SpacyLanguageServer
+from ..util import VariableIndex
+from ..workspace_settings import apply_settings, update_chain_config
+
+base_source = """[paths]
+train = "corpus/train.spacy"
+dev = "corpus/dev.spacy"
+
+[system]
+seed = 0
+"""
+
+config_source = """[paths]
+dev = "corpus/other_dev.spacy"
+
+[corpora.train]
+path = ${paths.train}
+
+[corpora.dev]
+path = ${paths.dev}
+
+[training]
+seed = ${system.seed}
+"""
+
+
+def test_config_chain_resolve():
+    documents = DocumentStore()
+    _, snapshot = documents.update_text("file:///config.cfg", 1, config_source)
+    chain = ConfigChain()
+    assert chain.resolve(snapshot, "paths.train") is None
+
+    base_values = VariableIndex(base_source).values
+    chain.configure(
+        ["file:///base.cfg"], {"system.seed": "42"}, {"file:///base.cfg": base_values}
+    )
+    train = chain.resolve(snapshot, "corpora.train.path")
+    assert train is not None
+    assert (train.chain, train.value, train.origin) == (
+        ("corpora.train.path", "paths.train"),
+        '"corpus/train.spacy"',
+        "file:///base.cfg",
+    )
+    # The document overrides the chain and the settings override both
+    dev = chain.resolve(snapshot, "corpora.dev.path")
+    assert dev is not None and (dev.value, dev.origin) == (
+        '"corpus/other_dev.spacy"',
+        None,
+    )
+    seed = chain.resolve(snapshot, "training.seed")
+    assert seed is not None and (seed.value, seed.origin) == ("42", OVERRIDES_ORIGIN)
+
+
+def test_config_chain_invalidation():
+    documents = DocumentStore()
+    _, snapshot = documents.update_text("file:///config.cfg", 1, config_source)
+    base_uri = "file:///base.cfg"
+    chain = ConfigChain()
+    chain.configure([base_uri], {}, {base_uri: VariableIndex(base_source).values})
+    train = chain.resolve(snapshot, "corpora.train.path")
+    dev = chain.resolve(snapshot, "corpora.dev.path")
+
+    # Only the values depending on the changed variable are resolved again
+    base_source_v2 = base_source.replace("train.spacy", "new.spacy")
+    new_base = VariableIndex(base_source_v2).values
+    assert chain.update_layer(base_uri, new_base) == {snapshot.uri}
+    new_train = chain.resolve(snapshot, "corpora.train.path")
+    assert new_train is not None and new_train.value == '"corpus/new.spacy"'
+    assert chain.resolve(snapshot, "corpora.dev.path") is dev
+    # Values shadowed by the document don't depend on the chain
+    new_base = VariableIndex(base_source_v2.replace("dev.spacy", "new.spacy")).values
+    assert chain.update_layer(base_uri, new_base) == set()
+
+    # Editing the document keeps the values that don't depend on the edit
+    _, new_snapshot = documents.update_text(
+        snapshot.uri, 2, config_source.replace("other_dev", "dev")
+    )
+    assert chain.update_document(new_snapshot) == {snapshot.uri}
+    assert chain.resolve(new_snapshot, "corpora.train.path") is new_train
+    assert chain.resolve(new_snapshot, "corpora.dev.path") is not dev
+
+    # Changing the overrides drops the values depending on them
+    chain.resolve(new_snapshot, "training.seed")
+    assert chain.configure([base_uri], {"system.seed": "1"}, {base_uri: new_base}) == {
+        snapshot.uri
+    }
+    assert chain.resolve(new_snapshot, "corpora.train.path") is new_train
+
+
+def test_config_chain_new_variables():
+    documents = DocumentStore()
+    source = "[training]\ntrain = ${paths.train}\ndev = ${paths.dev}\n"
+    _, snapshot = documents.update_text("file:///config.cfg", 1, source)
+    base_uri = "file:///base.cfg"
+    chain = ConfigChain()
+    chain.configure([base_uri], {}, {base_uri: {}})
+    assert chain.resolve(snapshot, "training.train") is None
+    assert chain.resolve(snapshot, "training.dev") is None
+
+    # Defining a variable in the chain or the overrides drops the values it was missing from
+    assert chain.update_layer(base_uri, {"paths.train": '"train.spacy"'}) == {
+        snapshot.uri
+    }
+    train = chain.resolve(snapshot, "training.train")
+    assert train is not None and train.value == '"train.spacy"'
+    assert chain.configure(
+        [base_uri], {"paths.dev": '"dev.spacy"'}, {base_uri: {}}
+    ) == {snapshot.uri}
+    dev = chain.resolve(snapshot, "training.dev")
+    assert dev is not None and dev.value == '"dev.spacy"'
+
+
+def test_config_chain_cache_after_save():
+    documents = DocumentStore()
+    _, snapshot = documents.update_text("file:///config.cfg", 1, config_source)
+    base_uri = "file:///base.cfg"
+    chain = ConfigChain()
+    chain.configure([base_uri], {}, {base_uri: VariableIndex(base_source).values})
+    chain.resolve(snapshot, "corpora.train.path")
+
+    # Storing the validated config of the same version keeps the values cached
+    saved_snapshot = documents.update_config(snapshot.uri, 1, config_source, None)
+    assert saved_snapshot.variable_index is snapshot.variable_index
+    with patch("server.config_chain.resolve_variable") as resolve_variable:
+        for _ in range(5):
+            chain.resolve(saved_snapshot, "corpora.train.path")
+    resolve_variable.assert_not_called()
+
+
+def test_config_chain_settings(tmp_path):
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "base.cfg").write_text(base_source)
+    config_uri = from_fs_path(str(tmp_path / "config.cfg"))
+
+    server = SpacyLanguageServer("test-server", "v0.1")
+    server.lsp.workspace = Workspace(from_fs_path(str(tmp_path)))
+    server.lsp.client_capabilities = ClientCapabilities(
+        workspace=WorkspaceClientCapabilities(
+            inlay_hint=InlayHintWorkspaceClientCapabilities(refresh_support=True)
+        )
+    )
+    server.lsp.send_request = Mock()
+    apply_settings(server, {"configChain": ["configs/base.cfg"]})
+    _, snapshot = server.documents.update_text(config_uri, 1, config_source)
+
+    params = InlayHintParams(
+        text_document=TextDocumentIdentifier(uri=config_uri),
+        range=Range(
+            start=Position(line=0, character=0), end=Position(line=12, character=0)
+        ),
+    )
+    hints = inlay_hints(server, snapshot, params)
+    assert [hint.label for hint in hints] == [
+        '= "corpus/train.spacy"',
+        '= "corpus/other_dev.spacy"',
+        "= 0",
+    ]
+    assert "From base.cfg" in hints[0].tooltip.value  # type: ignore[union-attr]
+
+    hover_params = TextDocumentPositionParams(
+        text_document=TextDocumentIdentifier(uri=config_uri),
+        position=Position(line=4, character=10),
+    )
+    resolved_hover = hover(
+        snapshot,
+        hover_params,
+        lambda variable: server.config_chain.resolve(snapshot, variable),
+    )
+    assert resolved_hover is not None
+    assert "From base.cfg" in resolved_hover.contents.value  # type: ignore[union-attr]
+
+    # Saving the base config refreshes the hints depending on it
+    (tmp_path / "configs" / "base.cfg").write_text(base_source.replace("0", "42"))
+    update_chain_config(server, server.config_chain.chain[0])
+    server.lsp.send_request.assert_called_once()
+    hints = inlay_hints(server, snapshot, params)
+    assert hints[2].label == "= 42"
@@ -0,0 +1,76 @@
+import pytest
+from mock import Mock
+from confection import Config
+
+from .. import feature_validation
+from ..config_parser import StreamingConfigParser
+from ..feature_validation import validate_document
+from .test_features import fake_document_content
+
+
+# Test that the streaming parser finds the errors Config().from_str raises
+@pytest.mark.parametrize(
+    "source, errors",
+    [
+        (fake_document_content, []),
+        ("[a.b]\nx = 1\n[a]\ny = 1\n", []),
+        ('[a]\nx = [\n  1,\n  2]\ny: "${b.c}/d"\n[b]\nc = 1\n', []),
+        ("a = 1\n", [(0, "Value outside of a section")]),
+        ("[a]\nx = 1\n[a]\ny = 2\n", [(2, "Section 'a' is already defined")]),
+        ("[a]\nx = 1\nx = 2\n", [(2, "Key 'x' is already defined in section 'a'")]),
+        ("[a]\nx = 1\njunk\n", [(2, "Expected a section or `key = value`")]),
+        (
+            "[a\nx = 1\n",
+            [
+                (0, "Expected a section or `key = value`"),
+                (1, "Value outside of a section"),
+            ],
+        ),
+        ("[a]\nx = ${b.c}\n", [(1, "Variable 'b.c' is not defined")]),
+        ("[a.b]\nx = 1\n", [(0, "Section 'a' is not defined")]),
+        ("[a]\nb = 1\n[a.b]\nc = 1\n", [(2, "'a.b' is already defined as a value")]),
+    ],
+)
+def test_streaming_parser_errors(source, errors):
+    found = StreamingConfigParser(source).check()
+    assert [(error.line, error.message) for error in found] == errors
+    if not errors:
+        Config().from_str(source)
+    else:
+        with pytest.raises(Exception):
+            Config().from_str(source)
+
+
+def test_streaming_parser_sections():
+    source = "[paths]\ntrain = null\n\n[system]\nseed = 0\n# comment\ngpu = -1\n"
+    sections = list(StreamingConfigParser(source).sections())
+    assert [(s.name, s.line, s.end_line, s.values) for s in sections] == [
+        ("paths", 0, 3, {"train": "null"}),
+        ("system", 3, 7, {"seed": "0", "gpu": "-1"}),
+    ]
+    assert source[sections[1].offset :].startswith("[system]")
+
+
+def test_streaming_parser_stops_early():
+    source = "[a]\n" + "junk\n" * 1000
+    parser = StreamingConfigParser(source, max_errors=5)
+    assert len(parser.check()) == 5
+    assert parser.errors[-1].line == 5
+
+
+def test_validate_large_document(monkeypatch):
+    monkeypatch.setattr(feature_validation, "STREAMING_SIZE", 10)
+    server = Mock(streamed_documents=set())
+    assert validate_document(server, "file:///large.cfg", "[a]\nx = ${b}\n") is None
+    uri, diagnostics = server.publish_diagnostics.call_args.args
+    assert uri == "file:///large.cfg"
+    assert [(d.range.start.line, d.message) for d in diagnostics] == [
+        (1, "Variable 'b' is not defined")
+    ]
+
+    # The diagnostics are cleared once the document is small enough to build its config
+    server.publish_diagnostics.reset_mock()
+    validate_document(server, "file:///large.cfg", "[a]\n")
+    server.publish_diagnostics.assert_called_once_with("file:///large.cfg", [])
+    validate_document(server, "file:///large.cfg", "[a]\n")
+    server.publish_diagnostics.assert_called_once()
@@ -0,0 +1,111 @@
+import os
+import pytest
+import subprocess
+import sys
+
+from ..config_worker import ConfigError, ConfigWorker, ConfigWorkerError
+from ..feature_commands import find_location
+
+partial_config = """[nlp]
+lang = "en"
+pipeline = ["ner"]
+
+[components]
+
+[components.ner]
+factory = "ner"
+
+[components.ner.model]
+@architectures = "spacy.TransitionBasedParser.v2"
+hidden_width = 64
+"""
+
+
+@pytest.fixture(scope="module")
+def config_worker():
+    config_worker = ConfigWorker()
+    yield config_worker
+    config_worker.stop()
+
+
+def test_fill_config(config_worker):
+    filled, errors = config_worker.fill_config(partial_config)
+    assert errors == []
+    assert filled is not None
+    assert "[training]" in filled
+    assert "hidden_width = 64" in filled
+
+
+def test_fill_config_errors(config_worker):
+    filled, errors = config_worker.fill_config(
+        partial_config.replace("hidden_width = 64", 'hidden_width = "wide"')
+    )
+    assert filled is None
+    assert errors == [
+        ConfigError(("ner", "model", "hidden_width"), "value is not a valid integer")
+    ]
+
+
+def test_debug_config(config_worker):
+    filled, _ = config_worker.fill_config(partial_config)
+    assert filled is not None
+    errors = config_worker.debug_config(
+        filled.replace("max_epochs = 0", 'max_epochs = "forever"')
+    )
+    assert errors == [
+        ConfigError(("training", "max_epochs"), "value is not a valid integer")
+    ]
+
+
+def test_config_worker_timeout(config_worker):
+    config_worker.timeout = 0.001
+    with pytest.raises(ConfigWorkerError):
+        config_worker.fill_config(partial_config)
+    # The worker is restarted for the next task
+    config_worker.timeout = 60.0
+    filled, _ = config_worker.fill_config(partial_config)
+    assert filled is not None
+
+
+@pytest.mark.skipif(
+    sys.platform != "linux", reason="The memory limit is only enforced on Linux"
+)
+def test_config_worker_memory_limit(config_worker):
+    # Interpolating a 10 MB value a thousand times exceeds the memory limit of the worker
+    source = (
+        partial_config
+        + f'\n[paths]\nbase = "{"x" * 10**7}"\nlarge = {"${paths.base}" * 1000}\n'
+    )
+    with pytest.raises(ConfigWorkerError, match="ran out of memory"):
+        config_worker.fill_config(source)
+    # The worker is restarted for the next task
+    filled, _ = config_worker.fill_config(partial_config)
+    assert filled is not None
+
+
+@pytest.mark.parametrize(
+    "loc, line",
+    [
+        (("ner", "model", "hidden_width"), 11),
+        (("components", "ner", "model", "maxout_pieces"), 9),
+        (("pipeline",), 2),
+        (("training", "max_epochs"), 0),
+        ((), 0),
+    ],
+)
+def test_find_location(loc, line):
+    lines = partial_config.splitlines(True)
+    assert find_location(lines, loc).start.line == line
+
+
+# Test that output of the worker doesn't reach stdout, the JSON-RPC channel of a server running over stdio
+def test_worker_output():
+    script = "from server.config_worker import redirect_stdout; redirect_stdout(); import os; print('print'); os.write(1, b'write')"
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    )
+    assert result.stdout == b""
+    assert b"print" in result.stderr and b"write" in result.stderr
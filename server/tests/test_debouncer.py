@@ -0,0 +1,26 @@
+import threading
+import time
+
+from ..debouncer import Debouncer
+
+
+def test_debouncer():
+    calls = []
+    done = threading.Event()
+
+    def submit(function):
+        function()
+        done.set()
+
+    debouncer = Debouncer(0.05, submit)
+    # Only the last function of a burst runs
+    for i in range(5):
+        debouncer.schedule("a", lambda i=i: calls.append(("a", i)))
+    debouncer.schedule("b", lambda: calls.append(("b", 0)))
+    debouncer.cancel("b")
+    assert done.wait(1)
+    time.sleep(0.1)
+    assert calls == [("a", 4)]
+
+    debouncer.run("a", lambda: calls.append(("a", 5)))
+    assert calls == [("a", 4), ("a", 5)]
@@ -0,0 +1,70 @@
+import pytest
+
+from ..environment_watcher import EnvironmentWatcher, reload_entry_points
+from ..registry_catalogue import RegistryCatalogue
+
+fake_plugin_module = '''
+def make_fake_architecture():
+    """Fake architecture installed after the server started"""
+'''
+
+fake_plugin_metadata = """Metadata-Version: 2.1
+Name: fake-spacy-plugin
+Version: 0.1.0
+"""
+
+fake_plugin_entry_points = """[spacy_architectures]
+fake.Architecture.v1 = fake_spacy_plugin:make_fake_architecture
+"""
+
+
+@pytest.fixture
+def site_packages(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield tmp_path
+    monkeypatch.undo()
+    reload_entry_points()
+
+
+def install_fake_plugin(path):
+    (path / "fake_spacy_plugin.py").write_text(fake_plugin_module)
+    dist_info = path / "fake_spacy_plugin-0.1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "METADATA").write_text(fake_plugin_metadata)
+    (dist_info / "entry_points.txt").write_text(fake_plugin_entry_points)
+    (dist_info / "RECORD").write_text("")
+
+
+def test_watcher_refreshes_installed_plugin(site_packages):
+    catalogue = RegistryCatalogue()
+    watcher = EnvironmentWatcher(catalogue, paths=[str(site_packages)])
+    old_registry = catalogue.get_registry("architectures")
+    generation = catalogue.generation
+
+    assert watcher.check() == set()
+    assert catalogue.find("architectures", "fake.Architecture.v1") is None
+
+    install_fake_plugin(site_packages)
+    assert watcher.check() == {"architectures"}
+
+    registry_entry = catalogue.find("architectures", "fake.Architecture.v1")
+    assert registry_entry is not None
+    assert (
+        registry_entry.docstring
+        == "Fake architecture installed after the server started"
+    )
+    assert catalogue.generation == generation + 1
+    # The previous snapshot is left untouched
+    assert "fake.Architecture.v1" not in old_registry
+    # Nothing changed since the last check
+    assert watcher.check() == set()
+
+
+def test_watcher_ignores_unrelated_distributions(site_packages):
+    catalogue = RegistryCatalogue()
+    watcher = EnvironmentWatcher(catalogue, paths=[str(site_packages)])
+
+    dist_info = site_packages / "unrelated-1.0.dist-info"
+    dist_info.mkdir()
+    (dist_info / "entry_points.txt").write_text("[console_scripts]\nfoo = foo:main\n")
+    assert watcher.check() == set()
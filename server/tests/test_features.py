@@ -1,17 +1,34 @@
 import pytest
-from mock import Mock
+import threading
+from mock import Mock, patch
 from lsprotocol.types import (
+    ClientCapabilities,
+    CodeLensParams,
+    CompletionParams,
+    InlayHintParams,
+    InlayHintWorkspaceClientCapabilities,
     TextDocumentIdentifier,
     TextDocumentPositionParams,
     Position,
+    Range,
+    WorkspaceClientCapabilities,
 )
 from pygls.workspace import Document, Workspace
-from thinc.api import Config
 from spacy import registry
 
-from ..server import hover_feature
+from ..server import (
+    code_lens_feature,
+    code_lens_resolve_feature,
+    completion_feature,
+    hover_feature,
+    inlay_hint_feature,
+)
+from ..config_chain import ConfigChain
+from ..document_snapshot import DocumentSnapshot, DocumentStore, FetchedRanges
+from ..feature_inlay_hints import refresh_inlay_hints
 from ..feature_validation import validate_config
-from ..util import format_docstrings
+from ..registry_catalogue import registry_catalogue
+from ..util import format_docstrings, get_config_block
 
 
 class FakeServer:
@@ -23,7 +40,17 @@ class FakeServer:
 
     def __init__(self):
         self.workspace = Workspace("", None)
-        self.config: Config = None
+        self.documents = DocumentStore()
+        self.inlay_hint_ranges = FetchedRanges()
+        self.config_chain = ConfigChain()
+        self.code_lens_cache = {}
+        self.streamed_documents = set()
+        self.client_capabilities = ClientCapabilities(
+            workspace=WorkspaceClientCapabilities(
+                inlay_hint=InlayHintWorkspaceClientCapabilities(refresh_support=True)
+            )
+        )
+        self.lsp = Mock()
 
 
 fake_document_uri = "file://fake_config.cfg"
@@ -325,6 +352,10 @@ def _reset_mocks():
     server.publish_diagnostics.reset_mock()
     server.show_message.reset_mock()
     server.show_message_log.reset_mock()
+    server.lsp.reset_mock()
+    server.documents = DocumentStore()
+    server.inlay_hint_ranges = FetchedRanges()
+    server.code_lens_cache = {}
 
 
 # Test Hover Resolve Registries
@@ -370,6 +401,68 @@ def test_resolve_sections(line, character, section_name):
     assert section_name in hover_obj.contents.value
 
 
+# Test Hover Resolve Arguments
+@pytest.mark.parametrize(
+    "line, character, signature, description",
+    [
+        (32, 3, "hidden_width: int", "The width of the hidden layer."),
+        (35, 0, "nO: Optional[int] = null", "The number of actions"),
+        (26, 10, "update_with_oracle_cut_size: int = 100", "During training"),
+        (57, 2, "width: int", "The input and output width."),
+    ],
+)
+def test_resolve_arguments(line, character, signature, description):
+    _reset_mocks()
+    params = TextDocumentPositionParams(
+        text_document=TextDocumentIdentifier(uri=fake_document.uri),
+        position=Position(line=line, character=character),
+    )
+    hover_obj = hover_feature(server, params)
+    assert "(*argument*)" in hover_obj.contents.value
+    assert f"`{signature}`" in hover_obj.contents.value
+    assert description in hover_obj.contents.value
+
+
+# Test Completion of Arguments
+@pytest.mark.parametrize(
+    "line, character, labels",
+    [
+        (27, 0, ["incorrect_spans_key", "scorer"]),
+        (36, 0, []),
+        (33, 3, ["maxout_pieces"]),
+        (44, 0, []),
+        (33, 16, None),
+        (28, 0, None),
+        (12, 0, None),
+    ],
+)
+def test_completion(line, character, labels):
+    _reset_mocks()
+    params = CompletionParams(
+        text_document=TextDocumentIdentifier(uri=fake_document.uri),
+        position=Position(line=line, character=character),
+    )
+    completion_list = completion_feature(server, params)
+    if labels is None:
+        assert completion_list is None
+    else:
+        assert [item.label for item in completion_list.items] == labels
+
+
+# Test that the blocks found with the section index of a snapshot include their sub-sections
+def test_config_block():
+    snapshot = DocumentSnapshot(fake_document.uri, 1, fake_document.source)
+    for line_n in [0, 12, 24, 30, len(snapshot.lines) - 1]:
+        assert get_config_block(
+            snapshot.lines, line_n, snapshot.section_index
+        ) == get_config_block(snapshot.lines, line_n)
+    config_block = get_config_block(snapshot.lines, 24, snapshot.section_index)
+    assert config_block.name == "components.ner"
+    assert config_block.registry_name == "factories"
+    assert config_block.keys["model"] == 28
+    assert get_config_block(["width = 96\n"], 0) is None
+
+
 # Test formatting of docstrings
 @pytest.mark.parametrize(
     "registry_func, registry_name, docstring, formatted_docstring",
@@ -427,3 +520,208 @@ def test_validation(cfg, valid):
     else:
         _valid = False
     assert _valid == valid
+
+
+# Test inlay hints of variables
+@pytest.mark.parametrize(
+    "start_line, end_line, hints",
+    [
+        (36, 45, [(39, 48, "= 96")]),
+        (
+            64,
+            85,
+            [
+                (66, 19, "= null"),
+                (74, 21, "= null"),
+                (83, 21, "= 0"),
+                (84, 39, "= null"),
+            ],
+        ),
+        (0, 10, []),
+    ],
+)
+def test_inlay_hints(start_line, end_line, hints):
+    _reset_mocks()
+    params = InlayHintParams(
+        text_document=TextDocumentIdentifier(uri=fake_document.uri),
+        range=Range(
+            start=Position(line=start_line, character=0),
+            end=Position(line=end_line, character=0),
+        ),
+    )
+    inlay_hints = inlay_hint_feature(server, params)
+    assert [
+        (hint.position.line, hint.position.character, hint.label)
+        for hint in inlay_hints
+    ] == hints
+
+
+def test_inlay_hints_chain():
+    _reset_mocks()
+    server.documents.update_text(
+        fake_document_uri,
+        1,
+        "[system]\nseed = 0\n\n[training]\nseed = ${system.seed}\nother = ${training.seed}\n",
+    )
+    params = InlayHintParams(
+        text_document=TextDocumentIdentifier(uri=fake_document_uri),
+        range=Range(
+            start=Position(line=5, character=0), end=Position(line=6, character=0)
+        ),
+    )
+    (hint,) = inlay_hint_feature(server, params)
+    assert hint.label == "= 0"
+    assert "`training.seed` → `system.seed` → `0`" in hint.tooltip.value
+
+
+# Test inlay hint refresh after changes
+@pytest.mark.parametrize(
+    "old_value, new_value, refreshed",
+    [
+        ("seed = 0", "seed = 42", True),
+        ("max_steps = 20000", "max_steps = 100", False),
+    ],
+)
+def test_inlay_hint_refresh(old_value, new_value, refreshed):
+    _reset_mocks()
+    server.documents.update_text(fake_document_uri, 1, fake_document_content)
+    params = InlayHintParams(
+        text_document=TextDocumentIdentifier(uri=fake_document_uri),
+        range=Range(
+            start=Position(line=80, character=0), end=Position(line=95, character=0)
+        ),
+    )
+    inlay_hint_feature(server, params)
+
+    old_snapshot, snapshot = server.documents.update_text(
+        fake_document_uri, 2, fake_document_content.replace(old_value, new_value)
+    )
+    assert refresh_inlay_hints(server, old_snapshot, snapshot) == refreshed
+    assert server.lsp.send_request.called == refreshed
+
+
+# Test that overlapping fetched ranges are merged
+def test_fetched_ranges():
+    def create_range(start_line, end_line):
+        return Range(
+            start=Position(line=start_line, character=0),
+            end=Position(line=end_line, character=0),
+        )
+
+    ranges = FetchedRanges()
+    for start_line, end_line in [(0, 50), (100, 150), (40, 60), (0, 50), (55, 100)]:
+        ranges.add(fake_document_uri, create_range(start_line, end_line))
+    assert ranges.get(fake_document_uri) == [create_range(0, 150)]
+    ranges.add(fake_document_uri, create_range(200, 250))
+    assert len(ranges.get(fake_document_uri)) == 2
+
+
+# Test code lenses of component blocks, only looked up in the registry when resolved
+def test_code_lens():
+    _reset_mocks()
+    params = CodeLensParams(text_document=TextDocumentIdentifier(uri=fake_document.uri))
+    with patch.object(
+        registry_catalogue, "find", wraps=registry_catalogue.find
+    ) as find:
+        lenses = code_lens_feature(server, params)
+        assert find.call_count == 0
+        assert [(lens.range.start.line, lens.command) for lens in lenses[:2]] == [
+            (23, None),
+            (28, None),
+        ]
+        assert code_lens_resolve_feature(server, lenses[0]).command.title.startswith(
+            "factory ner · spacy "
+        )
+        # Lenses of unchanged blocks are resolved from the cache
+        code_lens_resolve_feature(server, code_lens_feature(server, params)[0])
+        assert find.call_count == 1
+
+    lens = lenses[1]
+    lens.data = {**lens.data, "hash": "changed", "func_name": "spacy.Missing.v1"}
+    assert (
+        code_lens_resolve_feature(server, lens).command.title
+        == "⚠ @architectures spacy.Missing.v1 not found in the registry"
+    )
+
+
+# Test that handlers running in parallel to document updates only see complete snapshots
+def test_concurrent_snapshots():
+    _reset_mocks()
+    # The second version has a different seed and all lines moved down by one
+    versions = [
+        (fake_document_content, validate_config(server, fake_document_content)),
+        (
+            "\n" + fake_document_content.replace("seed = 0", "seed = 42"),
+            validate_config(
+                server, fake_document_content.replace("seed = 0", "seed = 42")
+            ),
+        ),
+    ]
+    hover_params = TextDocumentPositionParams(
+        text_document=TextDocumentIdentifier(uri=fake_document_uri),
+        position=Position(line=83, character=10),
+    )
+    inlay_hint_params = InlayHintParams(
+        text_document=TextDocumentIdentifier(uri=fake_document_uri),
+        range=Range(
+            start=Position(line=80, character=0), end=Position(line=86, character=0)
+        ),
+    )
+    # Results of the first and second version
+    expected_hovers = {"(*variable*) **system.seed**: `0`", None}
+    expected_inlay_hints = {
+        ((83, 21, "= 0"), (84, 39, "= null")),
+        ((84, 21, "= 42"), (85, 39, "= null")),
+    }
+    server.documents.update_config(fake_document_uri, 0, *versions[0])
+
+    errors = []
+    stop = threading.Event()
+
+    def update_documents():
+        version = 1
+        while not stop.is_set():
+            source, config = versions[version % 2]
+            server.documents.update_config(fake_document_uri, version, source, config)
+            version += 1
+
+    def read_documents():
+        try:
+            for _ in range(300):
+                hover_obj = hover_feature(server, hover_params)
+                assert (
+                    hover_obj.contents.value if hover_obj else None
+                ) in expected_hovers
+                inlay_hints = inlay_hint_feature(server, inlay_hint_params)
+                assert (
+                    tuple(
+                        (hint.position.line, hint.position.character, hint.label)
+                        for hint in inlay_hints
+                    )
+                    in expected_inlay_hints
+                )
+        except Exception as e:
+            errors.append(e)
+
+    writer = threading.Thread(target=update_documents)
+    readers = [threading.Thread(target=read_documents) for _ in range(4)]
+    writer.start()
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        reader.join()
+    stop.set()
+    writer.join()
+    assert errors == []
+
+
+# Test that storing a version doesn't split the document, and validating it again keeps the split lines
+def test_lazy_snapshot_lines():
+    documents = DocumentStore()
+    _, snapshot = documents.update_text(fake_document_uri, 1, fake_document_content)
+    assert "lines" not in snapshot.__dict__
+    lines = snapshot.lines
+    validated = documents.update_config(
+        fake_document_uri, 1, fake_document_content, None
+    )
+    assert validated.lines is lines
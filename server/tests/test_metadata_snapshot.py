@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+
+from ..metadata_snapshot import build_snapshot, load_snapshot, write_snapshot
+from ..registry_catalogue import RegistryCatalogue
+
+lite_mode_script = """
+import sys
+from lsprotocol.types import Position, TextDocumentIdentifier, TextDocumentPositionParams
+from server.document_snapshot import DocumentStore
+from server.feature_hover import hover
+from server.metadata_snapshot import load_snapshot
+
+assert load_snapshot(sys.argv[1])
+source = '''[training.batcher]
+@batchers = "spacy.batch_by_words.v1"
+tolerance = 0.2
+'''
+snapshot = DocumentStore().update_text("file:///config.cfg", 1, source)[1]
+for line, character in [(0, 11), (1, 20), (2, 2)]:
+    params = TextDocumentPositionParams(
+        text_document=TextDocumentIdentifier(uri=snapshot.uri),
+        position=Position(line=line, character=character),
+    )
+    assert hover(snapshot, params) is not None, (line, character)
+assert "spacy" not in sys.modules
+"""
+
+
+def test_snapshot_round_trip(tmp_path):
+    snapshot_path = str(tmp_path / "metadata.json")
+    write_snapshot(snapshot_path)
+
+    catalogue = RegistryCatalogue()
+    assert load_snapshot(snapshot_path, catalogue)
+    assert catalogue.from_snapshot
+
+    registry_catalogue = RegistryCatalogue()
+    for registry_name, func_name in [
+        ("architectures", "spacy.TransitionBasedParser.v2"),
+        ("factories", "ner"),
+        ("batchers", "spacy.batch_by_words.v1"),
+    ]:
+        entry = catalogue.find(registry_name, func_name)
+        registry_entry = registry_catalogue.find(registry_name, func_name)
+        assert entry is not None and registry_entry is not None
+        assert entry.file == registry_entry.file
+        assert entry.line_no == registry_entry.line_no
+        assert entry.docstring == registry_entry.docstring
+        assert entry.parameters == registry_entry.parameters
+    # Registries missing from the snapshot aren't read from spaCy
+    assert catalogue.find("not_a_registry", "spacy.Tokenizer.v1") is None
+
+
+def test_outdated_snapshot(tmp_path):
+    snapshot = build_snapshot()
+    snapshot["spacy_version"] = "0.0.1"
+    snapshot_path = tmp_path / "metadata.json"
+    snapshot_path.write_text(json.dumps(snapshot))
+
+    catalogue = RegistryCatalogue()
+    assert not load_snapshot(str(snapshot_path), catalogue)
+    assert not load_snapshot(str(tmp_path / "missing.json"), catalogue)
+    assert not catalogue.from_snapshot
+
+    # Snapshots taken before a plugin was installed or removed are outdated as well
+    snapshot = build_snapshot()
+    snapshot["environment"].append(["spacy_plugin-0.1.0.dist-info", [0.0, 0.0]])
+    snapshot_path.write_text(json.dumps(snapshot))
+    assert not load_snapshot(str(snapshot_path), catalogue)
+    assert not catalogue.from_snapshot
+
+
+def test_lite_mode_without_spacy(tmp_path):
+    snapshot_path = str(tmp_path / "metadata.json")
+    write_snapshot(snapshot_path)
+    # Run in a fresh interpreter, spaCy is already imported into the test process
+    subprocess.run(
+        [sys.executable, "-c", lite_mode_script, snapshot_path],
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+    )
@@ -0,0 +1,86 @@
+import pytest
+from spacy import registry
+
+from ..registry_catalogue import RegistryCatalogue, _NOT_LOADED
+
+
+# Test that catalogue entries match spaCy's registry.find
+@pytest.mark.parametrize(
+    "registry_name, registry_func",
+    [
+        ("architectures", "spacy.MultiHashEmbed.v2"),
+        ("architectures", "spacy.TransitionBasedParser.v2"),
+        ("factories", "ner"),
+        ("tokenizers", "spacy.Tokenizer.v1"),
+        ("schedules", "compounding.v1"),
+        ("ops", "CupyOps"),
+    ],
+)
+def test_catalogue_find(registry_name, registry_func):
+    catalogue = RegistryCatalogue()
+    registry_desc = registry.find(registry_name, registry_func)
+    registry_entry = catalogue.find(registry_name, registry_func)
+
+    assert registry_entry is not None
+    assert registry_entry.module == registry_desc["module"]
+    assert registry_entry.file == registry_desc["file"]
+    assert registry_entry.line_no == registry_desc["line_no"]
+    assert registry_entry.docstring == registry_desc["docstring"]
+
+
+@pytest.mark.parametrize(
+    "registry_name, registry_func",
+    [
+        ("architectures", "spacy.NotAnArchitecture.v1"),
+        ("not_a_registry", "spacy.Tokenizer.v1"),
+        ("", "ner"),
+    ],
+)
+def test_catalogue_find_missing(registry_name, registry_func):
+    catalogue = RegistryCatalogue()
+    assert catalogue.find(registry_name, registry_func) is None
+
+
+def test_catalogue_lazy_loading():
+    catalogue = RegistryCatalogue()
+    registry_entry = catalogue.find("architectures", "spacy.MultiHashEmbed.v2")
+
+    assert registry_entry is not None
+    assert registry_entry._docstring is _NOT_LOADED
+    assert registry_entry._signature is _NOT_LOADED
+    assert registry_entry._parameters is _NOT_LOADED
+    assert registry_entry.docstring is not None
+    assert "width" in registry_entry.signature.parameters
+
+    # Classes have no code object, their location is found on first access
+    class_entry = catalogue.find("ops", "CupyOps")
+    assert class_entry is not None
+    assert class_entry._location is _NOT_LOADED
+    assert class_entry.file is not None and class_entry.file.endswith("cupy_ops.py")
+
+
+def test_catalogue_parameters():
+    catalogue = RegistryCatalogue()
+    registry_entry = catalogue.find("architectures", "spacy.TransitionBasedParser.v2")
+
+    assert registry_entry is not None
+    parameters = registry_entry.parameters
+    assert list(parameters) == [
+        "tok2vec",
+        "state_type",
+        "extra_state_tokens",
+        "hidden_width",
+        "maxout_pieces",
+        "use_upper",
+        "nO",
+    ]
+    assert parameters["tok2vec"].annotation == "Model[List[Doc], List[Floats2d]]"
+    assert parameters["nO"].default == "null"
+    assert parameters["hidden_width"].description == "The width of the hidden layer."
+    # Parameters are only extracted once
+    assert registry_entry.parameters is parameters
+
+    # Factory defaults come from the factory meta, nlp and name aren't set in the config
+    factory_parameters = catalogue.find("factories", "ner").parameters
+    assert "nlp" not in factory_parameters
+    assert factory_parameters["update_with_oracle_cut_size"].default == "100"
@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+
+from ..benchmarks.replay_session import get_recorded_responses, replay
+from ..session_recorder import RECEIVED, SENT, load_session
+
+config_uri = "file:///config.cfg"
+config_source = """[paths]
+train = "corpus/train.spacy"
+
+[corpora.train]
+path = ${paths.train}
+"""
+
+
+def hover_message(msg_id, line, character):
+    return {
+        "jsonrpc": "2.0",
+        "id": msg_id,
+        "method": "textDocument/hover",
+        "params": {
+            "textDocument": {"uri": config_uri},
+            "position": {"line": line, "character": character},
+        },
+    }
+
+
+# Recorded session of a client opening a config and hovering a variable and an empty line
+session = [
+    (
+        RECEIVED,
+        {
+            "jsonrpc": "2.0",
+            "id": 0,
+            "method": "initialize",
+            "params": {"processId": None, "rootUri": None, "capabilities": {}},
+        },
+    ),
+    (SENT, {"jsonrpc": "2.0", "id": 0, "result": {"capabilities": {}}}),
+    (RECEIVED, {"jsonrpc": "2.0", "method": "initialized", "params": {}}),
+    (
+        SENT,
+        {
+            "jsonrpc": "2.0",
+            "id": "settings",
+            "method": "workspace/configuration",
+            "params": {"items": [{"section": "spacy-extension"}]},
+        },
+    ),
+    (RECEIVED, {"jsonrpc": "2.0", "id": "settings", "result": [{}]}),
+    (
+        RECEIVED,
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {
+                    "uri": config_uri,
+                    "languageId": "spacy",
+                    "version": 1,
+                    "text": config_source,
+                }
+            },
+        },
+    ),
+    (RECEIVED, hover_message(1, 4, 12)),
+    # The hover of the variable was empty when the session was recorded
+    (SENT, {"jsonrpc": "2.0", "id": 1, "result": None}),
+    (RECEIVED, hover_message(2, 2, 0)),
+    (SENT, {"jsonrpc": "2.0", "id": 2, "result": None}),
+    (RECEIVED, {"jsonrpc": "2.0", "id": 3, "method": "shutdown"}),
+    (SENT, {"jsonrpc": "2.0", "id": 3, "result": None}),
+    (RECEIVED, {"jsonrpc": "2.0", "method": "exit"}),
+]
+
+
+def write_session(path):
+    with open(path, "w", encoding="utf8") as file:
+        for i, (direction, message) in enumerate(session):
+            entry = {"time": i * 0.01, "direction": direction, "message": message}
+            file.write(json.dumps(entry) + "\n")
+
+
+def test_recorded_responses(tmp_path):
+    session_path = str(tmp_path / "session.jsonl")
+    write_session(session_path)
+    assert get_recorded_responses(load_session(session_path)) == {
+        "workspace/configuration": [{"result": [{}]}]
+    }
+
+
+# Test that a replay times every request and compares the results with the recording
+def test_replay_session(tmp_path, monkeypatch):
+    session_path = str(tmp_path / "session.jsonl")
+    write_session(session_path)
+    # The server is started with python -m server from the repo root
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+    args = argparse.Namespace(
+        session=session_path,
+        server_args=[],
+        tcp=False,
+        port=2087,
+        speed=0.0,
+        sequential=True,
+        timeout=60.0,
+    )
+    results = replay(args)
+
+    methods = results["methods"]
+    assert set(methods) == {"initialize", "textDocument/hover"}
+    assert methods["initialize"]["count"] == 1
+    hover = methods["textDocument/hover"]
+    assert hover["count"] == 2 and hover["errors"] == 0
+    # Only the hover of the variable differs from the recording
+    assert hover["changed"] == 1
+    assert 0 < hover["p50"] <= hover["max"]
@@ -0,0 +1,233 @@
+import cProfile
+import json
+import pstats
+import pytest
+import time
+from mock import Mock, patch
+from lsprotocol.types import (
+    TEXT_DOCUMENT_HOVER,
+    DidCloseTextDocumentParams,
+    DidOpenTextDocumentParams,
+    DidSaveTextDocumentParams,
+    Position,
+    TextDocumentIdentifier,
+    TextDocumentItem,
+    TextDocumentPositionParams,
+)
+from pygls.exceptions import JsonRpcRequestCancelled
+
+from ..profiler import COLLAPSED, HandlerProfiler
+from ..server import did_close, did_open, did_save
+from ..session_recorder import SessionRecorder, load_session
+from ..spacy_server import SpacyLanguageServer
+
+
+class DeferredThreadPool:
+    """Thread pool that only runs the queued handlers when asked to"""
+
+    def __init__(self):
+        self.queue = []
+
+    def apply_async(self, func, args=(), callback=None, error_callback=None):
+        self.queue.append((func, args, callback, error_callback))
+
+    def run_all(self):
+        while self.queue:
+            func, args, callback, error_callback = self.queue.pop(0)
+            try:
+                result = func(*args)
+            except Exception as e:
+                if error_callback is not None:
+                    error_callback(e)
+            else:
+                if callback is not None:
+                    callback(result)
+
+
+@pytest.fixture
+def server():
+    server = SpacyLanguageServer("test-server", "v0.1")
+    server._thread_pool = DeferredThreadPool()
+    server.lsp._send_response = Mock()
+    server.handled = []
+
+    @server.feature(TEXT_DOCUMENT_HOVER)
+    @server.thread()
+    def hover(params: TextDocumentPositionParams):
+        server.handled.append(params.position.line)
+        return params.position.line
+
+    return server
+
+
+def hover_params(uri, line):
+    return TextDocumentPositionParams(
+        text_document=TextDocumentIdentifier(uri=uri),
+        position=Position(line=line, character=0),
+    )
+
+
+def get_responses(server):
+    return {
+        call.args[0]: call.kwargs.get("error") or call.args[1]
+        for call in server.lsp._send_response.call_args_list
+    }
+
+
+def test_superseded_requests_are_skipped(server):
+    for msg_id in range(3):
+        server.lsp._handle_request(
+            msg_id, TEXT_DOCUMENT_HOVER, hover_params("file:///a.cfg", msg_id)
+        )
+    server.lsp._handle_request(3, TEXT_DOCUMENT_HOVER, hover_params("file:///b.cfg", 3))
+    server.thread_pool.run_all()
+
+    # Only the latest request of every document is handled
+    assert server.handled == [2, 3]
+    assert get_responses(server) == {0: None, 1: None, 2: 2, 3: 3}
+    assert server.lsp._pending_requests == {}
+    assert server.lsp._latest_requests == {}
+
+
+def test_cancelled_requests_are_skipped(server):
+    server.lsp._handle_request(0, TEXT_DOCUMENT_HOVER, hover_params("file:///a.cfg", 0))
+    server.lsp._handle_request(1, TEXT_DOCUMENT_HOVER, hover_params("file:///b.cfg", 1))
+    server.lsp._handle_cancel_notification(0)
+    server.thread_pool.run_all()
+
+    assert server.handled == [1]
+    responses = get_responses(server)
+    assert responses[0]["code"] == JsonRpcRequestCancelled.CODE
+    assert responses[1] == 1
+    assert server.lsp._pending_requests == {}
+    assert server.lsp._latest_requests == {}
+    assert server.lsp._cancelled_requests == set()
+
+    # Cancelling a request that already finished doesn't keep its id
+    server.lsp._handle_cancel_notification(1)
+    assert server.lsp._cancelled_requests == set()
+
+
+def test_session_recorder(tmp_path):
+    session_path = str(tmp_path / "session.jsonl")
+    server = SpacyLanguageServer("test-server", "v0.1")
+    server.lsp.transport = Mock()
+    server.lsp.recorder = SessionRecorder(session_path)
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "shutdown"}).encode()
+    server.lsp.data_received(b"Content-Length: %d\r\n\r\n" % len(body) + body)
+    server.lsp.recorder.close()
+
+    session = load_session(session_path)
+    assert [(entry["direction"], entry["message"]) for entry in session] == [
+        ("received", {"jsonrpc": "2.0", "id": 1, "method": "shutdown"}),
+        ("sent", {"jsonrpc": "2.0", "id": 1, "result": None}),
+    ]
+    assert session[0]["time"] <= session[1]["time"]
+
+
+def test_profile_handlers(server, tmp_path):
+    profile_path = str(tmp_path / "profile.pstats")
+    server.lsp._handle_request(0, TEXT_DOCUMENT_HOVER, hover_params("file:///a.cfg", 0))
+    server.profiler.start(profile_path)
+    server.lsp._handle_request(1, TEXT_DOCUMENT_HOVER, hover_params("file:///b.cfg", 1))
+    server.thread_pool.run_all()
+    assert server.profiler.stop() == profile_path
+
+    # Only the request handled while the profiler was running is profiled
+    assert server.handled == [0, 1]
+    assert server.profiler.n_calls == 1
+    stats = pstats.Stats(profile_path)
+    assert any(function == "hover" for _, _, function in stats.stats)
+    with pytest.raises(ValueError):
+        server.profiler.stop()
+
+
+# Test that calls which can't be profiled (another cProfile profiler is active on Python 3.12+) are counted
+def test_profile_skipped_handlers(tmp_path):
+    profiler = HandlerProfiler()
+    profiler.start(str(tmp_path / "profile.pstats"))
+    with patch.object(cProfile.Profile, "enable", side_effect=ValueError):
+        assert profiler.wrap(lambda: 1)() == 1
+    assert profiler.stop() is None
+    assert (profiler.n_calls, profiler.n_skipped) == (0, 1)
+
+
+def test_sample_handlers(tmp_path):
+    def slow_handler():
+        time.sleep(0.1)
+
+    profile_path = str(tmp_path / "profile.collapsed")
+    profiler = HandlerProfiler()
+    profiler.start(profile_path, COLLAPSED)
+    profiler.wrap(slow_handler)()
+    assert profiler.stop() == profile_path
+
+    with open(profile_path) as file:
+        stacks = [line.rsplit(" ", 1) for line in file.read().splitlines()]
+    assert stacks
+    # Stacks start at the handler, the frames calling the handler are left out
+    assert all(stack.startswith("slow_handler (") for stack, _ in stacks)
+    assert sum(int(count) for _, count in stacks) > 5
+
+
+# Test that opened documents are processed from their latest snapshot, and not at all once closed
+def test_open_document(server):
+    uri = "file:///config.cfg"
+    server.publish_diagnostics = Mock()
+    server.show_message = Mock()
+    did_open(
+        server,
+        DidOpenTextDocumentParams(
+            text_document=TextDocumentItem(
+                uri=uri, language_id="spacy", version=1, text="[nlp]\n"
+            )
+        ),
+    )
+    server.documents.update_text(uri, 2, "[nlp]\n\n[training]\n")
+    server.thread_pool.run_all()
+    assert [symbol.line for symbol in server.symbol_index.search("training")] == [2]
+    assert server.documents.get(uri).version == 2
+
+    did_open(
+        server,
+        DidOpenTextDocumentParams(
+            text_document=TextDocumentItem(
+                uri=uri, language_id="spacy", version=3, text="[corpora]\n"
+            )
+        ),
+    )
+    did_close(
+        server,
+        DidCloseTextDocumentParams(text_document=TextDocumentIdentifier(uri=uri)),
+    )
+    server.thread_pool.run_all()
+    assert server.documents.get(uri) is None
+    assert server.symbol_index.search("corpora") == []
+
+
+def test_save_closed_document(server):
+    uri = "file:///config.cfg"
+    server.publish_diagnostics = Mock()
+    server.show_message = Mock()
+    did_open(
+        server,
+        DidOpenTextDocumentParams(
+            text_document=TextDocumentItem(
+                uri=uri, language_id="spacy", version=1, text="[nlp]\n"
+            )
+        ),
+    )
+    server.thread_pool.run_all()
+    server.publish_diagnostics.reset_mock()
+
+    # A save handled after the document was closed doesn't store or validate it again
+    did_save(
+        server, DidSaveTextDocumentParams(text_document=TextDocumentIdentifier(uri=uri))
+    )
+    did_close(
+        server,
+        DidCloseTextDocumentParams(text_document=TextDocumentIdentifier(uri=uri)),
+    )
+    server.thread_pool.run_all()
+    assert server.documents.get(uri) is None
+    server.publish_diagnostics.assert_called_once_with(uri, [])
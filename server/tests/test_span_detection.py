@@ -0,0 +1,95 @@
+import pytest
+
+from ..feature_hover import detect_registry_name
+from ..span_detection import LineSpans
+from ..util import get_current_word
+
+
+@pytest.mark.parametrize(
+    "line, position, span",
+    [
+        ('@architectures = "spacy.Tok2Vec.v2"', 5, ("architectures", 1, 13)),
+        ('@architectures = "spacy.Tok2Vec.v2"', 18, ("spacy", 18, 22)),
+        ('@architectures = "spacy.Tok2Vec.v2"', 0, ("@", 0, 0)),
+        ('@architectures = "spacy.Tok2Vec.v2"', 15, ("=", 15, 15)),
+        ("width = 96", 10, ("", 0, 0)),
+        ("width = 96", -1, ("", 0, 0)),
+    ],
+)
+def test_get_current_word(line, position, span):
+    current_word = get_current_word(line, position)
+    assert (current_word.span_string, current_word.start, current_word.end) == span
+
+
+@pytest.mark.parametrize(
+    "line, registry_start, registry_name",
+    [
+        ('@architectures = "spacy.Tok2Vec.v2"', 18, "architectures"),
+        ('factory = "ner"', 11, "factory"),
+        ('"spacy.Tok2Vec.v2"', 1, ""),
+        ('a = "spacy.Tok2Vec.v2"', 5, "a"),
+    ],
+)
+def test_detect_registry_name(line, registry_start, registry_name):
+    assert detect_registry_name(line, registry_start) == registry_name
+
+
+# Test that bulk queries of a line find the word or the single non-word character at every position
+@pytest.mark.parametrize(
+    "line, positions, spans",
+    [
+        (
+            '@architectures = "spacy.Tok2Vec.v2"',
+            [-1, 0, 1, 13, 14, 17, 18, 23, 24, 30, 31, 32, 34, 35, 36],
+            [
+                ("", 0, 0),
+                ("@", 0, 0),
+                ("architectures", 1, 13),
+                ("architectures", 1, 13),
+                (" ", 14, 14),
+                ('"', 17, 17),
+                ("spacy", 18, 22),
+                (".", 23, 23),
+                ("Tok2Vec", 24, 30),
+                ("Tok2Vec", 24, 30),
+                (".", 31, 31),
+                ("v2", 32, 33),
+                ('"', 34, 34),
+                ("", 0, 0),
+                ("", 0, 0),
+            ],
+        ),
+        (
+            "[components.ner.model]",
+            [0, 1, 10, 11, 12, 15, 16, 21, 22],
+            [
+                ("[", 0, 0),
+                ("components", 1, 10),
+                ("components", 1, 10),
+                (".", 11, 11),
+                ("ner", 12, 14),
+                (".", 15, 15),
+                ("model", 16, 20),
+                ("]", 21, 21),
+                ("", 0, 0),
+            ],
+        ),
+        (
+            "path = ${paths.train}",
+            [5, 7, 8, 9, 14, 15, 20],
+            [
+                ("=", 5, 5),
+                ("$", 7, 7),
+                ("{", 8, 8),
+                ("paths", 9, 13),
+                (".", 14, 14),
+                ("train", 15, 19),
+                ("}", 20, 20),
+            ],
+        ),
+        ("", [-1, 0, 1], [("", 0, 0), ("", 0, 0), ("", 0, 0)]),
+    ],
+)
+def test_line_spans(line, positions, spans):
+    words = LineSpans(line).words_at(positions)
+    assert [(word.span_string, word.start, word.end) for word in words] == spans
@@ -0,0 +1,157 @@
+from dataclasses import replace
+from typing import List
+
+from mock import Mock
+from lsprotocol.types import SymbolKind, WorkspaceSymbolParams
+from pygls.uris import from_fs_path
+from pygls.workspace import Workspace
+
+from ..feature_workspace_symbol import index_workspace, workspace_symbol
+from ..spacy_server import SpacyLanguageServer
+from ..symbol_index import Symbol, SymbolIndex, get_block_symbols, iter_blocks
+
+config_source = """[nlp]
+lang = "en"
+
+[components.tok2vec.model.embed]
+@architectures = "spacy.MultiHashEmbed.v2"
+width = 96
+
+[training.batcher]
+@batchers = "spacy.batch_by_words.v1"
+"""
+
+
+def get_config_symbols(uri: str, source: str) -> List[Symbol]:
+    """Collect the symbols of all blocks of a config with their lines in the config"""
+    symbols = []
+    line_n = 0
+    for block in iter_blocks(source):
+        for symbol in get_block_symbols(uri, block):
+            symbols.append(replace(symbol, line=line_n + symbol.line))
+        line_n += len(block.splitlines())
+    return symbols
+
+
+def test_config_symbols():
+    symbols = get_config_symbols("file:///config.cfg", config_source)
+    assert [(symbol.name, symbol.kind, symbol.line) for symbol in symbols] == [
+        ("nlp", "section", 0),
+        ("components.tok2vec.model.embed", "section", 3),
+        ("spacy.MultiHashEmbed.v2", "reference", 4),
+        ("training.batcher", "section", 7),
+        ("spacy.batch_by_words.v1", "reference", 8),
+    ]
+    assert symbols[2].container == "components.tok2vec.model.embed"
+
+
+def test_symbol_index_search():
+    index = SymbolIndex()
+    index.update(
+        "registry:architectures",
+        [
+            Symbol(name, "function", "architectures", "file:///arch.py", line)
+            for line, name in enumerate(
+                [
+                    "spacy.MultiHashEmbed.v1",
+                    "spacy.MultiHashEmbed.v2",
+                    "spacy.HashEmbedCNN.v2",
+                    "spacy.Tok2Vec.v2",
+                ]
+            )
+        ],
+    )
+    index.update(
+        "file:///config.cfg", get_config_symbols("file:///config.cfg", config_source)
+    )
+
+    # Substring matches rank before names only sharing some trigrams
+    names = [symbol.name for symbol in index.search("multihashembed")]
+    assert names == [
+        "spacy.MultiHashEmbed.v1",
+        "spacy.MultiHashEmbed.v2",
+        "spacy.MultiHashEmbed.v2",
+        "spacy.HashEmbedCNN.v2",
+    ]
+    # Typos still match most trigrams
+    assert index.search("multihashembd")[0].name.startswith("spacy.MultiHashEmbed")
+    # Matches at the start of a word rank before matches within a word
+    assert index.search("hash")[0].name == "spacy.HashEmbedCNN.v2"
+    # Queries shorter than a trigram match the start of words
+    assert {symbol.name for symbol in index.search("ba")} == {
+        "training.batcher",
+        "spacy.batch_by_words.v1",
+    }
+    assert [symbol.kind for symbol in index.search("tok2vec", kinds={"section"})] == [
+        "section"
+    ]
+    assert index.search("") == []
+
+    # Updating a source replaces only its own symbols
+    index.update(
+        "file:///config.cfg", get_config_symbols("file:///config.cfg", "[nlp]")
+    )
+    assert [symbol.name for symbol in index.search("multihashembed")] == [
+        "spacy.MultiHashEmbed.v1",
+        "spacy.MultiHashEmbed.v2",
+        "spacy.HashEmbedCNN.v2",
+    ]
+    index.remove("registry:architectures")
+    assert index.search("multihashembed") == []
+    assert len(index) == 1
+
+
+# Test that editing a config only re-indexes the changed sections and moves the others
+def test_symbol_index_update_config():
+    uri = "file:///config.cfg"
+    index = SymbolIndex()
+    index.update_config(uri, config_source)
+    batcher_block = index._sources[uri][-1]
+
+    edited_source = config_source.replace(
+        'lang = "en"\n', 'lang = "en"\n\n[paths]\ntrain = null\n'
+    ).replace("width = 96", "width = 128")
+    index.update_config(uri, edited_source)
+    expected = get_config_symbols(uri, edited_source)
+    assert [
+        index.search(symbol.name, kinds={symbol.kind})[0] for symbol in expected
+    ] == expected
+    # The moved section keeps its symbols
+    assert index._sources[uri][-1] is batcher_block
+    assert len(index) == len(expected) == 6
+
+    index.update_config(uri, "")
+    assert len(index) == 0
+
+
+def test_workspace_symbol(tmp_path):
+    (tmp_path / "configs").mkdir()
+    (tmp_path / "configs" / "config.cfg").write_text(config_source)
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "ignored.cfg").write_text(config_source)
+    config_uri = from_fs_path(str(tmp_path / "configs" / "config.cfg"))
+
+    server = SpacyLanguageServer("test-server", "v0.1")
+    server.lsp.workspace = Workspace(from_fs_path(str(tmp_path)))
+    server.send_notification = Mock()
+    index_workspace(server)
+
+    symbols = workspace_symbol(server, WorkspaceSymbolParams(query="MultiHashEmbed"))
+    assert (config_uri, SymbolKind.Property) in [
+        (symbol.location.uri, symbol.kind) for symbol in symbols
+    ]
+    assert any(symbol.kind == SymbolKind.Function for symbol in symbols)
+    assert not any(".venv" in symbol.location.uri for symbol in symbols)
+
+    # Partial results stream the config symbols before the registered functions
+    params = WorkspaceSymbolParams(query="MultiHashEmbed", partial_result_token="token")
+    assert workspace_symbol(server, params) == []
+    batches = [call.args[1].value for call in server.send_notification.call_args_list]
+    assert [{symbol.kind for symbol in batch} for batch in batches] == [
+        {SymbolKind.Property},
+        {SymbolKind.Function},
+    ]
+    assert all(
+        call.args[1].token == "token"
+        for call in server.send_notification.call_args_list
+    )
@@ -1,45 +1,254 @@
 """Script for utility functions that can be used across the other implementations"""
 
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from lsprotocol.types import Range
+from .span_detection import LineSpans, SpanInfo
 
 
-@dataclass
-class SpanInfo:
-    span_string: str  # The span text, can have markdown elements
-    start: int  # Start index of the string
-    end: int  # End index of the string
+# Matches the variables, always enclosed with ${<string>}
+VARIABLE_REGEX = re.compile(r"\$\{([^{}\[\]]+)\}")
+SECTION_REGEX = re.compile(r"^\[([^\]]+)\]")
+KEY_VALUE_REGEX = re.compile(r"^([^\s=#;][^=]*?)\s*=\s*(.*)$")
 
 
-def get_current_word(line: str, start_pos: int) -> SpanInfo:
+@dataclass(frozen=True)
+class Interpolation:
+    line: int  # Line of the interpolation
+    start: int  # Start index of "${"
+    end: int  # Index after the closing "}"
+    variable: str  # The referenced variable, e.x. "system.seed"
+
+
+@dataclass(frozen=True)
+class ResolvedValue:
+    chain: Tuple[str, ...]  # The variables followed to get to the value
+    value: str  # The raw value as written in the config
+    origin: Optional[
+        str
+    ] = None  # Config or settings defining the value, None for the document itself
+
+
+# Returns the raw value of a variable and its origin, None if the variable isn't defined
+VariableLookup = Callable[[str], Optional[Tuple[str, Optional[str]]]]
+# Returns the resolved value of a variable, None if it can't be resolved
+VariableResolver = Callable[[str], Optional[ResolvedValue]]
+
+
+def format_origin(origin: str) -> str:
+    """Format the origin of a value for display, e.x. "base.cfg" for the uri of a chain config"""
+    return origin.rsplit("/", 1)[-1]
+
+
+class VariableIndex:
     """
-    Returns the a span string seperated by non-word characters
+    Index of all interpolations and values of one version of a config document.
 
-    EXAMPLE OUTPUT:
-    ('architectures', 1, 13)
-    ('spacy', 18, 22)
+    Values are resolved on first access and cached, so computing the hints of a range
+    only touches the interpolations within the range and the values they reference.
+    """
+
+    def __init__(self, source: str):
+        self.interpolations: List[Interpolation] = []
+        self.values: Dict[str, str] = {}
+        self._resolved: Dict[str, Optional[ResolvedValue]] = {}
+
+        section = ""
+        key = ""
+        for line_n, line in enumerate(source.splitlines()):
+            for match in VARIABLE_REGEX.finditer(line):
+                self.interpolations.append(
+                    Interpolation(line_n, match.start(), match.end(), match.group(1))
+                )
+            section_match = SECTION_REGEX.match(line)
+            if section_match:
+                section = section_match.group(1).strip()
+                key = ""
+                continue
+            key_value_match = KEY_VALUE_REGEX.match(line)
+            if key_value_match:
+                key = f"{section}.{key_value_match.group(1).strip()}"
+                self.values[key] = key_value_match.group(2).strip()
+            elif key and line[:1].isspace() and line.strip():
+                # Indented lines continue the value of the previous key
+                self.values[key] = f"{self.values[key]}\n{line.strip()}"
+
+        self._lines = [interpolation.line for interpolation in self.interpolations]
+
+    def in_range(self, range: Range) -> List[Interpolation]:
+        """Return the interpolations within a range"""
+        start = bisect_left(self._lines, range.start.line)
+        end = bisect_left(self._lines, range.end.line + 1)
+        return [
+            interpolation
+            for interpolation in self.interpolations[start:end]
+            if (interpolation.line, interpolation.end)
+            >= (range.start.line, range.start.character)
+            and (interpolation.line, interpolation.start)
+            <= (range.end.line, range.end.character)
+        ]
+
+    def resolve(self, variable: str) -> Optional[ResolvedValue]:
+        """
+        Resolve a variable to its value, following references to other variables.
+
+        RETURN:
+        resolved_value (Optional[ResolvedValue]): None if the variable can't be resolved
+        """
+        if variable not in self._resolved:
+            self._resolved[variable] = resolve_variable(variable, self.lookup)
+        return self._resolved[variable]
+
+    def lookup(self, variable: str) -> Optional[Tuple[str, Optional[str]]]:
+        value = self.values.get(variable)
+        return (value, None) if value is not None else None
+
+
+def resolve_variable(
+    variable: str,
+    lookup: VariableLookup,
+    dependencies: Optional[Set[str]] = None,
+    seen: Tuple[str, ...] = (),
+) -> Optional[ResolvedValue]:
+    """
+    Resolve a variable to its value, following references to other variables.
+
+    ARGUMENTS:
+    variable (str): The variable to resolve, e.x. "system.seed".
+    lookup (VariableLookup): Returns the raw value and origin of a variable.
+    dependencies (Optional[Set[str]]): Collects every variable looked up, including undefined ones.
+
+    RETURN:
+    resolved_value (Optional[ResolvedValue]): None if the variable can't be resolved
+    """
+    if variable in seen:
+        # Circular reference
+        return None
+    if dependencies is not None:
+        dependencies.add(variable)
+    found = lookup(variable)
+    if found is None:
+        return None
+    value, origin = found
+    chain = seen + (variable,)
+    reference = VARIABLE_REGEX.fullmatch(value)
+    if reference:
+        return resolve_variable(reference.group(1), lookup, dependencies, chain)
+    if VARIABLE_REGEX.search(value):
+        # Variables within a string are substituted
+        parts = []
+        for part in VARIABLE_REGEX.split(value)[1::2]:
+            resolved = resolve_variable(part, lookup, dependencies, chain)
+            if resolved is None:
+                return None
+            parts.append(resolved.value.strip('"'))
+        value = VARIABLE_REGEX.sub(lambda _: parts.pop(0), value)
+    return ResolvedValue(chain, value, origin)
+
+
+@dataclass(frozen=True)
+class ConfigBlock:
+    name: str  # The section name, e.x. "components.ner.model"
+    start: int  # Line of the section title
+    end: int  # Line after the last line of the block
+    registry_name: Optional[
+        str
+    ]  # Registry of the block's function, e.x. "architectures" or "factories"
+    func_name: Optional[
+        str
+    ]  # The block's registered function, e.x. "spacy.TransitionBasedParser.v2"
+    keys: Dict[str, int]  # Line of every key set in the block, including sub-sections
+
+
+class SectionIndex:
+    """
+    Lines and names of all sections of one version of a config document.
+
+    Built once per version, so looking up the block of a line doesn't scan the whole document.
     """
 
-    # Verify index lies within boundaries
-    if start_pos < 0 or start_pos >= len(line):
-        return SpanInfo("", 0, 0)
+    def __init__(self, lines: List[str]):
+        self.lines: List[int] = []  # Line of every section title, in order
+        self.names: List[str] = []
+        # Line of every direct sub-section, e.x. "components.ner" -> {"model": 24}
+        self.children: Dict[str, Dict[str, int]] = {}
+        self.n_lines = len(lines)
+        # Only lines starting with "[" can be section titles
+        for line_n in [i for i, line in enumerate(lines) if line[:1] == "["]:
+            section_match = SECTION_REGEX.match(lines[line_n])
+            if section_match is None:
+                continue
+            name = section_match.group(1).strip()
+            self.lines.append(line_n)
+            self.names.append(name)
+            parent, _, child = name.rpartition(".")
+            if parent:
+                self.children.setdefault(parent, {})[child] = line_n
 
-    end_i = start_pos
-    start_i = start_pos
+    def get_section(self, line_n: int) -> Optional[Tuple[int, int, str]]:
+        """Return the line of the title, the line after the last line and the name of the section containing a line"""
+        i = bisect_right(self.lines, line_n) - 1
+        if i < 0:
+            return None
+        end = self.lines[i + 1] if i + 1 < len(self.lines) else self.n_lines
+        return self.lines[i], end, self.names[i]
 
-    for i in range(start_pos, len(line), 1):
-        if re.match(r"\W", line[i]):
-            break
-        else:
-            end_i = i
 
-    for i in range(start_pos, -1, -1):
-        if re.match(r"\W", line[i]):
-            break
-        else:
-            start_i = i
+def get_config_block(
+    lines: List[str], line_n: int, section_index: Optional[SectionIndex] = None
+) -> Optional[ConfigBlock]:
+    """
+    Return the block containing a line or None if the line is outside of a block.
+
+    ARGUMENTS:
+    lines (List[str]): The lines of the document.
+    line_n (int): The line within the block.
+    section_index (Optional[SectionIndex]): The sections of the document, e.x. `DocumentSnapshot.section_index`. Built from the lines if not passed.
 
-    return SpanInfo(line[start_i : end_i + 1], start_i, end_i)
+    EXAMPLE:
+    [components.ner.model]
+    @architectures = "spacy.TransitionBasedParser.v2"
+    hidden_width = 64
+    """
+    if section_index is None:
+        section_index = SectionIndex(lines)
+    section = section_index.get_section(line_n)
+    if section is None:
+        return None
+    start, end, name = section
+
+    registry_name = None
+    func_name = None
+    keys: Dict[str, int] = {}
+    for key_line_n in range(start + 1, end):
+        key_value_match = KEY_VALUE_REGEX.match(lines[key_line_n])
+        if key_value_match:
+            key = key_value_match.group(1).strip()
+            value = key_value_match.group(2).strip().strip('"')
+            if key.startswith("@"):
+                registry_name, func_name = key[1:], value
+            elif key == "factory":
+                registry_name, func_name = "factories", value
+            else:
+                keys[key] = key_line_n
+
+    # Arguments can also be set as sub-sections, e.x. [components.ner.model.tok2vec]
+    keys.update(section_index.children.get(name, {}))
+    return ConfigBlock(name, start, end, registry_name, func_name, keys)
+
+
+def get_current_word(line: str, start_pos: int) -> SpanInfo:
+    """
+    Returns the a span string seperated by non-word characters,
+    use `LineSpans` to look up many positions of a line at once
+
+    EXAMPLE OUTPUT:
+    ('architectures', 1, 13)
+    ('spacy', 18, 22)
+    """
+    return LineSpans(line).word_at(start_pos)
 
 
 def format_docstrings(docstring: str):
@@ -0,0 +1,79 @@
+"""Script containing the settings of the extension pulled from the client"""
+
+from lsprotocol.types import ConfigurationItem, ConfigurationParams
+from pygls.uris import from_fs_path, to_fs_path
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+from .feature_inlay_hints import refresh_documents_hints
+from .feature_workspace_symbol import read_config
+from .spacy_server import SpacyLanguageServer
+from .util import VariableIndex
+
+SETTINGS_SECTION = "spacy-extension"
+
+
+def load_settings(server: SpacyLanguageServer) -> None:
+    """Request the settings of the extension from the client and apply them in the thread pool"""
+    workspace_capabilities = server.client_capabilities.workspace
+    if not (workspace_capabilities and workspace_capabilities.configuration):
+        return
+
+    def on_settings(result: Optional[List[Any]]):
+        settings = result[0] if result else None
+        server.thread_pool.apply_async(apply_settings, (server, settings))
+
+    server.get_configuration(
+        ConfigurationParams(items=[ConfigurationItem(section=SETTINGS_SECTION)]),
+        callback=on_settings,
+    )
+
+
+def apply_settings(server: SpacyLanguageServer, settings: Optional[Dict]) -> None:
+    """
+    Apply the config chain and overrides of the settings.
+
+    ARGUMENTS:
+    settings (Optional[Dict]): The "spacy-extension" settings, e.x.
+        {"configChain": ["configs/base.cfg"], "configOverrides": {"paths.train": "corpus/train.spacy"}}
+    """
+    settings = settings or {}
+    chain = [get_chain_uri(server, path) for path in settings.get("configChain") or []]
+    overrides = {
+        variable: value if isinstance(value, str) else json.dumps(value)
+        for variable, value in (settings.get("configOverrides") or {}).items()
+    }
+    layers = {uri: read_values(server, uri) for uri in chain}
+    affected = server.config_chain.configure(chain, overrides, layers)
+    refresh_documents_hints(server, affected)
+
+
+def update_chain_config(server: SpacyLanguageServer, uri: str) -> None:
+    """Read a config of the chain from disk again unless it's open, open configs are updated as they're edited"""
+    if uri not in server.config_chain.chain or server.documents.get(uri) is not None:
+        return
+    affected = server.config_chain.update_layer(uri, read_values(server, uri))
+    refresh_documents_hints(server, affected)
+
+
+def get_chain_uri(server: SpacyLanguageServer, path: str) -> str:
+    """Return the uri of a config of the chain, relative paths are relative to the workspace root"""
+    root_path = server.workspace.root_path
+    if root_path and not os.path.isabs(path):
+        path = os.path.join(root_path, path)
+    return from_fs_path(os.path.normpath(path)) or path
+
+
+def read_values(server: SpacyLanguageServer, uri: str) -> Dict[str, str]:
+    """Return the values of a config, from its latest version if it's open"""
+    snapshot = server.documents.get(uri)
+    if snapshot is not None:
+        return snapshot.variable_index.values
+    path = to_fs_path(uri)
+    source = read_config(path) if path is not None else None
+    if source is None:
+        logging.warning(f"Config of the chain not found: {uri}")
+        return {}
+    return VariableIndex(source).values